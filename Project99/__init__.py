@@ -3,13 +3,41 @@ Project99 — CFD Trading Scoring Engine (Phase 1 v2.0)
 Directional: long_score / short_score, alert_long / alert_short.
 """
 
-from .engine import score, get_resampled
-from .conditions import CONDITION_NAMES, CONDITION_FUNCS, CONDITION_STATUS
+from .engine import score, get_alignment, get_resampled, invalid_ohlc_rows, mark_validated
+from .conditions import CONDITION_NAMES, CONDITION_FUNCS, CONDITION_PARAMS, CONDITION_STATUS
+from .streaming import StreamingScorer, score_history
+from .batch import score_many
+from .packing import pack_history, pack_result, unpack_history, unpack_result
+from .profiling import StageTimer
+from .resample import ResamplePyramid, TimeframeAlignment
+from .scoring_config import ScoringConfig
+from .sweep import config_grid, sweep
+from .zones import ZoneRegistry
+from .liquidity import LiquidityBook
 
 __all__ = [
     "score",
     "get_resampled",
+    "get_alignment",
+    "invalid_ohlc_rows",
+    "mark_validated",
+    "StreamingScorer",
+    "score_history",
+    "score_many",
+    "pack_result",
+    "unpack_result",
+    "pack_history",
+    "unpack_history",
+    "StageTimer",
+    "ResamplePyramid",
+    "TimeframeAlignment",
+    "ScoringConfig",
+    "ZoneRegistry",
+    "LiquidityBook",
+    "sweep",
+    "config_grid",
     "CONDITION_NAMES",
     "CONDITION_FUNCS",
+    "CONDITION_PARAMS",
     "CONDITION_STATUS",
 ]
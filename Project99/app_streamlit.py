@@ -12,7 +12,8 @@ if str(ROOT) not in sys.path:
 import pandas as pd
 import streamlit as st
 
-from Project99 import score, get_resampled, CONDITION_NAMES
+from Project99 import ResamplePyramid, mark_validated, score, score_history, score_many, get_resampled, CONDITION_NAMES
+from Project99.scoring_config import resolve_config
 from Project99.visualization import build_three_panel_figure, compute_weekly_crossings, ensure_asia_hong_kong
 from Project99.visualization.market_data import fetch_15m_data
 
@@ -31,8 +32,9 @@ def run_scanner(assets_data):
     """Layer 1 — Scanner View: table, click asset → Deep Structure."""
     st.title("Project99 — Scanner View")
     rows = []
-    for asset, df in assets_data.items():
-        res = score(df, freq_minutes=15)
+    # A handful of assets on every rerun: threads, no process pool start-up
+    results = score_many(assets_data, freq_minutes=15, backend="thread")
+    for asset, res in results.items():
         rows.append({
             "Asset": asset,
             "long_score": res["long_score"],
@@ -81,9 +83,18 @@ def condition_breakdown(result):
                 st.markdown(f"- **{name}**: {'✅ True' if v else '❌ False'}")
 
 
-def deep_structure_view(asset: str, df_15m_raw: pd.DataFrame, df_15m_viz: pd.DataFrame, result: dict):
+def deep_structure_view(
+    asset: str,
+    df_15m_raw: pd.DataFrame,
+    df_15m_viz: pd.DataFrame,
+    result: dict,
+    pyramid: ResamplePyramid,
+    zones: dict,
+):
     """Layer 2 — Score panel + 3 charts + condition breakdown + sidebar toggles.
     Engine receives raw data only; viz uses df_15m_viz (Asia/Hong_Kong). Crossing uses raw.
+    1h / 4h bars and their liquidity books come from the asset's pyramid (same bars the engine scored).
+    zones: the asset's per-panel zone registries (kept across reruns, synced with new bars only).
     """
     st.title(f"Deep Structure — {asset}")
     score_panel(result)
@@ -100,7 +111,15 @@ def deep_structure_view(asset: str, df_15m_raw: pd.DataFrame, df_15m_viz: pd.Dat
         show_session = st.checkbox("Session", value=True, key="t_session")
         show_blocking = st.checkbox("Blocking", value=True, key="t_blocking")
 
-    crossings = compute_weekly_crossings(df_15m_raw, score_fn=score, asset_name=asset, lookback_weeks=4)
+    # One replay of the raw history per render: crossing log and chart markers both read it
+    try:
+        history = score_history(df_15m_raw, freq_minutes=15)
+    except ValueError as exc:
+        st.warning(f"Score history unavailable ({exc}): no crossing log or weekly markers.")
+        history = None
+    crossings = compute_weekly_crossings(
+        df_15m_raw, history, asset_name=asset, lookback_weeks=4, pyramid=pyramid
+    )
     st.subheader("Weekly Crossing Log – 最近四週")
     if crossings:
         crossing_rows = []
@@ -129,7 +148,10 @@ def deep_structure_view(asset: str, df_15m_raw: pd.DataFrame, df_15m_viz: pd.Dat
     else:
         st.caption("No threshold crossings in last 4 weeks (1H).")
 
-    df_1h, df_4h = get_resampled(df_15m_viz, 15)
+    df_1h, df_4h = get_resampled(df_15m_raw, 15, pyramid=pyramid)
+    # Blocking lines read the pyramid's liquidity books, the ones stop_money was scored on
+    lookback = resolve_config().DOUBLE_LOOKBACK
+    books = {rule: pyramid.book(rule, lookback) for rule in pyramid.rules}
     fig = build_three_panel_figure(
         df_15m_viz, df_1h, df_4h, result,
         show_trend=show_trend,
@@ -140,7 +162,9 @@ def deep_structure_view(asset: str, df_15m_raw: pd.DataFrame, df_15m_viz: pd.Dat
         show_fib=show_fib,
         show_session=show_session,
         show_blocking=show_blocking,
-        score_fn=score,
+        history=history,
+        zones=zones,
+        books=books,
     )
     st.plotly_chart(fig, use_container_width=True)
 
@@ -150,6 +174,7 @@ def deep_structure_view(asset: str, df_15m_raw: pd.DataFrame, df_15m_viz: pd.Dat
             "Element": [
                 "Demand Zone",
                 "Supply Zone",
+                "Active Zones (1H)",
                 "Stop Hunt Zone",
                 "Stop Money",
                 "Blocking Level",
@@ -160,6 +185,7 @@ def deep_structure_view(asset: str, df_15m_raw: pd.DataFrame, df_15m_viz: pd.Dat
             "Color / Shape": [
                 "Orange (transparent)",
                 "Grey (transparent)",
+                "Faint Orange / Grey, fainter per retest",
                 "Light Green / Light Red Band",
                 "Green / Red Dashed Line",
                 "Black Thick Line",
@@ -170,6 +196,7 @@ def deep_structure_view(asset: str, df_15m_raw: pd.DataFrame, df_15m_viz: pd.Dat
             "Meaning": [
                 "上升禁區",
                 "下降禁區",
+                "現價所在禁區 (重測次數)",
                 "0.5–0.7 回調區域",
                 "前方流動性目標",
                 "大支持 / 大阻力",
@@ -219,6 +246,10 @@ def main():
         st.session_state.refresh_trigger = 0
     if "assets_data" not in st.session_state:
         st.session_state.assets_data = {}
+    if "pyramids" not in st.session_state:
+        st.session_state.pyramids = {}
+    if "zone_registries" not in st.session_state:
+        st.session_state.zone_registries = {}
 
     if st.button("Refresh Data"):
         st.session_state.refresh_trigger += 1
@@ -229,6 +260,8 @@ def main():
             selected_symbol = SYMBOL_MAP[asset]
             df = fetch_15m_data(selected_symbol, lookback_days=10)
             if not df.empty:
+                # Validate once per fetch; every re-score of this frame then skips validation
+                mark_validated(df)
                 st.session_state.assets_data[asset] = df
         if not st.session_state.assets_data:
             st.error("Data fetch failed.")
@@ -237,10 +270,14 @@ def main():
     assets_data = st.session_state.assets_data
     selected = run_scanner(assets_data)
     df_15m_raw = assets_data[selected]
-    result = score(df_15m_raw, freq_minutes=15)
+    # One pyramid per asset, kept across reruns: refreshed data only resamples new bars
+    pyramid = st.session_state.pyramids.setdefault(selected, ResamplePyramid())
+    # trace: overlays are drawn from the structures the engine used, not recomputed
+    result = score(df_15m_raw, freq_minutes=15, pyramid=pyramid, trace=True)
     df_15m_viz = ensure_asia_hong_kong(df_15m_raw)
     st.divider()
-    deep_structure_view(selected, df_15m_raw, df_15m_viz, result)
+    zones = st.session_state.zone_registries.setdefault(selected, {})
+    deep_structure_view(selected, df_15m_raw, df_15m_viz, result, pyramid, zones)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,208 @@
+"""
+Project99 — Multi-asset batch scoring.
+score_many scores a dict of OHLC frames with a serial, thread or process backend ("auto": a
+process pool only for batches large enough to pay for its start-up).
+Process backend: bar arrays go through one shared-memory block (no pickled DataFrames);
+each asset is isolated — a failing asset returns an error result, the rest still score.
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .engine import _empty_result, _is_validated, _normalize_ohlc, score
+from .scoring_config import resolve_config
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("auto", "serial", "thread", "process")
+# backend="auto" starts a process pool only from this many bars in total: below it, pool start-up
+# and shared-memory packing (~0.1-0.3 s) outweigh the scoring (a few ms per 1k bars)
+PROCESS_MIN_BARS = 100_000
+_OHLC = ("open", "high", "low", "close")
+
+# (asset, offset, n_bars, index kind "datetime" | "range", tz name or None)
+_Slot = Tuple[str, int, int, str, Optional[str]]
+
+
+def _failed_result(exc: BaseException) -> Dict[str, Any]:
+    res = _empty_result()
+    res["error"] = f"Scoring failed: {exc}"
+    return res
+
+
+def _score_one(
+    asset: str,
+    df: pd.DataFrame,
+    freq_minutes: Optional[int],
+    cfg: Any,
+    trusted: bool = False,
+    alerts_only: bool = False,
+) -> Dict[str, Any]:
+    """score() with per-asset isolation (mirrors per-condition isolation in the engine)."""
+    try:
+        return score(df, freq_minutes=freq_minutes, config_obj=cfg, trusted=trusted, alerts_only=alerts_only)
+    except Exception as exc:
+        logger.warning("Asset %r raised: %s", asset, exc, exc_info=True)
+        return _failed_result(exc)
+
+
+def _packable(df: Any) -> bool:
+    """Frames that can be shipped as float arrays; anything else is scored in the parent (and fails validation there)."""
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return False
+    df = _normalize_ohlc(df)
+    if any(c not in df.columns or not pd.api.types.is_numeric_dtype(df[c]) for c in _OHLC):
+        return False
+    return isinstance(df.index, (pd.DatetimeIndex, pd.RangeIndex))
+
+
+def _pack(frames: Dict[str, pd.DataFrame]) -> Tuple[shared_memory.SharedMemory, int, List[_Slot]]:
+    """Copy OHLC + int64 ns timestamps (UTC for tz-aware) of every frame into one shared block: 4 float rows, then 1 int64 row."""
+    total = sum(len(df) for df in frames.values())
+    shm = shared_memory.SharedMemory(create=True, size=max(total, 1) * 8 * 5)
+    prices, stamps = _views(shm.buf, total)
+    slots: List[_Slot] = []
+    offset = 0
+    for asset, df in frames.items():
+        df = _normalize_ohlc(df)
+        n = len(df)
+        for row, col in enumerate(_OHLC):
+            prices[row, offset:offset + n] = df[col].to_numpy(dtype=float)
+        if isinstance(df.index, pd.DatetimeIndex):
+            tz = str(df.index.tz) if df.index.tz is not None else None
+            utc = df.index.tz_convert(None) if tz is not None else df.index
+            stamps[offset:offset + n] = utc.to_numpy(dtype="datetime64[ns]").view(np.int64)
+            slots.append((asset, offset, n, "datetime", tz))
+        else:
+            slots.append((asset, offset, n, "range", None))
+        offset += n
+    return shm, total, slots
+
+
+def _views(buf: Any, total: int) -> Tuple[np.ndarray, np.ndarray]:
+    prices = np.ndarray((4, total), dtype=np.float64, buffer=buf)
+    stamps = np.ndarray((total,), dtype=np.int64, buffer=buf, offset=4 * total * 8)
+    return prices, stamps
+
+
+def _unpack(shm_name: str, total: int, slot: _Slot) -> pd.DataFrame:
+    """Rebuild one asset's frame from the shared block (copied out, so the block can close)."""
+    _, offset, n, kind, tz = slot
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        prices, stamps = _views(shm.buf, total)
+        data = {col: prices[row, offset:offset + n].copy() for row, col in enumerate(_OHLC)}
+        if kind == "datetime":
+            index = pd.DatetimeIndex(stamps[offset:offset + n].copy().view("datetime64[ns]"))
+            if tz is not None:
+                index = index.tz_localize("UTC").tz_convert(tz)
+        else:
+            index = pd.RangeIndex(n)
+        del prices, stamps
+    finally:
+        shm.close()
+    return pd.DataFrame(data, index=index)
+
+
+def _score_slot(
+    shm_name: str,
+    total: int,
+    slot: _Slot,
+    freq_minutes: Optional[int],
+    cfg: Any,
+    trusted: bool,
+    alerts_only: bool = False,
+) -> Dict[str, Any]:
+    """Process-pool task: one asset from shared memory (trusted: validated in the parent, attrs do not cross)."""
+    try:
+        df = _unpack(shm_name, total, slot)
+    except Exception as exc:
+        return _failed_result(exc)
+    return _score_one(slot[0], df, freq_minutes, cfg, trusted, alerts_only)
+
+
+def _pick_backend(frames: Dict[str, pd.DataFrame], backend: str, workers: int) -> str:
+    """Concrete backend for a batch: serial for one worker / asset, "auto" by total bar count."""
+    if workers <= 1 or len(frames) <= 1:
+        return "serial"
+    if backend == "auto":
+        return "process" if sum(len(df) for df in frames.values()) >= PROCESS_MIN_BARS else "thread"
+    return backend
+
+
+def score_many(
+    frames: Dict[str, pd.DataFrame],
+    freq_minutes: Optional[int] = None,
+    config_obj: Any = None,
+    workers: Optional[int] = None,
+    backend: str = "auto",
+    trusted: bool = False,
+    alerts_only: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Score many assets: {asset: score() result}, in the order of frames.
+    backend: "serial", "thread", "process" (scales with cores) or "auto" (default: process from
+    PROCESS_MIN_BARS bars in total, else thread). workers defaults to os.cpu_count().
+    trusted: skip OHLC validation for every asset (frames accepted by mark_validated skip it anyway).
+    alerts_only: score(..., alerts_only=True) per asset (exact alerts, partial breakdown).
+    A failing asset gets the empty result with "error" set; other assets are unaffected.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}")
+    workers = workers or os.cpu_count() or 1
+    backend = _pick_backend(frames, backend, workers)
+
+    if backend == "serial":
+        return {
+            asset: _score_one(asset, df, freq_minutes, config_obj, trusted, alerts_only)
+            for asset, df in frames.items()
+        }
+
+    if backend == "thread":
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                asset: pool.submit(_score_one, asset, df, freq_minutes, config_obj, trusted, alerts_only)
+                for asset, df in frames.items()
+            }
+            return {asset: fut.result() for asset, fut in futures.items()}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    shared = {asset: df for asset, df in frames.items() if _packable(df)}
+    for asset, df in frames.items():
+        if asset not in shared:
+            results[asset] = _score_one(asset, df, freq_minutes, config_obj, trusted, alerts_only)
+    if shared:
+        cfg = resolve_config(config_obj)  # frozen snapshot: pickles to the workers
+        shm, total, slots = _pack(shared)
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(slots))) as pool:
+                futures = {
+                    slot[0]: pool.submit(
+                        _score_slot,
+                        shm.name,
+                        total,
+                        slot,
+                        freq_minutes,
+                        cfg,
+                        trusted or _is_validated(shared[slot[0]]),
+                        alerts_only,
+                    )
+                    for slot in slots
+                }
+                for asset, fut in futures.items():
+                    try:
+                        results[asset] = fut.result()
+                    except Exception as exc:
+                        # Worker died (e.g. BrokenProcessPool): only this asset's result is lost
+                        logger.warning("Asset %r worker failed: %s", asset, exc)
+                        results[asset] = _failed_result(exc)
+        finally:
+            shm.close()
+            shm.unlink()
+    return {asset: results[asset] for asset in frames}
@@ -0,0 +1,52 @@
+"""
+Benchmark: engine resampling (NumPy buckets, 4h from 1h) vs pandas resample (15m → 1h and 4h).
+Run: python -m Project99.benchmark_resample
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+from Project99.engine import _resample_15m_to_1h_4h
+
+AGG = {"open": "first", "high": "max", "low": "min", "close": "last"}
+
+
+def _bars(n: int) -> pd.DataFrame:
+    """n weekday 15m bars (weekend gaps leave empty buckets, as in market data)."""
+    rng = np.random.default_rng(0)
+    close = 1000 + np.cumsum(rng.standard_normal(n) * 0.3)
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + np.abs(rng.standard_normal(n)) * 0.2
+    low = np.minimum(open_, close) - np.abs(rng.standard_normal(n)) * 0.2
+    idx = pd.date_range("2024-01-01", periods=2 * n, freq="15min", tz="UTC")
+    idx = idx[idx.dayofweek < 5][:n]
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close}, index=idx)
+
+
+def _pandas(df: pd.DataFrame) -> None:
+    for rule in ("1h", "4h"):
+        df.resample(rule).agg(AGG).dropna(how="all")
+
+
+def _numpy(df: pd.DataFrame) -> None:
+    _resample_15m_to_1h_4h(df)
+
+
+def main() -> None:
+    print(f"{'bars':>8} {'pandas ms':>10} {'numpy ms':>10} {'speed-up':>9}")
+    for n in (1_000, 10_000, 100_000):
+        df = _bars(n)
+        for got, rule in zip(_resample_15m_to_1h_4h(df), ("1h", "4h")):
+            pd.testing.assert_frame_equal(got, df.resample(rule).agg(AGG).dropna(how="all"))
+        reps = max(3, 20_000 // n)
+        t_pd = min(timeit.repeat(lambda: _pandas(df), number=reps, repeat=5)) / reps * 1000
+        t_np = min(timeit.repeat(lambda: _numpy(df), number=reps, repeat=5)) / reps * 1000
+        print(f"{n:>8} {t_pd:>10.3f} {t_np:>10.3f} {t_pd / t_np:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
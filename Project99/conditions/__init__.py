@@ -1,9 +1,12 @@
 """
 Project99 — One file per condition. Structural + behavioral only.
+Signature: fn(df, config, context=None, trace=None, features=None) → {"long": bool, "short": bool}.
+trace: optional dict the condition fills with the structures it used (score(..., trace=True)).
+features: the frame's shared structural.FrameFeatures (the engine passes one per timeframe).
 """
 
 from .trend import trend
-from .impulse_break import impulse_break
+from .impulse_break import impulse_break, impulse_break_history
 from .stop_hunt import stop_hunt
 from .stop_money import stop_money
 from .zone import zone
@@ -31,3 +34,44 @@ CONDITION_FUNCS = [
 ]
 
 CONDITION_STATUS = {name: "implemented" for name in CONDITION_NAMES}
+
+# Config fields each condition reads: conditions with equal values for these give equal results
+CONDITION_PARAMS = {
+    "trend": ("SWING_LOOKBACK", "SWING_LEFT", "SWING_RIGHT", "RETRACE_MAX_TREND", "RETRACE_RANGE"),
+    "impulse_break": (
+        "IMPULSE_CANDLES_COUNT",
+        "IMPULSE_BODY_RATIO",
+        "IMPULSE_EXTREME_RATIO",
+        "IMPULSE_PRIOR_WINDOW",
+        "WICK_TO_BODY_MAX",
+        "SWING_LEFT",
+        "SWING_RIGHT",
+    ),
+    "stop_hunt": (
+        "DOUBLE_LOOKBACK",
+        "DOUBLE_TOLERANCE_PCT",
+        "RETRACE_MIN_STOP_HUNT",
+        "RETRACE_MAX_STOP_HUNT",
+        "SWING_LEFT",
+        "SWING_RIGHT",
+    ),
+    "stop_money": ("DOUBLE_LOOKBACK", "DOUBLE_TOLERANCE_PCT", "SPACE_DISTANCE_ATR_MULT", "ATR_PERIOD"),
+    "zone": ("ZONE_IMPULSE_BODY_RATIO", "ZONE_WICK_TO_BODY_MAX", "ZONE_REVISIT_TOLERANCE_PCT", "ZONE_MAX_RETESTS"),
+    "fib": (
+        "FIB_PRIMARY",
+        "FIB_SECONDARY",
+        "FIB_STOP_AT_88",
+        "FIB_TOLERANCE_PCT",
+        "IMPULSE_BODY_RATIO",
+        "RR_MIN",
+    ),
+    "session": (
+        "SESSION_ASIA_START_HKT",
+        "SESSION_ASIA_END_HKT",
+        "SESSION_EU_START_HKT",
+        "SESSION_EU_END_HKT",
+        "SESSION_US_START_HKT",
+        "SESSION_US_END_HKT",
+        "SESSION_ASIA_PER_DAY",
+    ),
+}
@@ -5,41 +5,53 @@ Returns {"long": bool, "short": bool}.
 Long = at retrace from low (pullback up). Short = at retrace from high (pullback down).
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+import numpy as np
 import pandas as pd
 
-from .. import config as default_config
-from ..structural import body_size
+from ..scoring_config import resolve_config
+from ..structural import FrameContext, FrameFeatures
 from ..utils import compute_rr_ratio
 
+# Impulse candles are searched among the last FIB_IMPULSE_WINDOW - 1 bars; without one the range is
+# the last FIB_RANGE_BARS bars (also the minimum frame length)
+FIB_IMPULSE_WINDOW = 25
+FIB_RANGE_BARS = 20
 
-def _last_impulse_range(df: pd.DataFrame, body_ratio: float) -> tuple:
-    body = body_size(df["open"], df["close"])
-    avg = body.rolling(10, min_periods=3).mean()
-    for i in range(len(df) - 1, max(len(df) - 25, 0), -1):
-        if avg.iloc[i] > 0 and body.iloc[i] >= avg.iloc[i] * body_ratio:
-            h = float(df["high"].iloc[i:].max())
-            l = float(df["low"].iloc[i:].min())
-            return (h, l)
-    h = float(df["high"].tail(20).max())
-    l = float(df["low"].tail(20).min())
+
+def _last_impulse_range(df: pd.DataFrame, body_ratio: float, features: Optional[FrameFeatures] = None) -> tuple:
+    feats = features if features is not None else FrameFeatures(df)
+    lo = max(len(df) - FIB_IMPULSE_WINDOW, 0) + 1
+    avg = feats.avg_body().to_numpy()[lo:]
+    large = np.flatnonzero((avg > 0) & (feats.body().to_numpy()[lo:] >= avg * body_ratio))
+    if len(large):
+        i = lo + large[-1]
+        return (float(df["high"].iloc[i:].max()), float(df["low"].iloc[i:].min()))
+    h = float(df["high"].tail(FIB_RANGE_BARS).max())
+    l = float(df["low"].tail(FIB_RANGE_BARS).min())
     return (h, l)
 
 
-def fib(df: pd.DataFrame, config: Any = None) -> Dict[str, bool]:
+def fib(
+    df: pd.DataFrame,
+    config: Any = None,
+    context: Optional[FrameContext] = None,
+    trace: Optional[Dict[str, Any]] = None,
+    features: Optional[FrameFeatures] = None,
+) -> Dict[str, bool]:
     out = {"long": False, "short": False}
-    if df.empty or len(df) < 20:
+    if df.empty or len(df) < FIB_RANGE_BARS:
         return out
-    cfg = config or default_config
-    fib_618 = getattr(cfg, "FIB_PRIMARY", 0.618)
-    fib_50 = getattr(cfg, "FIB_SECONDARY", 0.5)
-    fib_88 = getattr(cfg, "FIB_STOP_AT_88", 0.88)
-    tol_pct = getattr(cfg, "FIB_TOLERANCE_PCT", 0.01)
-    body_ratio = getattr(cfg, "IMPULSE_BODY_RATIO", 1.5)
-    min_rr = getattr(cfg, "RR_MIN", 1.3)
+    cfg = resolve_config(config)
+    fib_618 = cfg.FIB_PRIMARY
+    fib_50 = cfg.FIB_SECONDARY
+    fib_88 = cfg.FIB_STOP_AT_88
+    tol_pct = cfg.FIB_TOLERANCE_PCT
+    body_ratio = cfg.IMPULSE_BODY_RATIO
+    min_rr = cfg.RR_MIN
 
-    impulse_high, impulse_low = _last_impulse_range(df, body_ratio)
+    impulse_high, impulse_low = _last_impulse_range(df, body_ratio, features)
     span = impulse_high - impulse_low
     if span <= 0:
         return out
@@ -60,6 +72,14 @@ def fib(df: pd.DataFrame, config: Any = None) -> Dict[str, bool]:
     f618_l = impulse_low + fib_618 * span
     f50_l = impulse_low + fib_50 * span
     f88_l = impulse_low + fib_88 * span
+    if trace is not None:
+        # (level at FIB_SECONDARY, FIB_PRIMARY, FIB_STOP_AT_88) per side
+        trace.update(
+            impulse_high=impulse_high,
+            impulse_low=impulse_low,
+            short_levels=(f50, f618, f88),
+            long_levels=(f50_l, f618_l, f88_l),
+        )
     at_618_l = abs(current - f618_l) <= tol
     at_50_l = abs(current - f50_l) <= tol
     rr_ok_50_l, _ = compute_rr_ratio(current, f88_l, impulse_low, min_rr)
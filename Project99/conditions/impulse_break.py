@@ -2,58 +2,71 @@
 Condition 2: IMPULSE BREAK
 Returns {"long": bool, "short": bool}.
 Long = break above prior structure. Short = break below.
+impulse_break_history evaluates every bar of a backtest frame in one vectorized pass.
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+import numpy as np
 import pandas as pd
 
-from .. import config as default_config
-from ..structural import (
-    body_size,
-    swing_highs,
-    swing_lows,
-    wick_small_relative_to_body,
-)
+from ..scoring_config import resolve_config
+from ..structural import FrameContext, FrameFeatures
 
 
-def impulse_break(df: pd.DataFrame, config: Any = None) -> Dict[str, bool]:
+def impulse_break(
+    df: pd.DataFrame,
+    config: Any = None,
+    context: Optional[FrameContext] = None,
+    trace: Optional[Dict[str, Any]] = None,
+    features: Optional[FrameFeatures] = None,
+) -> Dict[str, bool]:
     out = {"long": False, "short": False}
     if df.empty or len(df) < 15:
         return out
-    cfg = config or default_config
-    n_candles = getattr(cfg, "IMPULSE_CANDLES_COUNT", 3)
-    body_ratio = getattr(cfg, "IMPULSE_BODY_RATIO", 1.5)
-    extreme_ratio = getattr(cfg, "IMPULSE_EXTREME_RATIO", 2.0)
-    wick_ratio = getattr(cfg, "WICK_TO_BODY_MAX", 0.5)
-    left = getattr(cfg, "SWING_LEFT", 2)
-    right = getattr(cfg, "SWING_RIGHT", 2)
-
-    body = body_size(df["open"], df["close"])
-    avg_body = body.rolling(10, min_periods=3).mean()
-    tail = df.tail(n_candles)
-    body_tail = body.tail(n_candles)
-    avg_tail = avg_body.tail(n_candles)
-
-    large = (body_tail.values >= (avg_tail.values * body_ratio)).all()
-    small_wicks = all(
-        wick_small_relative_to_body(tail.iloc[i], wick_ratio)
-        for i in range(len(tail))
-    )
-    three_ok = large and small_wicks
-    one_extreme = (body.tail(3) > avg_body.tail(3) * extreme_ratio).any()
-
-    if not three_ok and not one_extreme:
+    cfg = resolve_config(config)
+    n_candles = cfg.IMPULSE_CANDLES_COUNT
+    body_ratio = cfg.IMPULSE_BODY_RATIO
+    extreme_ratio = cfg.IMPULSE_EXTREME_RATIO
+    wick_ratio = cfg.WICK_TO_BODY_MAX
+    left = cfg.SWING_LEFT
+    right = cfg.SWING_RIGHT
+    feats = features if features is not None else FrameFeatures(df, left, right)
+
+    imp = feats.impulse(body_ratio, wick_ratio, n_candles, extreme_ratio)
+    if trace is not None:
+        bars = set(df.index[-n_candles:]) if imp.run[-1] else set()
+        trace["impulse_bars"] = sorted(bars.union(df.index[-3:][imp.extreme[-3:]]))
+    if not imp.triggered[-1]:
         return out
 
     last_close = float(df["close"].iloc[-1])
-    sh_idx = swing_highs(df, left, right)
-    sl_idx = swing_lows(df, left, right)
-    prior_highs = [df["high"].iloc[i] for i in sh_idx if i < len(df) - n_candles]
-    prior_lows = [df["low"].iloc[i] for i in sl_idx if i < len(df) - n_candles]
+    if context is not None:
+        prior_high, prior_low = context.prior_high, context.prior_low
+    else:
+        sw = feats.pivots(left, right)
+        prior_high = sw.max_high_before(len(df) - n_candles, cfg.IMPULSE_PRIOR_WINDOW)
+        prior_low = sw.min_low_before(len(df) - n_candles, cfg.IMPULSE_PRIOR_WINDOW)
 
-    if prior_highs and last_close > max(prior_highs):
+    if trace is not None:
+        trace.update(prior_high=prior_high, prior_low=prior_low)
+    if prior_high is not None and last_close > prior_high:
         out["long"] = True
-    if prior_lows and last_close < min(prior_lows):
+    if prior_low is not None and last_close < prior_low:
         out["short"] = True
     return out
+
+
+def impulse_break_history(df: pd.DataFrame, config: Any = None) -> pd.DataFrame:
+    """
+    impulse_break(df.iloc[:i + 1], config) for every bar i (no context: df holds the whole history),
+    from the per-bar impulse flags and prior-structure prefix arrays. Columns long / short.
+    """
+    cfg = resolve_config(config)
+    n_candles = cfg.IMPULSE_CANDLES_COUNT
+    feats = FrameFeatures(df, cfg.SWING_LEFT, cfg.SWING_RIGHT)
+    imp = feats.impulse(cfg.IMPULSE_BODY_RATIO, cfg.WICK_TO_BODY_MAX, n_candles, cfg.IMPULSE_EXTREME_RATIO)
+    prior_high, prior_low = feats.prior_extrema(n_candles, cfg.IMPULSE_PRIOR_WINDOW)
+    close = df["close"].to_numpy(dtype=float)
+    ok = imp.triggered & (np.arange(len(df)) >= 14)
+    return pd.DataFrame({"long": ok & (close > prior_high), "short": ok & (close < prior_low)}, index=df.index)
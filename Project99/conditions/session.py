@@ -1,69 +1,77 @@
 """
 Condition 7: SESSION (Behavioral trigger)
-HKT: Asia 05–16, EU 15–24, US 20–05.
+HKT: Asia 05–16, EU 15–24, US 20–05. Breakout level: Asia range of every day in the frame, or
+of the current trading day only (SESSION_ASIA_PER_DAY). Session windows are per-bar hour masks cached on the
+frame's FrameFeatures (the dashboard's Asia-range overlay uses the same helpers).
 Returns {"long": bool, "short": bool}. Long = breakout up, short = breakout down.
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import pandas as pd
 
-from .. import config as default_config
-from ..structural import body_size, dominant_direction
+from ..scoring_config import resolve_config
+from ..structural import FrameContext, FrameFeatures
 
+SESSION_MIN_BARS = 24
+# Trend direction for the strong-opposite filter: pivots of the last SESSION_DIRECTION_LOOKBACK bars
+SESSION_DIRECTION_LOOKBACK = 30
+# Strong opposite move: body of the last SESSION_RECENT_BARS bars vs the SESSION_BODY_WINDOW-bar mean
+SESSION_RECENT_BARS = 5
+SESSION_BODY_WINDOW = 20
 
-def _in_asia_hkt(h: int, start: int, end: int) -> bool:
-    return start <= h < end
 
-
-def _in_eu_hkt(h: int, start: int, end: int) -> bool:
-    if start <= end:
-        return start <= h < end
-    return h >= start or h < end
-
-
-def _in_us_hkt(h: int, start: int, end: int) -> bool:
-    if start > end:
-        return h >= start or h < end
-    return start <= h < end
-
-
-def session(df: pd.DataFrame, config: Any = None) -> Dict[str, bool]:
+def session(
+    df: pd.DataFrame,
+    config: Any = None,
+    context: Optional[FrameContext] = None,
+    trace: Optional[Dict[str, Any]] = None,
+    features: Optional[FrameFeatures] = None,
+) -> Dict[str, bool]:
     out = {"long": False, "short": False}
-    if df.empty or len(df) < 24:
+    if df.empty or len(df) < SESSION_MIN_BARS:
         return out
     if not isinstance(df.index, pd.DatetimeIndex):
         return out
-    cfg = config or default_config
-    asia_start = getattr(cfg, "SESSION_ASIA_START_HKT", 5)
-    asia_end = getattr(cfg, "SESSION_ASIA_END_HKT", 16)
-    eu_start = getattr(cfg, "SESSION_EU_START_HKT", 15)
-    eu_end = getattr(cfg, "SESSION_EU_END_HKT", 24)
-    us_start = getattr(cfg, "SESSION_US_START_HKT", 20)
-    us_end = getattr(cfg, "SESSION_US_END_HKT", 5)
-
-    hours = pd.Series(
-        [getattr(ts, "hour", pd.Timestamp(ts).hour) for ts in df.index],
-        index=df.index,
-    )
-    last_hour = hours.iloc[-1]
-    in_eu = _in_eu_hkt(last_hour, eu_start, eu_end)
-    in_us = _in_us_hkt(last_hour, us_start, us_end)
+    cfg = resolve_config(config)
+    asia_start = cfg.SESSION_ASIA_START_HKT
+    asia_end = cfg.SESSION_ASIA_END_HKT
+    eu_start = cfg.SESSION_EU_START_HKT
+    eu_end = cfg.SESSION_EU_END_HKT
+    us_start = cfg.SESSION_US_START_HKT
+    us_end = cfg.SESSION_US_END_HKT
+    feats = features if features is not None else FrameFeatures(df)
+
+    in_eu = bool(feats.session_mask(eu_start, eu_end)[-1])
+    in_us = bool(feats.session_mask(us_start, us_end)[-1])
     if not in_eu and not in_us:
         return out
 
-    asia_mask = hours.apply(lambda h: _in_asia_hkt(h, asia_start, asia_end))
-    if not asia_mask.any():
-        return out
-    asia_high = df.loc[asia_mask, "high"].max()
-    asia_low = df.loc[asia_mask, "low"].min()
+    per_day = cfg.SESSION_ASIA_PER_DAY
+    if context is not None:
+        if per_day:
+            asia_high, asia_low = context.asia_day_high, context.asia_day_low
+        else:
+            asia_high, asia_low = context.asia_high, context.asia_low
+        if asia_high is None or asia_low is None:
+            return out
+    else:
+        if per_day:
+            asia = feats.asia_day_range(asia_start, asia_end)
+        else:
+            asia = feats.asia_range(asia_start, asia_end)
+        if asia is None:
+            return out
+        asia_high, asia_low = asia
     if pd.isna(asia_high) or pd.isna(asia_low):
         return out
     asia_range = asia_high - asia_low
     if asia_range <= 0:
         return out
 
-    direction = dominant_direction(df, lookback=min(30, len(df) - 1))
+    direction = feats.direction(min(SESSION_DIRECTION_LOOKBACK, len(df) - 1))
+    if trace is not None:
+        trace.update(asia_high=float(asia_high), asia_low=float(asia_low), direction=direction)
     if direction is None:
         return out
 
@@ -71,9 +79,9 @@ def session(df: pd.DataFrame, config: Any = None) -> Dict[str, bool]:
     breakout_up = last_close > asia_high
     breakout_down = last_close < asia_low
 
-    body = body_size(df["open"], df["close"])
-    recent_body = body.tail(5).sum()
-    avg_body = body.rolling(20).mean().iloc[-6:-1].sum()
+    body = feats.body()
+    recent_body = body.tail(SESSION_RECENT_BARS).sum()
+    avg_body = body.rolling(SESSION_BODY_WINDOW).mean().iloc[-SESSION_RECENT_BARS - 1 : -1].sum()
     strong_opposite = False
     if direction == "up" and breakout_down and recent_body > avg_body * 1.2:
         strong_opposite = True
@@ -4,38 +4,41 @@ Structural only. Returns {"long": bool, "short": bool}.
 Long = uptrend intact (retrace <= 0.618). Short = downtrend intact.
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import pandas as pd
 
-from .. import config as default_config
-from ..structural import (
-    dominant_direction,
-    recent_swing_high,
-    recent_swing_low,
-    retracement_depth,
-)
+from ..scoring_config import resolve_config
+from ..structural import FrameContext, FrameFeatures, retracement_depth
 
 
-def trend(df: pd.DataFrame, config: Any = None) -> Dict[str, bool]:
+def trend(
+    df: pd.DataFrame,
+    config: Any = None,
+    context: Optional[FrameContext] = None,
+    trace: Optional[Dict[str, Any]] = None,
+    features: Optional[FrameFeatures] = None,
+) -> Dict[str, bool]:
     out = {"long": False, "short": False}
     if df.empty or len(df) < 20:
         return out
-    cfg = config or default_config
-    lookback = getattr(cfg, "SWING_LOOKBACK", 5) * 3
-    left = getattr(cfg, "SWING_LEFT", 2)
-    right = getattr(cfg, "SWING_RIGHT", 2)
-    max_trend = getattr(cfg, "RETRACE_MAX_TREND", 0.618)
-    range_lim = getattr(cfg, "RETRACE_RANGE", 0.7)
-
-    direction = dominant_direction(df, lookback=min(lookback, len(df) - 1))
+    cfg = resolve_config(config)
+    lookback = cfg.SWING_LOOKBACK * 3
+    left = cfg.SWING_LEFT
+    right = cfg.SWING_RIGHT
+    max_trend = cfg.RETRACE_MAX_TREND
+    range_lim = cfg.RETRACE_RANGE
+    feats = features if features is not None else FrameFeatures(df, left, right)
+
+    direction = feats.direction(min(lookback, len(df) - 1))
     if direction is None:
         return out
 
-    sh = recent_swing_high(df, lookback, left, right)
-    sl = recent_swing_low(df, lookback, left, right)
-    if sh is None or sl is None:
+    sw = feats.pivots(left, right)
+    latest_high, latest_low = sw.latest_high(lookback), sw.latest_low(lookback)
+    if latest_high is None or latest_low is None:
         return out
+    sh, sl = latest_high[1], latest_low[1]
     current = float(df["close"].iloc[-1])
     span = sh - sl
     if span <= 0:
@@ -46,6 +49,8 @@ def trend(df: pd.DataFrame, config: Any = None) -> Dict[str, bool]:
     else:
         depth = retracement_depth(sh, sl, current, "down")
 
+    if trace is not None:
+        trace.update(direction=direction, swing_high=sh, swing_low=sl, depth=depth)
     if depth is None or depth > range_lim:
         return out
     if depth <= max_trend:
@@ -10,6 +10,9 @@ RR_MIN = 1.3        # R:R enforced inside Fib condition only
 
 # Resampling: 15m input → auto 1h, 4h
 RESAMPLE_FREQ_MINUTES = 15
+# Timeframe ladder (mid, trend) as pandas rules, built from any input frequency:
+# e.g. ("1D", "1W") on 4h bars, ("15min", "1h") on 5m bars. None: ("1h", "4h") for 15m input only.
+TIMEFRAME_LADDER = None
 
 # Trend (Condition 1) — structural retracement only
 RETRACE_MAX_TREND = 0.618   # Trend intact if retracement <= this
@@ -24,6 +27,7 @@ SWING_RIGHT = 2
 IMPULSE_CANDLES_COUNT = 3
 IMPULSE_BODY_RATIO = 1.5   # Body vs recent average
 IMPULSE_EXTREME_RATIO = 2.0  # Single candle “extremely large” vs average
+IMPULSE_PRIOR_WINDOW = None  # Prior structure: pivots in the last N bars before the impulse (None: all history)
 WICK_TO_BODY_MAX = 0.5     # Small wick = wick <= body * this
 
 # Stop Hunt / Stop Money (Conditions 3 & 4) — v2.1 liquidity doctrine
@@ -40,6 +44,7 @@ ATR_PERIOD = 20
 ZONE_IMPULSE_BODY_RATIO = 1.2
 ZONE_WICK_TO_BODY_MAX = 0.5
 ZONE_REVISIT_TOLERANCE_PCT = 0.01
+ZONE_MAX_RETESTS = None  # e.g. 2: a zone stops signalling after its second retest (None: never)
 
 # Fibonacci (Condition 6)
 FIB_PRIMARY = 0.618
@@ -57,3 +62,6 @@ SESSION_EU_END_HKT = 24
 # US: 20:00–05:00 (wrap)
 SESSION_US_START_HKT = 20
 SESSION_US_END_HKT = 5  # 05:00 next day
+# Breakout level: False = Asia range over every day in the frame; True = current trading day's
+# Asia range only (trading day opens at SESSION_ASIA_START_HKT)
+SESSION_ASIA_PER_DAY = False
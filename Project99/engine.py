@@ -1,15 +1,27 @@
 """
 Project99 — Scoring Engine (Phase 1 v2.0)
 Structural + behavioral. Directional: long_score / short_score, alert_long / alert_short.
-15m input → auto-resample to 1h and 4h. No EMA. R:R in Fib condition only.
+15m input → auto-resample to 1h and 4h (or any TIMEFRAME_LADDER). No EMA. R:R in Fib condition only.
 """
 
 import logging
+import weakref
+from time import perf_counter
+
+import numpy as np
 import pandas as pd
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from . import config
 from .conditions import CONDITION_NAMES, CONDITION_FUNCS
+from .conditions.fib import FIB_IMPULSE_WINDOW, FIB_RANGE_BARS
+from .conditions.session import SESSION_BODY_WINDOW, SESSION_DIRECTION_LOOKBACK, SESSION_MIN_BARS, SESSION_RECENT_BARS
+from .impulse import AVG_BODY_WINDOW
+from .liquidity import LiquidityBook
+from .profiling import _ACTIVE, lap
+from .resample import ResamplePyramid, TimeframeAlignment, bucket_starts, index_ns, resample_ohlc, rule_width
+from .scoring_config import ScoringConfig, resolve_config
+from .structural import FrameContext, FrameFeatures, trading_days
+from .zones import ZONE_LOOKBACK
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +40,32 @@ def _normalize_ohlc(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def _validate_ohlc(df: pd.DataFrame) -> Tuple[bool, str]:
+# Row checks in the order score() reports them; bit i of a row's code = check i failed
+OHLC_CHECKS = (
+    "High < Low in some rows",
+    "High < Open or Close in some rows",
+    "Low > Open or Close in some rows",
+    "NaN in OHLC",
+    "Non-positive prices",
+)
+# Frames mark_validated accepted: id → (weak reference, _fingerprint when tagged). Keyed on the exact
+# object, so slices, copies and arithmetic results (which inherit df.attrs) are validated again.
+_VALIDATED: Dict[int, Tuple[Any, Tuple[Any, ...]]] = {}
+
+
+def _ohlc_error_codes(df: pd.DataFrame) -> np.ndarray:
+    """Per-row uint8 bitmask of failed OHLC_CHECKS, from one float array (numeric OHLC columns)."""
+    a = df[["open", "high", "low", "close"]].to_numpy(dtype=float, na_value=np.nan)
+    o, h, l, c = a[:, 0], a[:, 1], a[:, 2], a[:, 3]
+    codes = (h < l).astype(np.uint8)
+    codes |= ((h < o) | (h < c)).astype(np.uint8) << 1
+    codes |= ((l > o) | (l > c)).astype(np.uint8) << 2
+    codes |= np.isnan(a).any(axis=1).astype(np.uint8) << 3
+    codes |= (a <= 0).any(axis=1).astype(np.uint8) << 4
+    return codes
+
+
+def _check_columns(df: pd.DataFrame) -> Tuple[bool, str]:
     required = ["open", "high", "low", "close"]
     missing = set(required) - set(df.columns)
     if missing:
@@ -36,66 +73,206 @@ def _validate_ohlc(df: pd.DataFrame) -> Tuple[bool, str]:
     for col in required:
         if not pd.api.types.is_numeric_dtype(df[col]):
             return False, f"Column '{col}' is not numeric"
-    if (df["high"] < df["low"]).any():
-        return False, "High < Low in some rows"
-    if (df["high"] < df["open"]).any() or (df["high"] < df["close"]).any():
-        return False, "High < Open or Close in some rows"
-    if (df["low"] > df["open"]).any() or (df["low"] > df["close"]).any():
-        return False, "Low > Open or Close in some rows"
-    if df[required].isnull().any().any():
-        return False, "NaN in OHLC"
-    if (df[required] <= 0).any().any():
-        return False, "Non-positive prices"
     return True, "OK"
 
 
-def _resample_ohlc(df: pd.DataFrame, rule: str) -> pd.DataFrame:
-    """Resample OHLC: open=first, high=max, low=min, close=last."""
+def _validate_ohlc(df: pd.DataFrame) -> Tuple[bool, str]:
+    valid, msg = _check_columns(df)
+    if not valid:
+        return valid, msg
+    failed = int(np.bitwise_or.reduce(_ohlc_error_codes(df))) if len(df) else 0
+    for bit, check in enumerate(OHLC_CHECKS):
+        if failed & (1 << bit):
+            return False, check
+    return True, "OK"
+
+
+def invalid_ohlc_rows(df: pd.DataFrame) -> pd.Series:
+    """
+    Rows that fail validation: Series indexed like df, value = first failed check (OHLC_CHECKS text).
+    Raises ValueError if OHLC columns are missing or not numeric.
+    """
+    df = _normalize_ohlc(df)
+    valid, msg = _check_columns(df)
+    if not valid:
+        raise ValueError(msg)
+    codes = _ohlc_error_codes(df)
+    rows = np.flatnonzero(codes)
+    # Lowest set bit = first check in report order
+    first = np.log2(codes[rows] & -codes[rows].astype(np.int16)).astype(int)
+    return pd.Series(np.asarray(OHLC_CHECKS, dtype=object)[first], index=df.index[rows], dtype=object)
+
+
+def _fingerprint(df: pd.DataFrame) -> Tuple[Any, ...]:
+    """Row count, index ends and the OHLC columns' buffer addresses: appending rows or replacing a column changes it."""
+    n = len(df)
+    buffers = []
+    for col in df.columns:
+        if str(col).lower() in ("open", "high", "low", "close"):
+            values = df[col]
+            # Extension arrays may copy on conversion: no stable address, so a token equal to nothing else
+            buffers.append(values.to_numpy().ctypes.data if isinstance(values.dtype, np.dtype) else object())
+    return n, (df.index[0], df.index[-1]) if n else (), tuple(buffers)
+
+
+def mark_validated(df: pd.DataFrame) -> Tuple[bool, str]:
+    """
+    Validate once and, if valid, remember this exact frame so score() skips validation on its re-scores.
+    Only the same object with the same rows and column arrays is trusted: derived frames (slices, copies,
+    df * -1, df.shift()) and frames whose rows or columns were replaced are validated again.
+    Call it again after editing values in place.
+    """
+    valid, msg = _validate_ohlc(_normalize_ohlc(df))
+    if valid:
+        key = id(df)
+        _VALIDATED[key] = (weakref.ref(df, lambda _, key=key: _VALIDATED.pop(key, None)), _fingerprint(df))
+    return valid, msg
+
+
+def _is_validated(df: Any) -> bool:
+    """df is a frame mark_validated accepted and has not been changed since (see mark_validated)."""
+    entry = _VALIDATED.get(id(df))
+    if entry is None or entry[0]() is not df:
+        return False
+    try:
+        return entry[1] == _fingerprint(df)
+    except Exception:
+        return False
+
+
+def _resample_ohlc(df: pd.DataFrame, rule: str, origin: Any = "start_day") -> pd.DataFrame:
+    """Resample OHLC: open=first, high=max, low=min, close=last. NumPy buckets when possible, else pandas."""
     if not isinstance(df.index, pd.DatetimeIndex):
         return pd.DataFrame()
+    fast = resample_ohlc(df, rule, origin)
+    if fast is not None:
+        return fast
     agg = {"open": "first", "high": "max", "low": "min", "close": "last"}
-    return df.resample(rule).agg(agg).dropna(how="all")
+    if rule_width(rule) is None:
+        # Calendar rules (1D, 1W): pandas ignores origin for them
+        return df.resample(rule).agg(agg).dropna(how="all")
+    return df.resample(rule, origin=origin).agg(agg).dropna(how="all")
+
+
+DEFAULT_LADDER = ("1h", "4h")
+
+
+def _ladder_rules(cfg: ScoringConfig, freq: Optional[int]) -> Optional[Tuple[str, str]]:
+    """(mid, trend) rules to resample to: TIMEFRAME_LADDER, else 1h / 4h for 15m input, else None."""
+    if cfg.TIMEFRAME_LADDER is not None:
+        return cfg.TIMEFRAME_LADDER
+    return DEFAULT_LADDER if freq == 15 else None
+
+
+def _resample_ladder(
+    df: pd.DataFrame,
+    rules: Tuple[str, ...] = DEFAULT_LADDER,
+    origin: Any = "start_day",
+) -> Tuple[pd.DataFrame, ...]:
+    """
+    One frame per rule, sharing work: a fixed-width level is aggregated from the widest level
+    already built whose width divides it (same origin, so buckets are unions), else from df.
+    """
+    if isinstance(origin, str) and origin == "start_day" and isinstance(df.index, pd.DatetimeIndex) and len(df):
+        origin = df.index.min().normalize()
+    built: List[Tuple[int, pd.DataFrame]] = []
+    out = []
+    for rule in rules:
+        width = rule_width(rule)
+        source = df
+        if width is not None:
+            tiles = [(w, f) for w, f in built if width % w == 0 and not f.empty]
+            if tiles:
+                source = max(tiles, key=lambda wf: wf[0])[1]
+        frame = _resample_ohlc(source, rule, origin)
+        if width is not None:
+            built.append((width, frame))
+        out.append(frame)
+    return tuple(out)
 
 
 def _resample_15m_to_1h_4h(
     df: pd.DataFrame,
+    origin: Any = "start_day",
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    """From 15m DataFrame produce 1h and 4h. Returns (df_1h, df_4h)."""
-    df_1h = _resample_ohlc(df, "1h")
-    df_4h = _resample_ohlc(df, "4h")
+    """From 15m DataFrame produce 1h and 4h (4h aggregated from the 1h bars). Returns (df_1h, df_4h)."""
+    df_1h, df_4h = _resample_ladder(df, DEFAULT_LADDER, origin)
     return df_1h, df_4h
 
 
 def get_resampled(
     df: pd.DataFrame,
     freq_minutes: Optional[int] = 15,
+    pyramid: Optional[ResamplePyramid] = None,
+    config_obj: Any = None,
 ) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
     """
-    Return (df_1h, df_4h) for visualization. Use when freq_minutes=15.
+    Return the (mid, trend) frames score() uses — (df_1h, df_4h) for 15m input — for visualization.
+    (None, None) when score() would not resample (no ladder for freq_minutes, < 16 bars).
+    pyramid: shared ResamplePyramid for this asset (only new bars are resampled).
     """
     df = _normalize_ohlc(df)
-    if freq_minutes != 15 or not isinstance(df.index, pd.DatetimeIndex) or len(df) < 16:
+    rules = _ladder_rules(resolve_config(config_obj), freq_minutes)
+    if rules is None or not isinstance(df.index, pd.DatetimeIndex) or len(df) < 16:
         return None, None
-    return _resample_15m_to_1h_4h(df)
+    if pyramid is not None and pyramid.rules == rules and pyramid.sync(df):
+        return pyramid.resampled()
+    return _resample_ladder(df, rules)
 
 
-def score(
+def get_alignment(
     df: pd.DataFrame,
-    freq_minutes: Optional[int] = None,
+    freq_minutes: Optional[int] = 15,
+    pyramid: Optional[ResamplePyramid] = None,
     config_obj: Any = None,
-) -> Dict[str, Any]:
+) -> Tuple[Optional[TimeframeAlignment], Optional[TimeframeAlignment]]:
     """
-    v2.0 Contract:
-    - Input: OHLC DataFrame with datetime index. Optional freq_minutes (15 → auto 1h, 4h).
-    - Each condition returns {"long": bool, "short": bool}.
-    - long_score / short_score; bias = long_score - short_score.
-    - alert_long = (long_score >= 4), alert_short = (short_score >= 4).
-    - R:R is inside Fib condition only; no top-level rr_valid.
+    (mid, trend) TimeframeAlignment of df's bars to the get_resampled frames — 15m ↔ 1h / 4h
+    positions for slicing with searchsorted instead of timestamp masks. (None, None) when not resampled.
     """
-    cfg = config_obj or config
-    df = _normalize_ohlc(df)
+    df_mid, df_trend = get_resampled(df, freq_minutes, pyramid, config_obj)
+    if df_mid is None:
+        return None, None
+    base = _normalize_ohlc(df).index
+    return TimeframeAlignment(base, df_mid.index), TimeframeAlignment(base, df_trend.index)
+
 
-    default_result = {
+def tail_bars(cfg: Any) -> int:
+    """
+    Bars per timeframe that every condition needs to reproduce its full-frame result
+    (given a FrameContext for the whole-history facts). Derived from config lookbacks plus the
+    conditions' own fixed windows (body average, zone, fib and session constants), read from
+    their modules so bounded mode follows any change to them.
+    """
+    cfg = resolve_config(cfg)
+    left = max(cfg.SWING_LEFT, 2)
+    pivot_lookback = max(cfg.SWING_LOOKBACK * 3, cfg.DOUBLE_LOOKBACK, SESSION_DIRECTION_LOOKBACK)
+    return max(
+        pivot_lookback + left + 1,
+        ZONE_LOOKBACK + AVG_BODY_WINDOW,
+        FIB_IMPULSE_WINDOW + AVG_BODY_WINDOW,
+        FIB_RANGE_BARS,
+        SESSION_BODY_WINDOW + SESSION_RECENT_BARS + 1,
+        cfg.ATR_PERIOD + 1,
+        cfg.IMPULSE_CANDLES_COUNT + AVG_BODY_WINDOW,
+        SESSION_MIN_BARS,
+    )
+
+
+# Condition → timeframe role. trend: 4h, mid: 1h, entry: input frame (lowest).
+CONDITION_TIMEFRAMES = {
+    "trend": "trend",
+    "impulse_break": "mid",
+    "stop_hunt": "mid",
+    "stop_money": "mid",
+    "zone": "mid",
+    "fib": "entry",
+    "session": "mid",
+}
+
+
+def _empty_result() -> Dict[str, Any]:
+    return {
         "long_score": 0,
         "short_score": 0,
         "bias": 0,
@@ -105,57 +282,209 @@ def score(
         "alert_short": False,
     }
 
-    if df.empty:
-        default_result["error"] = "Empty DataFrame"
-        return default_result
 
-    valid, msg = _validate_ohlc(df)
-    if not valid:
-        default_result["error"] = f"Data validation failed: {msg}"
-        return default_result
+def _timeframe_frames(
+    df: pd.DataFrame,
+    df_mid: Optional[pd.DataFrame],
+    df_trend: Optional[pd.DataFrame],
+) -> Dict[str, pd.DataFrame]:
+    """Timeframe assignment: trend on the trend rule (4h, or df), others on the mid rule (1h, or df); fib on lowest (df)."""
+    return {
+        "trend": df_trend if df_trend is not None and len(df_trend) >= 10 else df,
+        "mid": df_mid if df_mid is not None and len(df_mid) >= 10 else df,
+        "entry": df,
+    }
+
 
-    freq = freq_minutes if freq_minutes is not None else getattr(cfg, "RESAMPLE_FREQ_MINUTES", None)
-    df_1h = df_4h = None
-    if freq == 15 and isinstance(df.index, pd.DatetimeIndex) and len(df) >= 16:
-        df_1h, df_4h = _resample_15m_to_1h_4h(df)
+def _label_index(labels_ns: np.ndarray, tz: Any) -> pd.DatetimeIndex:
+    idx = pd.DatetimeIndex(labels_ns.view("datetime64[ns]"))
+    if tz is not None:
+        idx = idx.tz_localize("UTC").tz_convert(tz)
+    return idx
 
-    # Timeframe assignment: trend on 4h (or df), others on 1h (or df); fib on lowest (df)
-    df_trend = df_4h if df_4h is not None and len(df_4h) >= 10 else df
-    df_mid = df_1h if df_1h is not None and len(df_1h) >= 10 else df
-    df_entry = df
 
+def _label_calendar(idx: Any, asia_start: int) -> Dict[str, Any]:
+    """FrameContext.from_arrays hours / days of a frame's bar labels (hours None without a DatetimeIndex)."""
+    if not isinstance(idx, pd.DatetimeIndex):
+        return {"hours": None}
+    return {"hours": np.asarray(idx.hour), "days": trading_days(idx, asia_start)}
+
+
+def _bucket_extremes(
+    times: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    origin: int,
+    width: int,
+    tz: Any,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, pd.DatetimeIndex]:
+    """Per non-empty resample bucket: (label ns, high max, low min, labels) — same buckets as _resample_ohlc."""
+    ids, starts = bucket_starts(times, origin, width)
+    labels = origin + ids[starts] * width
+    return (
+        labels,
+        np.maximum.reduceat(high, starts),
+        np.minimum.reduceat(low, starts),
+        _label_index(labels, tz),
+    )
+
+
+def _bounded_frames(
+    df: pd.DataFrame,
+    rules: Optional[Tuple[str, str]],
+    cfg: ScoringConfig,
+    pyramid: Optional[ResamplePyramid] = None,
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, FrameContext]]:
+    """
+    Bounded mode: every timeframe is cut to its last tail_bars(cfg) bars before any pandas work.
+    Input is trimmed to start at the first bucket of the ladder (rules: fixed-width (mid, trend)
+    or None) that is kept and resampled with the full frame's origin, so the kept buckets are
+    identical. Whole-history facts (spans, Asia extremes, prior pivots) come from one NumPy pass
+    over the bar arrays as FrameContexts. With a synced pyramid the higher bars are only cut.
+    """
+    k = tail_bars(cfg)
+    params = dict(
+        left=cfg.SWING_LEFT,
+        right=cfg.SWING_RIGHT,
+        n_candles=cfg.IMPULSE_CANDLES_COUNT,
+        asia_start=cfg.SESSION_ASIA_START_HKT,
+        asia_end=cfg.SESSION_ASIA_END_HKT,
+        prior_window=cfg.IMPULSE_PRIOR_WINDOW,
+    )
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    asia_start = cfg.SESSION_ASIA_START_HKT
+    base_df = df.tail(k)
+    owner = {id(base_df): FrameContext.from_arrays(high, low, **_label_calendar(df.index, asia_start), **params)}
+    df_mid = df_trend = None
+    if rules is not None and pyramid is not None:
+        df_mid, df_trend = pyramid.resampled()
+        bucket_contexts = [
+            FrameContext.from_arrays(
+                f["high"].to_numpy(), f["low"].to_numpy(), **_label_calendar(f.index, asia_start), **params
+            )
+            for f in (df_mid, df_trend)
+        ]
+        df_mid, df_trend = df_mid.tail(k), df_trend.tail(k)
+        owner[id(df_mid)], owner[id(df_trend)] = bucket_contexts
+    elif rules is not None:
+        times = index_ns(df.index)
+        first = df.index[0].normalize()
+        starts = []
+        bucket_contexts = []
+        for width in map(rule_width, rules):
+            labels, bh, bl, label_idx = _bucket_extremes(times, high, low, first.value, width, df.index.tz)
+            starts.append(labels[max(len(labels) - k, 0)])
+            bucket_contexts.append(FrameContext.from_arrays(bh, bl, **_label_calendar(label_idx, asia_start), **params))
+        start = int(np.searchsorted(times, min(starts), side="left"))
+        df_mid, df_trend = _resample_ladder(df.iloc[start:], rules, origin=first)
+        df_mid, df_trend = df_mid.tail(k), df_trend.tail(k)
+        owner[id(df_mid)], owner[id(df_trend)] = bucket_contexts
+    frames = _timeframe_frames(base_df, df_mid, df_trend)
+    return frames, {role: owner[id(frame)] for role, frame in frames.items()}
+
+
+def _run_condition(
+    name: str,
+    fn: Any,
+    frames: Dict[str, pd.DataFrame],
+    cfg: ScoringConfig,
+    contexts: Optional[Dict[str, FrameContext]],
+    feature_cache: Dict[int, FrameFeatures],
+    trace: Optional[Dict[str, Any]] = None,
+    books: Optional[Dict[str, LiquidityBook]] = None,
+) -> Tuple[bool, bool]:
+    """
+    One condition on its timeframe frame → (long, short). Exceptions are isolated (both False).
+    feature_cache: one FrameFeatures per timeframe frame (pivots, bodies, direction, ATR, ...),
+    memoized across every condition on it. Features are keyed by their parameters, so the cache
+    may be shared by conditions evaluated under different configs (sweep).
+    trace: if given, trace[name] = {"timeframe": role, ...structures the condition recorded}.
+    books: persistent LiquidityBook per timeframe role, synced to the frame's bars; the frame's
+    features return it instead of building one (configs with another DOUBLE_LOOKBACK still build).
+    """
+    try:
+        tf = CONDITION_TIMEFRAMES.get(name, "mid")
+        cdf = frames.get(tf)
+        if cdf is None or cdf.empty or len(cdf) < 5:
+            return False, False
+        features = feature_cache.get(id(cdf))
+        if features is None:
+            book = books.get(tf) if books else None
+            features = feature_cache[id(cdf)] = FrameFeatures(cdf, cfg.SWING_LEFT, cfg.SWING_RIGHT, liquidity=book)
+        context = contexts.get(tf) if contexts else None
+        if trace is not None:
+            trace[name] = {"timeframe": tf}
+            result = fn(cdf, cfg, context=context, trace=trace[name], features=features)
+        else:
+            result = fn(cdf, cfg, context=context, features=features)
+        if isinstance(result, dict) and "long" in result and "short" in result:
+            return bool(result["long"]), bool(result["short"])
+        return False, False
+    except Exception as exc:
+        logger.warning("Condition %r raised: %s", name, exc, exc_info=True)
+        return False, False
+
+
+def _timeframe_labels(frames: Dict[str, pd.DataFrame], rules: Tuple[str, str] = DEFAULT_LADDER) -> Dict[str, str]:
+    """Role → bars it was given: the ladder rule ("4h" / "1h" by default), or "base" (input frame, no resample)."""
+    mid_rule, trend_rule = rules
+    return {
+        "trend": "base" if frames["trend"] is frames["entry"] else trend_rule,
+        "mid": "base" if frames["mid"] is frames["entry"] else mid_rule,
+        "entry": "base",
+    }
+
+
+def _trace_swings(frames: Dict[str, pd.DataFrame], feature_cache: Dict[int, FrameFeatures]) -> Dict[str, Any]:
+    """Swing pivots (configured left / right) of each frame conditions ran on: {"highs": [(time, price)], "lows": [...]}."""
+    out = {}
+    for role, frame in frames.items():
+        features = feature_cache.get(id(frame))
+        if features is None:
+            continue
+        sw = features.swings
+        idx = frame.index
+        out[role] = {
+            "highs": [(idx[p], float(v)) for p, v in zip(sw.high_pos, sw.high_price)],
+            "lows": [(idx[p], float(v)) for p, v in zip(sw.low_pos, sw.low_price)],
+        }
+    return out
+
+
+def _evaluate(
+    frames: Dict[str, pd.DataFrame],
+    cfg: ScoringConfig,
+    contexts: Optional[Dict[str, FrameContext]] = None,
+    trace: Optional[Dict[str, Any]] = None,
+    rules: Optional[Tuple[str, str]] = None,
+    books: Optional[Dict[str, LiquidityBook]] = None,
+) -> Dict[str, Any]:
+    """
+    Run every condition on its timeframe frame and build the directional result.
+    contexts (per timeframe role) carry whole-history facts when frames are bounded tails.
+    trace: if given, filled with timeframes, swings and per-condition structures (see score).
+    rules: the (mid, trend) ladder the frames were resampled to, for the trace labels.
+    books: persistent LiquidityBook per timeframe role (see _run_condition).
+    """
     long_conditions = {}
     short_conditions = {}
+    feature_cache: Dict[int, FrameFeatures] = {}
+    timed = bool(_ACTIVE)
+    condition_trace = {} if trace is not None else None
 
     # Condition order: trend, impulse_break, stop_hunt, stop_money, zone, fib, session
-    run_df = {
-        "trend": df_trend,
-        "impulse_break": df_mid,
-        "stop_hunt": df_mid,
-        "stop_money": df_mid,
-        "zone": df_mid,
-        "fib": df_entry,
-        "session": df_mid,
-    }
-
     for name, fn in zip(CONDITION_NAMES, CONDITION_FUNCS):
-        try:
-            cdf = run_df.get(name, df_mid)
-            if cdf is None or cdf.empty or len(cdf) < 5:
-                long_conditions[name] = False
-                short_conditions[name] = False
-                continue
-            result = fn(cdf, cfg)
-            if isinstance(result, dict) and "long" in result and "short" in result:
-                long_conditions[name] = bool(result["long"])
-                short_conditions[name] = bool(result["short"])
-            else:
-                long_conditions[name] = False
-                short_conditions[name] = False
-        except Exception as exc:
-            logger.warning("Condition %r raised: %s", name, exc, exc_info=True)
-            long_conditions[name] = False
-            short_conditions[name] = False
+        t0 = perf_counter() if timed else 0.0
+        long_conditions[name], short_conditions[name] = _run_condition(
+            name, fn, frames, cfg, contexts, feature_cache, condition_trace, books
+        )
+        if timed:
+            lap(name, t0)
+    if trace is not None:
+        trace["timeframes"] = _timeframe_labels(frames, rules or DEFAULT_LADDER)
+        trace["swings"] = _trace_swings(frames, feature_cache)
+        trace["conditions"] = condition_trace
 
     long_score = sum(1 for v in long_conditions.values() if v)
     short_score = sum(1 for v in short_conditions.values() if v)
@@ -172,3 +501,153 @@ def score(
         "alert_long": alert_long,
         "alert_short": alert_short,
     }
+
+
+# Alert-only mode: conditions cheapest first (mean StageTimer cost on 15m history; same set as CONDITION_NAMES)
+ALERT_ORDER = ("stop_hunt", "stop_money", "trend", "session", "impulse_break", "zone", "fib")
+
+
+def _alert_decided(score_so_far: int, remaining: int, threshold: int) -> bool:
+    """Threshold reached, or out of reach with the conditions left."""
+    return score_so_far >= threshold or score_so_far + remaining < threshold
+
+
+def _evaluate_alerts(
+    frames: Dict[str, pd.DataFrame],
+    cfg: ScoringConfig,
+    contexts: Optional[Dict[str, FrameContext]] = None,
+    books: Optional[Dict[str, LiquidityBook]] = None,
+) -> Dict[str, Any]:
+    """
+    Alert-only evaluation: conditions in ALERT_ORDER, stopping once alert_long and alert_short are
+    both decided. Conditions never run are False and listed in "skipped"; scores count the True ones
+    run (lower bounds), so alert_long / alert_short equal _evaluate's.
+    """
+    threshold = cfg.SCORE_THRESHOLD
+    long_conditions = {n: False for n in CONDITION_NAMES}
+    short_conditions = {n: False for n in CONDITION_NAMES}
+    skipped = set(CONDITION_NAMES)
+    long_score = short_score = 0
+    remaining = len(CONDITION_NAMES)
+    feature_cache: Dict[int, FrameFeatures] = {}
+    timed = bool(_ACTIVE)
+    funcs = dict(zip(CONDITION_NAMES, CONDITION_FUNCS))
+    for name in ALERT_ORDER:
+        if _alert_decided(long_score, remaining, threshold) and _alert_decided(short_score, remaining, threshold):
+            break
+        t0 = perf_counter() if timed else 0.0
+        is_long, is_short = _run_condition(name, funcs[name], frames, cfg, contexts, feature_cache, books=books)
+        if timed:
+            lap(name, t0)
+        long_conditions[name], short_conditions[name] = is_long, is_short
+        skipped.discard(name)
+        long_score += is_long
+        short_score += is_short
+        remaining -= 1
+
+    return {
+        "long_score": long_score,
+        "short_score": short_score,
+        "bias": long_score - short_score,
+        "long_conditions": long_conditions,
+        "short_conditions": short_conditions,
+        "alert_long": long_score >= threshold,
+        "alert_short": short_score >= threshold,
+        "skipped": skipped,
+    }
+
+
+def score(
+    df: pd.DataFrame,
+    freq_minutes: Optional[int] = None,
+    config_obj: Any = None,
+    bounded: bool = False,
+    pyramid: Optional[ResamplePyramid] = None,
+    trusted: bool = False,
+    trace: bool = False,
+    alerts_only: bool = False,
+) -> Dict[str, Any]:
+    """
+    v2.0 Contract:
+    - Input: OHLC DataFrame with datetime index. Optional freq_minutes (15 → auto 1h, 4h).
+      config TIMEFRAME_LADDER = (mid, trend) rules resamples any input instead (e.g. ("1D", "1W")
+      on 4h bars, ("15min", "1h") on 5m bars); trend runs on the trend rule, impulse_break /
+      stop_hunt / stop_money / zone / session on the mid rule, fib on the input.
+    - config_obj: ScoringConfig (or a config module / namespace, snapshotted per call).
+    - Each condition returns {"long": bool, "short": bool}.
+    - long_score / short_score; bias = long_score - short_score.
+    - alert_long = (long_score >= 4), alert_short = (short_score >= 4).
+    - R:R is inside Fib condition only; no top-level rr_valid.
+    - bounded=True: conditions see only the last tail_bars(config) bars per timeframe
+      (plus whole-history FrameContexts); same result, cost no longer grows with history.
+      Needs a sorted index; otherwise falls back to full-history scoring.
+    - pyramid: ResamplePyramid shared with the visualization layer; the ladder bars come from it
+      (synced to df, appending only new bars) instead of a fresh resample. Used only when its
+      rules are the ladder's. Calendar ladder rules (1D, 1W) make bounded fall back to full.
+      stop_money's blocking levels come from the pyramid's persistent LiquidityBook of the mid rule.
+    - trusted=True (or the very frame mark_validated accepted, unchanged): OHLC validation is skipped.
+    - Inside `with profiling.StageTimer():` wall time is recorded per stage (normalize, validate,
+      resample, each condition, score).
+    - trace=True: result["trace"] holds the structures behind the result, for overlays:
+      timeframes (role → ladder rule, e.g. "4h" / "1h", or "base"), swings (role → pivot (time, price) lists) and
+      conditions (name → {"timeframe": role, ...what the condition recorded, times as index labels}).
+    - alerts_only=True: only alert_long / alert_short are exact. Conditions run cheapest-first
+      (ALERT_ORDER) and stop once both alerts are decided; result["skipped"] is the set of names
+      not run (False in the condition dicts) and scores count the True ones that ran.
+      Ignored when trace=True (full evaluation).
+    """
+    timed = bool(_ACTIVE)
+    t0 = start = perf_counter() if timed else 0.0
+    cfg = resolve_config(config_obj)
+    trusted = trusted or _is_validated(df)
+    df = _normalize_ohlc(df)
+    if timed:
+        t0 = lap("normalize", t0)
+
+    default_result = _empty_result()
+
+    if df.empty:
+        default_result["error"] = "Empty DataFrame"
+        return default_result
+
+    if not trusted:
+        valid, msg = _validate_ohlc(df)
+        if timed:
+            t0 = lap("validate", t0)
+        if not valid:
+            default_result["error"] = f"Data validation failed: {msg}"
+            return default_result
+
+    freq = freq_minutes if freq_minutes is not None else cfg.RESAMPLE_FREQ_MINUTES
+    rules = _ladder_rules(cfg, freq)
+    if not (isinstance(df.index, pd.DatetimeIndex) and len(df) >= 16):
+        rules = None
+    if pyramid is not None and not (rules is not None and pyramid.rules == rules and pyramid.sync(df)):
+        pyramid = None
+    fixed_width = rules is None or None not in map(rule_width, rules)
+    contexts = None
+    if bounded and fixed_width and df.index.is_monotonic_increasing:
+        frames, contexts = _bounded_frames(df, rules, cfg, pyramid)
+    else:
+        df_mid = df_trend = None
+        if pyramid is not None:
+            df_mid, df_trend = pyramid.resampled()
+        elif rules is not None:
+            df_mid, df_trend = _resample_ladder(df, rules)
+        frames = _timeframe_frames(df, df_mid, df_trend)
+    books = None
+    if pyramid is not None:
+        books = {role: pyramid.book(rule, cfg.DOUBLE_LOOKBACK) for role, rule in zip(("mid", "trend"), rules)}
+    if timed:
+        lap("resample", t0)
+
+    if alerts_only and not trace:
+        result = _evaluate_alerts(frames, cfg, contexts, books)
+    else:
+        structures: Optional[Dict[str, Any]] = {} if trace else None
+        result = _evaluate(frames, cfg, contexts, structures, rules, books)
+        if trace:
+            result["trace"] = structures
+    if timed:
+        lap("score", start)
+    return result
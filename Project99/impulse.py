@@ -0,0 +1,86 @@
+"""
+Project99 — Vectorized impulse-candle features.
+impulse_features turns a frame's OHLC arrays into per-bar flags in one NumPy pass: large body vs the
+10-bar mean body, small wicks vs body, runs of consecutive impulse candles and extreme candles.
+impulse_break, the zone condition and ZoneRegistry read these flags instead of looping over rows,
+so a whole backtest history is flagged at once.
+"""
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+AVG_BODY_WINDOW = 10
+AVG_BODY_MIN_PERIODS = 3
+
+
+class ImpulseFeatures(NamedTuple):
+    """
+    Per-bar arrays of one frame (see impulse_features).
+    large: body >= avg_body * body_ratio. small_wick: wick <= body * wick_ratio (never for zero bodies).
+    run: the bar ends n_candles consecutive large, small-wick bars (the frame start allows fewer).
+    extreme: body > avg_body * extreme_ratio.
+    triggered: impulse_break's candle test at the bar: a run, or an extreme candle among the last 3 bars.
+    """
+
+    body: np.ndarray
+    avg_body: np.ndarray
+    large: np.ndarray
+    small_wick: np.ndarray
+    run: np.ndarray
+    extreme: np.ndarray
+    triggered: np.ndarray
+
+
+def mean_body(body: np.ndarray) -> np.ndarray:
+    """10-bar mean body (min 3 bars), same values as FrameFeatures.avg_body."""
+    return pd.Series(body).rolling(AVG_BODY_WINDOW, min_periods=AVG_BODY_MIN_PERIODS).mean().to_numpy()
+
+
+def window_all(mask: np.ndarray, k: int) -> np.ndarray:
+    """mask[i - k + 1 : i + 1].all() for every bar i (shorter windows at the start)."""
+    bad = np.r_[0, np.cumsum(~mask)]
+    i = np.arange(1, len(mask) + 1)
+    return bad[i] == bad[np.maximum(i - k, 0)]
+
+
+def window_any(mask: np.ndarray, k: int) -> np.ndarray:
+    """mask[i - k + 1 : i + 1].any() for every bar i."""
+    return ~window_all(~mask, k)
+
+
+def impulse_features(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    body_ratio: float,
+    wick_ratio: float,
+    n_candles: int = 1,
+    extreme_ratio: float = np.inf,
+    avg_body: Optional[np.ndarray] = None,
+) -> ImpulseFeatures:
+    """
+    Impulse flags for every bar. n_candles = 1 makes run the single-candle rule (zone origins).
+    avg_body: precomputed mean body (e.g. FrameFeatures.avg_body) to share it across callers.
+    """
+    body = np.abs(close - open_)
+    if avg_body is None:
+        avg_body = mean_body(body)
+    range_ = high - low
+    wick = np.where(range_ >= body, range_ - body, 0.0)
+    with np.errstate(invalid="ignore"):  # 0 * inf (no extreme ratio): NaN, never extreme
+        large = body >= avg_body * body_ratio
+        small_wick = (body > 0) & (wick <= body * wick_ratio)
+        extreme = body > avg_body * extreme_ratio
+    run = window_all(large & small_wick, n_candles)
+    return ImpulseFeatures(
+        body=body,
+        avg_body=avg_body,
+        large=large,
+        small_wick=small_wick,
+        run=run,
+        extreme=extreme,
+        triggered=run | window_any(extreme, 3),
+    )
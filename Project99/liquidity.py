@@ -0,0 +1,168 @@
+"""
+Project99 — Liquidity level book.
+LiquidityBook keeps one timeframe's swing highs and lows in price-sorted lists: "is any level beyond
+the target" (stop money's blocking structure), nearest level above / below a price and the top-N
+levels are bisect lookups instead of scans over every pivot. Levels carry their bar position and
+leave the book once they are more than `window` bars old (time-window eviction, oldest first).
+A book kept per timeframe (ResamplePyramid.book, the streaming frames) follows the bars with
+sync_bars: only new pivots are confirmed, so stop money and the blocking overlays read one
+persistent book instead of rebuilding it from every pivot of the frame.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+KINDS = ("high", "low")
+
+
+class LiquidityBook:
+    """
+    Swing levels of one timeframe. Add pivots in position order (add), move the current bar with
+    advance(n): with a window, levels at positions < n - window are evicted (the "last window bars"
+    of SwingIndex). Queries only see the levels still in the book. With a window the lists hold at
+    most the pivots of window bars, so inserts and deletes stay cheap however long the history.
+    Or let sync_bars(highs, lows) find the left / right pivots of the bars itself.
+    """
+
+    __slots__ = ("window", "left", "right", "n", "_checked", "_tentative", "_prices", "_keys", "_queue")
+
+    def __init__(self, window: Optional[int] = None, left: int = 2, right: int = 2) -> None:
+        self.window = window
+        self.left = left
+        self.right = right
+        self.n = 0  # bars seen (current bar: n - 1)
+        self._checked = left  # sync_bars: next position to confirm as pivot / not pivot
+        # sync_bars: (kind, pos, price) of the pivot next to the last bar, which may still be forming
+        self._tentative: List[Tuple[str, int, float]] = []
+        # Per kind: sorted prices, sorted (price, pos) for removal, (pos, price) in position order
+        self._prices: Dict[str, List[float]] = {k: [] for k in KINDS}
+        self._keys: Dict[str, List[Tuple[float, int]]] = {k: [] for k in KINDS}
+        self._queue: Dict[str, Deque[Tuple[int, float]]] = {k: deque() for k in KINDS}
+
+    @classmethod
+    def from_pivots(
+        cls,
+        n: int,
+        highs: Tuple[Iterable[int], Iterable[float]],
+        lows: Tuple[Iterable[int], Iterable[float]],
+        window: Optional[int] = None,
+    ) -> "LiquidityBook":
+        """
+        Book of a whole frame of n bars from (positions, prices) of its swing highs / lows (ascending
+        positions), sorted once. Only the pivots inside the window are read.
+        """
+        book = cls(window)
+        book.n = n
+        for kind, (pos, price) in zip(KINDS, (highs, lows)):
+            pos = np.asarray(pos, dtype=np.int64)
+            price = np.asarray(price, dtype=float)
+            i = int(np.searchsorted(pos, n - window)) if window is not None else 0
+            items = list(zip(pos[i:].tolist(), price[i:].tolist()))
+            book._queue[kind].extend(items)
+            book._keys[kind] = sorted((x, p) for p, x in items)
+            book._prices[kind] = [x for x, _ in book._keys[kind]]
+        return book
+
+    def add(self, kind: str, pos: int, price: float) -> None:
+        """One swing level (kind "high" / "low") at bar pos; positions must not decrease per kind."""
+        price = float(price)
+        self._insert(kind, pos, price)
+        self._queue[kind].append((pos, price))
+        self.n = max(self.n, pos + 1)
+
+    def _insert(self, kind: str, pos: int, price: float) -> None:
+        key = (price, pos)
+        i = bisect_left(self._keys[kind], key)
+        self._keys[kind].insert(i, key)
+        self._prices[kind].insert(i, price)
+
+    def _remove(self, kind: str, pos: int, price: float) -> None:
+        i = bisect_left(self._keys[kind], (price, pos))
+        del self._keys[kind][i]
+        del self._prices[kind][i]
+
+    def _is_pivot(self, values: Sequence[float], i: int, kind: str) -> bool:
+        """values[i] is a left / right swing of kind (same rule as pivot_mask: ties count, NaN never)."""
+        v = values[i]
+        window = values[i - self.left : i + self.right + 1]
+        if kind == "high":
+            return all(x <= v for x in window)
+        return all(x >= v for x in window)
+
+    def sync_bars(self, highs: Sequence[float], lows: Sequence[float], start: int = 0) -> "LiquidityBook":
+        """
+        Follow a frame's bars: highs / lows hold bars start .. n - 1 (earlier ones may have been
+        trimmed) and only ever grow, the last one possibly still forming. Pivots whose right
+        neighbours are all closed are confirmed once; the pivot next to the last bar is checked on
+        its current values every call and replaced by the next call. Levels then equal
+        FrameFeatures(frame).liquidity(window) on the same bars. Returns the book.
+        """
+        for kind, pos, price in self._tentative:
+            self._remove(kind, pos, price)
+        self._tentative = []
+        n = start + len(highs)
+        first = start + self.left
+        if self.window is not None:
+            first = max(first, n - self.window)  # older pivots would be evicted right away
+        self._checked = max(self._checked, first)
+        stop = n - 1 - self.right  # pivots before stop only read closed bars
+        for p in range(self._checked, stop):
+            for kind, values in zip(KINDS, (highs, lows)):
+                if self._is_pivot(values, p - start, kind):
+                    self.add(kind, p, values[p - start])
+        self._checked = max(self._checked, stop)
+        self.advance(n)
+        if stop >= first:
+            for kind, values in zip(KINDS, (highs, lows)):
+                if self._is_pivot(values, stop - start, kind):
+                    price = float(values[stop - start])
+                    self._insert(kind, stop, price)
+                    self._tentative.append((kind, stop, price))
+        return self
+
+    def advance(self, n: int) -> None:
+        """Current bar count is n: evict levels older than the window."""
+        self.n = n
+        if self.window is None:
+            return
+        first = n - self.window
+        for kind in KINDS:
+            queue = self._queue[kind]
+            while queue and queue[0][0] < first:
+                self._remove(kind, *queue.popleft())
+
+    def levels(self, kind: str) -> List[float]:
+        """Prices of the kind's levels, ascending."""
+        return list(self._prices[kind])
+
+    def max_high_above(self, price: float) -> Optional[float]:
+        """Highest swing high above price, or None (same value as SwingIndex.max_high_above)."""
+        highs = self._prices["high"]
+        return highs[-1] if highs and highs[-1] > price else None
+
+    def min_low_below(self, price: float) -> Optional[float]:
+        """Lowest swing low below price, or None."""
+        lows = self._prices["low"]
+        return lows[0] if lows and lows[0] < price else None
+
+    def nearest_above(self, price: float, kind: str = "high") -> Optional[float]:
+        """Lowest level of kind strictly above price (the first one in the way up), or None."""
+        prices = self._prices[kind]
+        i = bisect_right(prices, price)
+        return prices[i] if i < len(prices) else None
+
+    def nearest_below(self, price: float, kind: str = "low") -> Optional[float]:
+        """Highest level of kind strictly below price, or None."""
+        prices = self._prices[kind]
+        i = bisect_left(prices, price)
+        return prices[i - 1] if i else None
+
+    def top(self, kind: str, count: int) -> List[float]:
+        """The count outermost levels: highest highs (descending) or lowest lows (ascending)."""
+        prices = self._prices[kind]
+        if kind == "high":
+            return prices[max(len(prices) - count, 0) :][::-1]
+        return prices[:count]
@@ -0,0 +1,123 @@
+"""
+Project99 — Packed condition results for score histories.
+One uint16 per bar: bit j = long condition j, bit 7 + j = short condition j (CONDITION_NAMES order),
+bit 15 = the bar's score() carried an error. Scores, bias and alerts are derived on unpack
+(popcount + SCORE_THRESHOLD), so the dict / score_history formats round-trip losslessly;
+error messages are the only thing not stored in the code.
+"""
+
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .conditions import CONDITION_NAMES
+from .scoring_config import resolve_config
+
+N_CONDITIONS = len(CONDITION_NAMES)
+SHORT_SHIFT = N_CONDITIONS
+CONDITION_MASK = (1 << N_CONDITIONS) - 1
+ERROR_BIT = 1 << 15
+
+_BIT_VALUES = (1 << np.arange(N_CONDITIONS)).astype(np.uint16)
+_POPCOUNT = np.array([bin(v).count("1") for v in range(1 << N_CONDITIONS)], dtype=np.int64)
+
+
+def _threshold(threshold: Optional[int]) -> int:
+    return resolve_config().SCORE_THRESHOLD if threshold is None else threshold
+
+
+def pack_result(result: Dict[str, Any]) -> int:
+    """score() dict → packed code."""
+    code = 0
+    for j, name in enumerate(CONDITION_NAMES):
+        if result["long_conditions"].get(name):
+            code |= 1 << j
+        if result["short_conditions"].get(name):
+            code |= 1 << (SHORT_SHIFT + j)
+    if result.get("error"):
+        code |= ERROR_BIT
+    return code
+
+
+def unpack_result(code: int, threshold: Optional[int] = None, error: Optional[str] = None) -> Dict[str, Any]:
+    """Packed code → score() dict (threshold defaults to config SCORE_THRESHOLD; error: message for bit 15)."""
+    code = int(code)
+    long_conditions = {name: bool(code >> j & 1) for j, name in enumerate(CONDITION_NAMES)}
+    short_conditions = {name: bool(code >> (SHORT_SHIFT + j) & 1) for j, name in enumerate(CONDITION_NAMES)}
+    long_score = sum(long_conditions.values())
+    short_score = sum(short_conditions.values())
+    failed = bool(code & ERROR_BIT)
+    threshold = _threshold(threshold)
+    result = {
+        "long_score": long_score,
+        "short_score": short_score,
+        "bias": long_score - short_score,
+        "long_conditions": long_conditions,
+        "short_conditions": short_conditions,
+        "alert_long": not failed and long_score >= threshold,
+        "alert_short": not failed and short_score >= threshold,
+    }
+    if failed:
+        result["error"] = error
+    return result
+
+
+def pack_conditions(longs: np.ndarray, shorts: np.ndarray, errors: Optional[np.ndarray] = None) -> np.ndarray:
+    """(n, 7) bool long / short condition arrays (+ optional error flags) → uint16 codes."""
+    codes = longs.astype(np.uint16) @ _BIT_VALUES
+    codes |= (shorts.astype(np.uint16) @ _BIT_VALUES) << SHORT_SHIFT
+    if errors is not None:
+        codes |= np.where(errors, ERROR_BIT, 0).astype(np.uint16)
+    return codes.astype(np.uint16)
+
+
+def long_scores(codes: np.ndarray) -> np.ndarray:
+    """Vectorized popcount of the long bits."""
+    return _POPCOUNT[np.asarray(codes) & CONDITION_MASK]
+
+
+def short_scores(codes: np.ndarray) -> np.ndarray:
+    """Vectorized popcount of the short bits."""
+    return _POPCOUNT[(np.asarray(codes) >> SHORT_SHIFT) & CONDITION_MASK]
+
+
+def pack_history(history: pd.DataFrame) -> pd.Series:
+    """score_history DataFrame → uint16 Series on the same index."""
+    longs = history[[f"long_{n}" for n in CONDITION_NAMES]].to_numpy(dtype=bool)
+    shorts = history[[f"short_{n}" for n in CONDITION_NAMES]].to_numpy(dtype=bool)
+    errors = history["error"].notna().to_numpy() if "error" in history else None
+    return pd.Series(pack_conditions(longs, shorts, errors), index=history.index, name="code")
+
+
+def unpack_history(
+    codes: Any,
+    index: Optional[pd.Index] = None,
+    threshold: Optional[int] = None,
+    errors: Optional[Sequence[Optional[str]]] = None,
+) -> pd.DataFrame:
+    """
+    uint16 codes (array or Series) → score_history DataFrame: long_<condition>, short_<condition>,
+    long_score, short_score, bias, alert_long, alert_short, error (messages from errors, else None).
+    """
+    if index is None and isinstance(codes, pd.Series):
+        index = codes.index
+    codes = np.asarray(codes, dtype=np.uint16)
+    failed = (codes & ERROR_BIT).astype(bool)
+    threshold = _threshold(threshold)
+    data: Dict[str, Any] = {}
+    for j, name in enumerate(CONDITION_NAMES):
+        data[f"long_{name}"] = (codes >> j & 1).astype(bool)
+    for j, name in enumerate(CONDITION_NAMES):
+        data[f"short_{name}"] = (codes >> (SHORT_SHIFT + j) & 1).astype(bool)
+    long_score = long_scores(codes)
+    short_score = short_scores(codes)
+    data["long_score"] = long_score
+    data["short_score"] = short_score
+    data["bias"] = long_score - short_score
+    data["alert_long"] = ~failed & (long_score >= threshold)
+    data["alert_short"] = ~failed & (short_score >= threshold)
+    if errors is None:
+        errors = [None] * len(codes)
+    data["error"] = np.array(list(errors), dtype=object)
+    return pd.DataFrame(data, index=index)
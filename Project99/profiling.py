@@ -0,0 +1,90 @@
+"""
+Project99 — Opt-in per-stage timing for score().
+While a StageTimer is active (with StageTimer() as timer: ...), score() records wall time per stage:
+normalize, validate, resample, each condition (by name) and score (whole call). Samples accumulate
+over many calls; summary() gives count / total / percentiles per stage, dump() prints or writes CSV.
+Disabled cost is one list truthiness check per call. Conditions are also timed under StreamingScorer /
+score_history. Timers see calls from every thread of this process (score_many thread backend),
+not from process-pool workers.
+"""
+
+import sys
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, TextIO, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Timers currently collecting; engine checks truthiness before reading the clock
+_ACTIVE: List["StageTimer"] = []
+
+
+def timing_enabled() -> bool:
+    return bool(_ACTIVE)
+
+
+def lap(stage: str, t0: float) -> float:
+    """Record perf_counter() - t0 as one sample of stage on every active timer; returns the new clock."""
+    now = perf_counter()
+    for timer in _ACTIVE:
+        timer.add(stage, now - t0)
+    return now
+
+
+class StageTimer:
+    """
+    Collects stage wall times (seconds) while entered; re-entering keeps adding to the same samples.
+    callback(stage, seconds): optional, called for every sample (e.g. to forward to a metrics client).
+    """
+
+    def __init__(self, callback: Optional[Callable[[str, float], None]] = None) -> None:
+        self.callback = callback
+        self.samples: Dict[str, List[float]] = {}
+
+    def __enter__(self) -> "StageTimer":
+        _ACTIVE.append(self)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        _ACTIVE.remove(self)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.samples.setdefault(stage, []).append(seconds)
+        if self.callback is not None:
+            self.callback(stage, seconds)
+
+    def reset(self) -> None:
+        self.samples = {}
+
+    def summary(self, percentiles: Sequence[float] = (50, 90, 99)) -> pd.DataFrame:
+        """One row per stage (slowest total first): count, total_ms, mean_ms, p<q>_ms..., max_ms."""
+        rows = []
+        for stage, values in self.samples.items():
+            ms = np.asarray(values) * 1000.0
+            row = {"stage": stage, "count": len(ms), "total_ms": ms.sum(), "mean_ms": ms.mean()}
+            for q, v in zip(percentiles, np.percentile(ms, percentiles)):
+                row[f"p{q:g}_ms"] = v
+            row["max_ms"] = ms.max()
+            rows.append(row)
+        columns = ["count", "total_ms", "mean_ms"] + [f"p{q:g}_ms" for q in percentiles] + ["max_ms"]
+        if not rows:
+            return pd.DataFrame(columns=columns, index=pd.Index([], name="stage"))
+        return pd.DataFrame(rows).set_index("stage").sort_values("total_ms", ascending=False)[columns]
+
+    def histogram(self, stage: str, bins: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+        """(counts, edges in ms) over log-spaced bins for one stage's samples."""
+        ms = np.asarray(self.samples.get(stage, []), dtype=float) * 1000.0
+        if not len(ms):
+            return np.zeros(bins, dtype=np.int64), np.zeros(bins + 1)
+        lo = max(ms.min(), 1e-6)
+        hi = max(ms.max(), lo * 1.0001)
+        return np.histogram(np.clip(ms, lo, hi), bins=np.geomspace(lo, hi, bins + 1))
+
+    def dump(self, path: Optional[str] = None, file: Optional[TextIO] = None) -> pd.DataFrame:
+        """Print summary() (to file, default stdout), or write it as CSV to path. Returns the summary."""
+        table = self.summary()
+        if path is not None:
+            table.to_csv(path)
+        else:
+            print(table.round(3).to_string(), file=file or sys.stdout)
+        return table
@@ -0,0 +1,294 @@
+"""
+Project99 — OHLC resampling without pandas resample.
+resample_ohlc: integer bucket ids from the int64 epoch index, aggregated with reduceat.
+Fixed-width rules only ("15min", "1h", "4h", ...); calendar rules ("1D", "1W") stay with pandas.
+ResamplePyramid (15m → 1h → 4h by default): same bars, kept bar by bar so appending new bars is O(1).
+Both match engine._resample_ohlc (origin: first day's midnight, empty buckets dropped).
+The last bar of each pyramid level may still be forming; it is updated in place and marked open.
+TimeframeAlignment: integer map between input bars and one higher timeframe, built once per dataset.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Day, Tick
+
+from .liquidity import LiquidityBook
+
+_HOUR_NS = 3_600_000_000_000
+LEVELS = {"1h": _HOUR_NS, "4h": 4 * _HOUR_NS}
+_OHLC = ("open", "high", "low", "close")
+
+
+def rule_width(rule: str) -> Optional[int]:
+    """
+    Bucket width in ns of a fixed-width pandas rule ("15min", "1h", "4h", "24h"); None for calendar
+    rules ("1D", "1W", "1M") whose buckets follow the calendar (DST, week anchors).
+    Raises ValueError for strings pandas does not parse as a frequency.
+    """
+    if rule in LEVELS:
+        return LEVELS[rule]
+    offset = to_offset(rule)
+    if isinstance(offset, Tick) and not isinstance(offset, Day):
+        return int(offset.nanos)
+    return None
+
+
+def index_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    """int64 ns per bar: UTC for tz-aware, wall time for naive (Timestamp.value convention)."""
+    if index.tz is not None:
+        index = index.tz_convert(None)
+    return index.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def bucket_starts(times: np.ndarray, origin: int, width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """For sorted int64 times: (bucket id per bar, position of the first bar of each non-empty bucket)."""
+    ids = (times - origin) // width
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    return ids, starts
+
+
+def resample_ohlc(df: pd.DataFrame, rule: str, origin: Any = "start_day") -> Optional[pd.DataFrame]:
+    """
+    NumPy resample for fixed-width rules: open=first, high=max, low=min, close=last per bucket.
+    Same frame as df.resample(rule, origin=origin).agg(...).dropna(how="all") — index unit,
+    tz, name and freq (set only when no bucket is empty). None when the input needs pandas:
+    calendar rules, other origins, unsorted index, non-float64 columns or NaN.
+    """
+    width = rule_width(rule)
+    idx = df.index
+    if width is None or len(df) == 0 or not idx.is_monotonic_increasing:
+        return None
+    if isinstance(origin, str):
+        if origin != "start_day":
+            return None
+        origin = idx[0].normalize()
+    cols = [df[c].to_numpy() for c in _OHLC]
+    if any(col.dtype != np.float64 for col in cols) or any(np.isnan(col).any() for col in cols):
+        return None
+    ids, starts = bucket_starts(index_ns(idx), pd.Timestamp(origin).value, width)
+    ends = np.r_[starts[1:], len(df)] - 1
+    labels = pd.Timestamp(origin).value + ids[starts] * width
+    if ids[-1] - ids[0] + 1 == len(starts):
+        first = pd.Timestamp(labels[0], tz="UTC").tz_convert(idx.tz) if idx.tz is not None else pd.Timestamp(labels[0])
+        out_idx = pd.date_range(first, periods=len(starts), freq=rule, name=idx.name)
+    else:
+        out_idx = pd.DatetimeIndex(labels.view("datetime64[ns]"), name=idx.name)
+        if idx.tz is not None:
+            out_idx = out_idx.tz_localize("UTC").tz_convert(idx.tz)
+    if hasattr(idx, "unit"):
+        # pandas >= 2 keeps the input resolution (pandas 1.x is always ns)
+        out_idx = out_idx.as_unit(idx.unit)
+    return pd.DataFrame(
+        {
+            "open": cols[0][starts],
+            "high": np.maximum.reduceat(cols[1], starts),
+            "low": np.minimum.reduceat(cols[2], starts),
+            "close": cols[3][ends],
+        },
+        index=out_idx,
+    )
+
+
+def nearest_positions(index: pd.DatetimeIndex, times: Any) -> np.ndarray:
+    """
+    Position in sorted index of the bar nearest to each time (ties → later bar), in one searchsorted:
+    same as index.get_indexer(times, method="nearest"), without a lookup per time.
+    """
+    ns = index_ns(index)
+    t = index_ns(pd.DatetimeIndex(times))
+    if not len(ns):
+        return np.full(len(t), -1, dtype=np.intp)
+    right = np.searchsorted(ns, t, side="left")
+    left = np.clip(right - 1, 0, len(ns) - 1)
+    right = np.minimum(right, len(ns) - 1)
+    use_left = (t - ns[left] < ns[right] - t) | (ns[right] < t)
+    return np.where(use_left, left, right)
+
+
+class TimeframeAlignment:
+    """
+    Integer map between input bars (base) and the bars of one higher timeframe resampled from them
+    (upper; labels are bucket starts). Built once per dataset with searchsorted, then O(1) per lookup:
+    - parent[i]: upper bar containing base bar i (-1 before the first upper bar)
+    - starts[j], stops[j]: base bars of upper bar j are base[starts[j]:stops[j]]
+    - at_label[j]: last base bar at or before upper bar j's label (-1 if none), i.e. the
+      score(base[:at_label[j] + 1]) row that was current when upper bar j opened
+    Both indexes must be sorted and in the same tz convention (both naive or both tz-aware).
+    """
+
+    def __init__(self, base: pd.DatetimeIndex, upper: pd.DatetimeIndex) -> None:
+        self.base = base
+        self.upper = upper
+        self.base_ns = index_ns(base)
+        self.upper_ns = index_ns(upper)
+        self.parent = np.searchsorted(self.upper_ns, self.base_ns, side="right") - 1
+        self.starts = np.searchsorted(self.base_ns, self.upper_ns, side="left")
+        self.stops = np.r_[self.starts[1:], len(base)].astype(self.starts.dtype)
+        self.at_label = np.searchsorted(self.base_ns, self.upper_ns, side="right") - 1
+
+    def children(self, j: int) -> slice:
+        """Base positions inside upper bar j."""
+        return slice(int(self.starts[j]), int(self.stops[j]))
+
+    def base_row_at(self, ts: Any) -> int:
+        """Last base bar at or before ts (-1 if none)."""
+        return int(np.searchsorted(self.base_ns, pd.Timestamp(ts).value, side="right")) - 1
+
+    def upper_since(self, ts: Any) -> int:
+        """First upper bar at or after ts."""
+        return int(np.searchsorted(self.upper_ns, pd.Timestamp(ts).value, side="left"))
+
+
+class _Level:
+    """Bars of one width: parallel lists, last entry is the current bucket."""
+
+    __slots__ = ("width", "bucket", "times", "opens", "highs", "lows", "closes")
+
+    def __init__(self, width: int) -> None:
+        self.width = width
+        self.bucket: Optional[int] = None
+        self.times: List[int] = []
+        self.opens: List[float] = []
+        self.highs: List[float] = []
+        self.lows: List[float] = []
+        self.closes: List[float] = []
+
+    def add(self, t: int, origin: int, o: float, h: float, l: float, c: float) -> None:
+        bucket = (t - origin) // self.width
+        if bucket != self.bucket:
+            self.bucket = bucket
+            self.times.append(origin + bucket * self.width)
+            self.opens.append(o)
+            self.highs.append(h)
+            self.lows.append(l)
+            self.closes.append(c)
+        else:
+            if h > self.highs[-1]:
+                self.highs[-1] = h
+            if l < self.lows[-1]:
+                self.lows[-1] = l
+            self.closes[-1] = c
+
+
+class ResamplePyramid:
+    """
+    Higher-timeframe bars (rules, default 1h and 4h; fixed-width only) built from input bars, kept incrementally.
+    append() adds one bar in O(1); sync(df) brings the pyramid up to a frame that extends the
+    bars already seen (else rebuilds), so one instance per asset can be shared by the engine
+    (score(..., pyramid=)) and the visualization layer (get_resampled(..., pyramid=)).
+    frame(rule) DataFrames carry attrs["last_open"]: True while the last bar is still forming.
+    book(rule, window) is the level's persistent LiquidityBook, kept in step with its bars.
+    """
+
+    def __init__(self, freq_minutes: int = 15, rules: Tuple[str, ...] = ("1h", "4h")) -> None:
+        self.step = freq_minutes * 60_000_000_000
+        self.rules = tuple(rules)
+        self.widths: Dict[str, int] = {}
+        for rule in self.rules:
+            width = rule_width(rule)
+            if width is None:
+                raise ValueError(f"ResamplePyramid needs fixed-width rules, got {rule!r}")
+            self.widths[rule] = width
+        self.reset()
+
+    def reset(self) -> None:
+        self.tz: Any = None
+        self.origin: Optional[int] = None
+        self.first: Optional[pd.Timestamp] = None
+        self.last: Optional[pd.Timestamp] = None
+        self.last_bar: Optional[Tuple[float, float, float, float]] = None
+        self.n = 0
+        self.levels = {rule: _Level(width) for rule, width in self.widths.items()}
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._books: Dict[Tuple[str, Optional[int]], LiquidityBook] = {}
+
+    def __len__(self) -> int:
+        return self.n
+
+    def append(self, ts: pd.Timestamp, o: float, h: float, l: float, c: float) -> None:
+        """Add one input bar (must be later than the last one)."""
+        ts = pd.Timestamp(ts)
+        if self.last is not None and ts <= self.last:
+            raise ValueError(f"Bar at {ts} is not after last bar at {self.last}")
+        if self.origin is None:
+            self.tz = ts.tz
+            self.origin = ts.normalize().value
+            self.first = ts
+        for level in self.levels.values():
+            level.add(ts.value, self.origin, o, h, l, c)
+        self.last = ts
+        self.last_bar = (o, h, l, c)
+        self.n += 1
+        self._frames.clear()
+
+    def extend(self, df: pd.DataFrame) -> None:
+        cols = [df[c].to_numpy(dtype=float) for c in ("open", "high", "low", "close")]
+        for ts, o, h, l, c in zip(df.index, *cols):
+            self.append(ts, o, h, l, c)
+
+    def sync(self, df: pd.DataFrame) -> bool:
+        """
+        Make the pyramid hold exactly df's bars (lower-case OHLC columns).
+        Appends only the new rows when df extends what was seen (same first bar, same last-seen bar
+        and values); otherwise rebuilds. False if df cannot be resampled incrementally (unsorted index).
+        """
+        idx = df.index
+        if not isinstance(idx, pd.DatetimeIndex) or not idx.is_monotonic_increasing or not idx.is_unique:
+            return False
+        n = self.n
+        extends = (
+            0 < n <= len(df)
+            and idx[0] == self.first
+            and idx[n - 1] == self.last
+            and tuple(float(df[c].iloc[n - 1]) for c in ("open", "high", "low", "close")) == self.last_bar
+        )
+        if not extends:
+            self.reset()
+            n = 0
+        if n < len(df):
+            self.extend(df.iloc[n:])
+        return True
+
+    def is_open(self, rule: str) -> bool:
+        """True while the last bar of this level has not reached its bucket end."""
+        level = self.levels[rule]
+        if not level.times:
+            return False
+        return self.last.value + self.step < level.times[-1] + level.width
+
+    def frame(self, rule: str) -> pd.DataFrame:
+        """Bars of one level as an OHLC DataFrame (cached until the next append)."""
+        cached = self._frames.get(rule)
+        if cached is not None:
+            return cached
+        level = self.levels[rule]
+        idx = pd.DatetimeIndex(np.asarray(level.times, dtype="datetime64[ns]"))
+        if self.tz is not None:
+            idx = idx.tz_localize("UTC").tz_convert(self.tz)
+        out = pd.DataFrame(
+            {"open": level.opens, "high": level.highs, "low": level.lows, "close": level.closes},
+            index=idx,
+            dtype=float,
+        )
+        out.attrs["last_open"] = self.is_open(rule)
+        self._frames[rule] = out
+        return out
+
+    def book(self, rule: str, window: Optional[int]) -> LiquidityBook:
+        """
+        LiquidityBook of the level's 2 / 2 swing levels in the last window bars, kept across calls and
+        synced to the bars appended since (the same book as FrameFeatures(frame(rule)).liquidity(window)).
+        """
+        key = (rule, window)
+        book = self._books.get(key)
+        if book is None:
+            book = self._books[key] = LiquidityBook(window)
+        level = self.levels[rule]
+        return book.sync_bars(level.highs, level.lows)
+
+    def resampled(self) -> Tuple[pd.DataFrame, ...]:
+        """One frame per rule, in rules order (default (df_1h, df_4h), like engine._resample_15m_to_1h_4h)."""
+        return tuple(self.frame(rule) for rule in self.rules)
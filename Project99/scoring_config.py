@@ -0,0 +1,244 @@
+"""
+Project99 — Immutable scoring config snapshot.
+ScoringConfig holds every threshold from config.py, validated once at construction.
+Frozen, slotted and hashable: usable as a cache key and safe to share across threads / processes.
+Conditions and the engine read plain attributes from it instead of getattr(cfg, NAME, default).
+"""
+
+import dataclasses
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import config as default_config
+from .resample import rule_width
+
+
+@dataclass(frozen=True)
+class ScoringConfig:
+    """
+    Snapshot of Project99.config. Build with ScoringConfig.from_object(config_or_namespace)
+    (missing names fall back to config.py) and derive variants with .replace(NAME=value).
+    """
+
+    __slots__ = (
+        "SCORE_THRESHOLD",
+        "RR_MIN",
+        "RESAMPLE_FREQ_MINUTES",
+        "TIMEFRAME_LADDER",
+        "RETRACE_MAX_TREND",
+        "RETRACE_RANGE",
+        "SWING_LOOKBACK",
+        "SWING_LEFT",
+        "SWING_RIGHT",
+        "IMPULSE_CANDLES_COUNT",
+        "IMPULSE_BODY_RATIO",
+        "IMPULSE_EXTREME_RATIO",
+        "IMPULSE_PRIOR_WINDOW",
+        "WICK_TO_BODY_MAX",
+        "DOUBLE_TOLERANCE_PCT",
+        "DOUBLE_LOOKBACK",
+        "RETRACE_MIN_STOP_HUNT",
+        "RETRACE_MAX_STOP_HUNT",
+        "SPACE_DISTANCE_ATR_MULT",
+        "ATR_PERIOD",
+        "ZONE_IMPULSE_BODY_RATIO",
+        "ZONE_WICK_TO_BODY_MAX",
+        "ZONE_REVISIT_TOLERANCE_PCT",
+        "ZONE_MAX_RETESTS",
+        "FIB_PRIMARY",
+        "FIB_SECONDARY",
+        "FIB_STOP_AT_88",
+        "FIB_TOLERANCE_PCT",
+        "SESSION_ASIA_START_HKT",
+        "SESSION_ASIA_END_HKT",
+        "SESSION_EU_START_HKT",
+        "SESSION_EU_END_HKT",
+        "SESSION_US_START_HKT",
+        "SESSION_US_END_HKT",
+        "SESSION_ASIA_PER_DAY",
+    )
+
+    # Scoring
+    SCORE_THRESHOLD: int
+    RR_MIN: float
+    RESAMPLE_FREQ_MINUTES: Optional[int]
+    TIMEFRAME_LADDER: Optional[Tuple[str, str]]
+    # Trend
+    RETRACE_MAX_TREND: float
+    RETRACE_RANGE: float
+    # Swings
+    SWING_LOOKBACK: int
+    SWING_LEFT: int
+    SWING_RIGHT: int
+    # Impulse break
+    IMPULSE_CANDLES_COUNT: int
+    IMPULSE_BODY_RATIO: float
+    IMPULSE_EXTREME_RATIO: float
+    IMPULSE_PRIOR_WINDOW: Optional[int]
+    WICK_TO_BODY_MAX: float
+    # Stop hunt / stop money
+    DOUBLE_TOLERANCE_PCT: float
+    DOUBLE_LOOKBACK: int
+    RETRACE_MIN_STOP_HUNT: float
+    RETRACE_MAX_STOP_HUNT: float
+    SPACE_DISTANCE_ATR_MULT: float
+    ATR_PERIOD: int
+    # Zone
+    ZONE_IMPULSE_BODY_RATIO: float
+    ZONE_WICK_TO_BODY_MAX: float
+    ZONE_REVISIT_TOLERANCE_PCT: float
+    ZONE_MAX_RETESTS: Optional[int]
+    # Fib
+    FIB_PRIMARY: float
+    FIB_SECONDARY: float
+    FIB_STOP_AT_88: float
+    FIB_TOLERANCE_PCT: float
+    # Session (HKT hours)
+    SESSION_ASIA_START_HKT: int
+    SESSION_ASIA_END_HKT: int
+    SESSION_EU_START_HKT: int
+    SESSION_EU_END_HKT: int
+    SESSION_US_START_HKT: int
+    SESSION_US_END_HKT: int
+    SESSION_ASIA_PER_DAY: bool
+
+    def __post_init__(self) -> None:
+        errors: List[str] = []
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if f.name == "TIMEFRAME_LADDER":
+                if value is None:
+                    continue
+                if (
+                    not isinstance(value, (tuple, list))
+                    or len(value) != 2
+                    or not all(isinstance(rule, str) for rule in value)
+                ):
+                    errors.append(f"{f.name} must be None or (mid_rule, trend_rule), got {value!r}")
+                    continue
+                object.__setattr__(self, f.name, tuple(value))
+            elif f.type is bool:
+                if not isinstance(value, bool):
+                    errors.append(f"{f.name} must be a bool, got {value!r}")
+            elif f.type is float:
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    errors.append(f"{f.name} must be a number, got {value!r}")
+                    continue
+                object.__setattr__(self, f.name, float(value))
+            elif value is None and f.type == Optional[int]:
+                continue
+            elif isinstance(value, bool) or not isinstance(value, int):
+                errors.append(f"{f.name} must be an int, got {value!r}")
+        if errors:
+            raise ValueError("Invalid scoring config: " + "; ".join(errors))
+        errors = self._range_errors()
+        if errors:
+            raise ValueError("Invalid scoring config: " + "; ".join(errors))
+
+    def _range_errors(self) -> List[str]:
+        errors = []
+        if not 0 <= self.SCORE_THRESHOLD <= 7:
+            errors.append("SCORE_THRESHOLD must be in 0..7")
+        if self.RESAMPLE_FREQ_MINUTES is not None and self.RESAMPLE_FREQ_MINUTES <= 0:
+            errors.append("RESAMPLE_FREQ_MINUTES must be positive or None")
+        if self.TIMEFRAME_LADDER is not None:
+            try:
+                widths = [rule_width(rule) for rule in self.TIMEFRAME_LADDER]
+            except ValueError:
+                errors.append(f"TIMEFRAME_LADDER rules must be pandas frequencies, got {self.TIMEFRAME_LADDER!r}")
+            else:
+                if None not in widths and widths[0] >= widths[1]:
+                    errors.append("TIMEFRAME_LADDER mid rule must be shorter than the trend rule")
+        if self.IMPULSE_PRIOR_WINDOW is not None and self.IMPULSE_PRIOR_WINDOW < 1:
+            errors.append("IMPULSE_PRIOR_WINDOW must be >= 1 or None")
+        if self.ZONE_MAX_RETESTS is not None and self.ZONE_MAX_RETESTS < 0:
+            errors.append("ZONE_MAX_RETESTS must be >= 0 or None")
+        for name in ("SWING_LEFT", "SWING_RIGHT"):
+            if getattr(self, name) < 0:
+                errors.append(f"{name} must be >= 0")
+        for name in ("SWING_LOOKBACK", "IMPULSE_CANDLES_COUNT", "DOUBLE_LOOKBACK", "ATR_PERIOD"):
+            if getattr(self, name) < 1:
+                errors.append(f"{name} must be >= 1")
+        for name in (
+            "RR_MIN",
+            "IMPULSE_BODY_RATIO",
+            "IMPULSE_EXTREME_RATIO",
+            "SPACE_DISTANCE_ATR_MULT",
+            "ZONE_IMPULSE_BODY_RATIO",
+        ):
+            if getattr(self, name) <= 0:
+                errors.append(f"{name} must be > 0")
+        for name in (
+            "WICK_TO_BODY_MAX",
+            "DOUBLE_TOLERANCE_PCT",
+            "ZONE_WICK_TO_BODY_MAX",
+            "ZONE_REVISIT_TOLERANCE_PCT",
+            "FIB_TOLERANCE_PCT",
+        ):
+            if getattr(self, name) < 0:
+                errors.append(f"{name} must be >= 0")
+        if self.RETRACE_MAX_TREND > self.RETRACE_RANGE:
+            errors.append("RETRACE_MAX_TREND must be <= RETRACE_RANGE")
+        if self.RETRACE_MIN_STOP_HUNT > self.RETRACE_MAX_STOP_HUNT:
+            errors.append("RETRACE_MIN_STOP_HUNT must be <= RETRACE_MAX_STOP_HUNT")
+        for name in ("FIB_PRIMARY", "FIB_SECONDARY", "FIB_STOP_AT_88"):
+            if not 0 < getattr(self, name) < 1:
+                errors.append(f"{name} must be in (0, 1)")
+        for name in (
+            "SESSION_ASIA_START_HKT",
+            "SESSION_ASIA_END_HKT",
+            "SESSION_EU_START_HKT",
+            "SESSION_EU_END_HKT",
+            "SESSION_US_START_HKT",
+            "SESSION_US_END_HKT",
+        ):
+            if not 0 <= getattr(self, name) <= 24:
+                errors.append(f"{name} must be an hour in 0..24")
+        return errors
+
+    def __reduce__(self) -> Any:
+        # Frozen + __slots__: pickle through the constructor (default slot-state restore would hit setattr)
+        return (self.__class__, tuple(getattr(self, f.name) for f in fields(self)))
+
+    @classmethod
+    def from_object(cls, obj: Any = None) -> "ScoringConfig":
+        """Snapshot of a config module / namespace; names it lacks fall back to Project99.config."""
+        if isinstance(obj, cls):
+            return obj
+        values = {}
+        for f in fields(cls):
+            value = getattr(obj, f.name, None) if obj is not None else None
+            if value is None and (obj is None or not hasattr(obj, f.name)):
+                value = getattr(default_config, f.name)
+            values[f.name] = value
+        return cls(**values)
+
+    def replace(self, **changes: Any) -> "ScoringConfig":
+        """Copy with some thresholds changed (validated again)."""
+        return dataclasses.replace(self, **changes)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+_DEFAULT: Optional[ScoringConfig] = None
+_DEFAULT_VALUES: Optional[Tuple[Any, ...]] = None
+
+
+def resolve_config(cfg: Any = None) -> ScoringConfig:
+    """
+    ScoringConfig for any config_obj accepted by score(): ScoringConfig as is, other objects snapshotted.
+    None / the config module: a snapshot of Project99.config as it is now. The snapshot is cached and
+    rebuilt whenever a config attribute has changed since (e.g. config.SCORE_THRESHOLD = 5 at runtime),
+    so runtime edits apply to the next call; checking costs one getattr per field, not a validation.
+    """
+    global _DEFAULT, _DEFAULT_VALUES
+    if isinstance(cfg, ScoringConfig):
+        return cfg
+    if cfg is None or cfg is default_config:
+        values = tuple(getattr(default_config, name) for name in ScoringConfig.__slots__)
+        if _DEFAULT is None or values != _DEFAULT_VALUES:
+            _DEFAULT = ScoringConfig.from_object(default_config)
+            _DEFAULT_VALUES = values
+        return _DEFAULT
+    return ScoringConfig.from_object(cfg)
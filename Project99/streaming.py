@@ -0,0 +1,360 @@
+"""
+Project99 — Streaming scorer for live bar-close alerts.
+Feed one 15m bar at a time; 1h / 4h bars (or the config's fixed-width TIMEFRAME_LADDER), confirmed
+swing pivots and whole-history extrema are kept incrementally, and conditions run on a bounded tail of each timeframe.
+Result per bar is identical to score() on all bars received so far.
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .engine import (
+    OHLC_CHECKS,
+    _empty_result,
+    _evaluate,
+    _ladder_rules,
+    _normalize_ohlc,
+    _ohlc_error_codes,
+    _timeframe_frames,
+    tail_bars,
+)
+from .liquidity import LiquidityBook
+from .packing import ERROR_BIT, pack_result, unpack_history
+from .resample import rule_width
+from .scoring_config import ScoringConfig, resolve_config
+from .structural import AsiaRangeTracker, FrameContext, RollingExtremum, trading_day
+from .zones import ZONE_LOOKBACK, ZoneRegistry
+
+
+def _validate_bar(o: float, h: float, l: float, c: float) -> Tuple[bool, str]:
+    """Single-bar version of engine._validate_ohlc (same messages, same order)."""
+    if h < l:
+        return False, OHLC_CHECKS[0]
+    if h < o or h < c:
+        return False, OHLC_CHECKS[1]
+    if l > o or l > c:
+        return False, OHLC_CHECKS[2]
+    if any(v != v for v in (o, h, l, c)):
+        return False, OHLC_CHECKS[3]
+    if min(o, h, l, c) <= 0:
+        return False, OHLC_CHECKS[4]
+    return True, "OK"
+
+
+class _Frame:
+    """
+    One timeframe, grown bar by bar. width_ns None: every input bar is its own bar.
+    Otherwise bars are buckets of width_ns from the pandas resample origin (first day's midnight);
+    the last bucket is still forming and is updated in place.
+    Keeps the last `keep` bars, confirmed pivots folded into (windowed) prior-structure extrema,
+    running high/low and Asia-session extrema, the current trading day's Asia range, a ZoneRegistry
+    fed each bar once the next one opens and a LiquidityBook (stop money's blocking levels) synced every bar.
+    """
+
+    def __init__(self, width_ns: Optional[int], cfg: ScoringConfig, keep: int) -> None:
+        self.width = width_ns
+        self.left = cfg.SWING_LEFT
+        self.right = cfg.SWING_RIGHT
+        self.n_candles = cfg.IMPULSE_CANDLES_COUNT
+        self.prior_window = cfg.IMPULSE_PRIOR_WINDOW
+        self.asia_start = cfg.SESSION_ASIA_START_HKT
+        self.asia_end = cfg.SESSION_ASIA_END_HKT
+        self.keep = keep
+        self.times: List[int] = []
+        self.opens: List[float] = []
+        self.highs: List[float] = []
+        self.lows: List[float] = []
+        self.closes: List[float] = []
+        self.n = 0          # bars ever created
+        self.start = 0      # position of times[0]
+        self.bucket: Optional[int] = None
+        self.label_hour = 0
+        self.checked = self.left  # next position to confirm as pivot / not pivot
+        # Confirmed pivots not yet older than the impulse window, then their (windowed) running extrema
+        self.pending_highs: Deque[Tuple[int, float]] = deque()
+        self.pending_lows: Deque[Tuple[int, float]] = deque()
+        self.prior_highs = RollingExtremum("high", self.prior_window)
+        self.prior_lows = RollingExtremum("low", self.prior_window)
+        self.high_max = self.high_min = self.low_max = self.low_min = None
+        self.asia_high: Optional[float] = None
+        self.asia_low: Optional[float] = None
+        self.label_day = 0
+        self.asia_day = AsiaRangeTracker(self.asia_start, self.asia_end)
+        self.zones = ZoneRegistry.from_config(cfg, max_age=ZONE_LOOKBACK)
+        self.liquidity = LiquidityBook(cfg.DOUBLE_LOOKBACK)
+
+    @property
+    def partial(self) -> bool:
+        return self.width is not None
+
+    def add(self, ts: pd.Timestamp, origin: int, o: float, h: float, l: float, c: float) -> None:
+        if self.width is None:
+            self.label_day = trading_day(ts, self.asia_start)
+            self._append(ts.value, ts.hour, o, h, l, c)
+        else:
+            bucket = (ts.value - origin) // self.width
+            if bucket != self.bucket:
+                self.bucket = bucket
+                label = origin + bucket * self.width
+                label_ts = pd.Timestamp(label, tz="UTC").tz_convert(ts.tz) if ts.tz is not None else pd.Timestamp(label)
+                self.label_day = trading_day(label_ts, self.asia_start)
+                self._append(label, label_ts.hour, o, h, l, c)
+            else:
+                self.highs[-1] = max(self.highs[-1], h)
+                self.lows[-1] = min(self.lows[-1], l)
+                self.closes[-1] = c
+        # high_max / low_min and the Asia extremes only ever widen, so every input bar folds in.
+        # high_min / low_max need final bar values: folded when a bar closes (see _close_last).
+        self.high_max = h if self.high_max is None else max(self.high_max, h)
+        self.low_min = l if self.low_min is None else min(self.low_min, l)
+        if self.asia_start <= self.label_hour < self.asia_end:
+            self.asia_high = h if self.asia_high is None else max(self.asia_high, h)
+            self.asia_low = l if self.asia_low is None else min(self.asia_low, l)
+        self.asia_day.update(self.label_day, self.label_hour, h, l)
+        if not self.partial:
+            self._close_last()
+        self._confirm_pivots()
+        self.liquidity.sync_bars(self.highs, self.lows, self.start)
+
+    def _close_last(self) -> None:
+        h, l = self.highs[-1], self.lows[-1]
+        self.high_min = h if self.high_min is None else min(self.high_min, h)
+        self.low_max = l if self.low_max is None else max(self.low_max, l)
+
+    def _append(self, t: int, hour: int, o: float, h: float, l: float, c: float) -> None:
+        if self.partial and self.times:
+            self._close_last()
+        if self.times:
+            self.zones.add(self.times[-1], self.opens[-1], self.highs[-1], self.lows[-1], self.closes[-1])
+        self.times.append(t)
+        self.opens.append(o)
+        self.highs.append(h)
+        self.lows.append(l)
+        self.closes.append(c)
+        self.label_hour = hour
+        self.n += 1
+        if len(self.times) > 2 * self.keep:
+            drop = len(self.times) - self.keep
+            for col in (self.times, self.opens, self.highs, self.lows, self.closes):
+                del col[:drop]
+            self.start += drop
+
+    def _is_pivot(self, p: int) -> Tuple[bool, bool]:
+        """(is swing high, is swing low) at absolute position p, same rule as pivot_mask."""
+        i = p - self.start
+        h, l = self.highs[i], self.lows[i]
+        hs = self.highs[i - self.left : i + self.right + 1]
+        ls = self.lows[i - self.left : i + self.right + 1]
+        return all(x <= h for x in hs), all(x >= l for x in ls)
+
+    def _confirm_pivots(self) -> None:
+        complete = self.n - 1 if self.partial else self.n
+        while self.checked <= complete - 1 - self.right:
+            p = self.checked
+            is_high, is_low = self._is_pivot(p)
+            if is_high:
+                self.pending_highs.append((p, self.highs[p - self.start]))
+            if is_low:
+                self.pending_lows.append((p, self.lows[p - self.start]))
+            self.checked += 1
+
+    def context(self) -> FrameContext:
+        """Whole-history facts for the current frame (prior structure < n - IMPULSE_CANDLES_COUNT)."""
+        limit = self.n - self.n_candles
+        while self.pending_highs and self.pending_highs[0][0] < limit:
+            self.prior_highs.push(*self.pending_highs.popleft())
+        while self.pending_lows and self.pending_lows[0][0] < limit:
+            self.prior_lows.push(*self.pending_lows.popleft())
+        self.prior_highs.evict(limit)
+        self.prior_lows.evict(limit)
+        prior_high, prior_low = self.prior_highs.value, self.prior_lows.value
+        # Pivot next to a forming bar is provisional: checked on current values, never folded
+        p = self.n - 1 - self.right
+        first = limit - self.prior_window if self.prior_window is not None else 0
+        if self.partial and max(self.left, first) <= p < limit and p >= self.checked:
+            is_high, is_low = self._is_pivot(p)
+            if is_high:
+                price = self.highs[p - self.start]
+                prior_high = price if prior_high is None else max(prior_high, price)
+            if is_low:
+                price = self.lows[p - self.start]
+                prior_low = price if prior_low is None else min(prior_low, price)
+        high_min, low_max = self.highs[-1], self.lows[-1]
+        if self.high_min is not None:
+            high_min = min(self.high_min, high_min)
+            low_max = max(self.low_max, low_max)
+        asia_day = self.asia_day.current or (None, None)
+        return FrameContext(
+            high_max=self.high_max,
+            high_min=high_min,
+            low_max=low_max,
+            low_min=self.low_min,
+            asia_high=self.asia_high,
+            asia_low=self.asia_low,
+            prior_high=prior_high,
+            prior_low=prior_low,
+            asia_day_high=asia_day[0],
+            asia_day_low=asia_day[1],
+            zones=self.zones,
+        )
+
+    def tail(self, k: int, tz: Any) -> pd.DataFrame:
+        """Last k bars as an OHLC DataFrame with the frame's DatetimeIndex."""
+        idx = pd.DatetimeIndex(np.asarray(self.times[-k:], dtype="datetime64[ns]"))
+        if tz is not None:
+            idx = idx.tz_localize("UTC").tz_convert(tz)
+        return pd.DataFrame(
+            {
+                "open": self.opens[-k:],
+                "high": self.highs[-k:],
+                "low": self.lows[-k:],
+                "close": self.closes[-k:],
+            },
+            index=idx,
+        )
+
+
+class StreamingScorer:
+    """
+    Stateful scorer: update(bar) per closed input bar → same dict as score() on the history so far.
+    Per-bar cost is bounded by tail_bars(config), not by history length.
+    Invalid bars are rejected (result carries "error") and not added to the history.
+    Raises ValueError for a calendar TIMEFRAME_LADDER (1D, 1W): use score() for those.
+    """
+
+    def __init__(self, config_obj: Any = None, freq_minutes: Optional[int] = None) -> None:
+        self.cfg = resolve_config(config_obj)
+        self.freq = freq_minutes if freq_minutes is not None else self.cfg.RESAMPLE_FREQ_MINUTES
+        self.window = tail_bars(self.cfg)
+        self.tz: Any = None
+        self.origin: Optional[int] = None
+        self.last_time: Optional[pd.Timestamp] = None
+        self.rules = _ladder_rules(self.cfg, self.freq)
+        widths = (None, None)
+        if self.rules is not None:
+            widths = tuple(map(rule_width, self.rules))
+            if None in widths:
+                raise ValueError(f"StreamingScorer needs fixed-width ladder rules, got {self.rules!r}")
+        self.base = _Frame(None, self.cfg, self.window)
+        self.mid = _Frame(widths[0], self.cfg, self.window)
+        self.trend = _Frame(widths[1], self.cfg, self.window)
+        self.result: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return self.base.n
+
+    def update(self, bar: pd.Series, evaluate: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Add one closed bar (Series named by its timestamp, open/high/low/close in any case).
+        Returns the score result, or None when evaluate=False (warm-up).
+        """
+        vals = {str(k).lower(): v for k, v in bar.items()}
+        return self._add(
+            pd.Timestamp(bar.name),
+            float(vals["open"]),
+            float(vals["high"]),
+            float(vals["low"]),
+            float(vals["close"]),
+            evaluate,
+        )
+
+    def _add(
+        self,
+        ts: pd.Timestamp,
+        o: float,
+        h: float,
+        l: float,
+        c: float,
+        evaluate: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        valid, msg = _validate_bar(o, h, l, c)
+        if not valid:
+            result = _empty_result()
+            result["error"] = f"Data validation failed: {msg}"
+            return result
+        if self.last_time is not None and ts <= self.last_time:
+            raise ValueError(f"Bar at {ts} is not after last bar at {self.last_time}")
+        if self.origin is None:
+            self.tz = ts.tz
+            self.origin = ts.normalize().value
+        self.last_time = ts
+        self.base.add(ts, self.origin, o, h, l, c)
+        if self.rules is not None:
+            self.mid.add(ts, self.origin, o, h, l, c)
+            self.trend.add(ts, self.origin, o, h, l, c)
+        if not evaluate:
+            return None
+        self.result = self._score()
+        return self.result
+
+    def extend(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """Feed many bars (e.g. initial history); evaluates once at the last bar."""
+        df = _normalize_ohlc(df)
+        last = len(df) - 1
+        for i, (ts, o, h, l, c) in enumerate(zip(df.index, df["open"], df["high"], df["low"], df["close"])):
+            self._add(pd.Timestamp(ts), float(o), float(h), float(l), float(c), evaluate=i == last)
+        return self.result
+
+    def _score(self) -> Dict[str, Any]:
+        frames, contexts, books = self._frames()
+        return _evaluate(frames, self.cfg, contexts, rules=self.rules, books=books)
+
+    def _frames(self) -> Tuple[Dict[str, pd.DataFrame], Dict[str, FrameContext], Dict[str, LiquidityBook]]:
+        """Bounded tail per timeframe role, its whole-history context and liquidity book, for the bars so far."""
+        k = self.window
+        base_df = self.base.tail(k, self.tz)
+        df_mid = df_trend = None
+        if self.rules is not None and self.base.n >= 16:
+            df_mid = self.mid.tail(k, self.tz)
+            df_trend = self.trend.tail(k, self.tz)
+        frames = _timeframe_frames(base_df, df_mid, df_trend)
+        owner = {id(base_df): self.base, id(df_mid): self.mid, id(df_trend): self.trend}
+        contexts = {role: owner[id(frame)].context() for role, frame in frames.items()}
+        books = {role: owner[id(frame)].liquidity for role, frame in frames.items()}
+        return frames, contexts, books
+
+
+def score_history(
+    df: pd.DataFrame,
+    freq_minutes: Optional[int] = None,
+    config_obj: Any = None,
+    packed: bool = False,
+) -> Union[pd.DataFrame, pd.Series]:
+    """
+    Score every bar in one forward pass: row i equals score(df.iloc[:i + 1]).
+    Resampling, pivots and whole-history extrema advance incrementally (StreamingScorer state);
+    conditions see only their bounded tail, so cost is O(bars · tail) instead of O(bars²).
+    Columns: long_<condition>, short_<condition>, long_score, short_score, bias,
+    alert_long, alert_short, error (None, or the message score() would return).
+    packed=True: uint16 Series of packed results instead (see packing; 2 bytes per bar).
+    An unsorted index or repeated labels (a feed re-sending its last bar) are scored as the sorted
+    unique bars, keeping the last row of each label: rows are indexed by those labels.
+    """
+    df = _normalize_ohlc(df)
+    if not isinstance(df.index, pd.DatetimeIndex):
+        raise ValueError("score_history needs a DatetimeIndex")
+    if not (df.index.is_monotonic_increasing and df.index.is_unique):
+        df = df[~df.index.duplicated(keep="last")].sort_index(kind="stable")
+    scorer = StreamingScorer(config_obj=config_obj, freq_minutes=freq_minutes)
+    opens = df["open"].to_numpy(dtype=float)
+    highs = df["high"].to_numpy(dtype=float)
+    lows = df["low"].to_numpy(dtype=float)
+    closes = df["close"].to_numpy(dtype=float)
+    codes = np.zeros(len(df), dtype=np.uint16)
+    errors: List[Optional[str]] = [None] * len(df)
+    # Checks failed by any row so far: score() on a prefix reports the first of them in OHLC_CHECKS order
+    failed = np.bitwise_or.accumulate(_ohlc_error_codes(df)) if len(df) else np.zeros(0, dtype=np.uint8)
+    bad = np.flatnonzero(failed)
+    stop = int(bad[0]) if len(bad) else len(df)
+    for i in range(stop):
+        codes[i] = pack_result(scorer._add(df.index[i], opens[i], highs[i], lows[i], closes[i]))
+    for i in range(stop, len(df)):
+        bits = int(failed[i])
+        codes[i] = ERROR_BIT
+        errors[i] = f"Data validation failed: {OHLC_CHECKS[(bits & -bits).bit_length() - 1]}"
+    if packed:
+        return pd.Series(codes, index=df.index, name="code")
+    return unpack_history(codes, df.index, scorer.cfg.SCORE_THRESHOLD, errors)
@@ -3,10 +3,61 @@ Project99 — Structural helpers only.
 Swing high/low, retracement depth. No EMA, no generic indicators.
 """
 
-from typing import List, Optional, Tuple
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from .impulse import AVG_BODY_MIN_PERIODS, AVG_BODY_WINDOW, ImpulseFeatures, impulse_features
+from .liquidity import LiquidityBook
+from .resample import _HOUR_NS
+from .zones import ZoneRegistry
+
+_DAY_NS = 24 * _HOUR_NS
+
+
+def pivot_mask(
+    values: np.ndarray,
+    left: int = 2,
+    right: int = 2,
+    kind: str = "high",
+) -> np.ndarray:
+    """
+    Boolean pivot mask in one vectorized pass.
+    kind 'high': value >= every neighbor within left/right. kind 'low': value <= every neighbor.
+    Edge bars (first left, last right) are never pivots. NaN never qualifies.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    mask = np.zeros(n, dtype=bool)
+    if n < left + right + 1:
+        return mask
+    center = values[left : n - right]
+    ok = np.ones(len(center), dtype=bool)
+    if kind == "high":
+        for j in range(1, left + 1):
+            ok &= values[left - j : n - right - j] <= center
+        for j in range(1, right + 1):
+            ok &= values[left + j : n - right + j] <= center
+    else:
+        for j in range(1, left + 1):
+            ok &= values[left - j : n - right - j] >= center
+        for j in range(1, right + 1):
+            ok &= values[left + j : n - right + j] >= center
+    mask[left : n - right] = ok
+    return mask
+
+
+def swing_high_mask(df: pd.DataFrame, left: int = 2, right: int = 2) -> np.ndarray:
+    """Per-bar bool: swing high (see pivot_mask)."""
+    return pivot_mask(df["high"].to_numpy(dtype=float), left, right, "high")
+
+
+def swing_low_mask(df: pd.DataFrame, left: int = 2, right: int = 2) -> np.ndarray:
+    """Per-bar bool: swing low (see pivot_mask)."""
+    return pivot_mask(df["low"].to_numpy(dtype=float), left, right, "low")
+
 
 def swing_highs(
     df: pd.DataFrame,
@@ -16,14 +67,7 @@ def swing_highs(
     """Indices where high is >= left and >= right neighbors."""
     if len(df) < left + right + 1:
         return []
-    idx = []
-    for i in range(left, len(df) - right):
-        h = df["high"].iloc[i]
-        if all(df["high"].iloc[i - j] <= h for j in range(1, left + 1)) and all(
-            df["high"].iloc[i + j] <= h for j in range(1, right + 1)
-        ):
-            idx.append(i)
-    return idx
+    return np.flatnonzero(swing_high_mask(df, left, right)).tolist()
 
 
 def swing_lows(
@@ -34,34 +78,271 @@ def swing_lows(
     """Indices where low is <= left and <= right neighbors."""
     if len(df) < left + right + 1:
         return []
-    idx = []
-    for i in range(left, len(df) - right):
-        l = df["low"].iloc[i]
-        if all(df["low"].iloc[i - j] >= l for j in range(1, left + 1)) and all(
-            df["low"].iloc[i + j] >= l for j in range(1, right + 1)
+    return np.flatnonzero(swing_low_mask(df, left, right)).tolist()
+
+
+class ClusterEvent(NamedTuple):
+    """
+    Double top (kind "high") / double bottom ("low"): the frame's last two swing pivots within
+    tolerance. level: max of the two highs / min of the two lows. first / second: pivot positions.
+    formed / until: first and last bar (inclusive) whose prefix has this pair as its cluster.
+    """
+
+    kind: str
+    level: float
+    first: int
+    second: int
+    formed: int
+    until: int
+
+
+class SwingIndex:
+    """
+    Swing pivots of one frame, computed once and shared by every condition.
+    high_pos / low_pos are sorted bar positions; high_price / low_price the pivot prices.
+    "Last k bars" means positions >= n - k, the same window the list helpers use.
+    """
+
+    __slots__ = ("n", "left", "right", "high_pos", "high_price", "low_pos", "low_price", "_running")
+
+    def __init__(
+        self,
+        n: int,
+        left: int,
+        right: int,
+        high_pos: np.ndarray,
+        high_price: np.ndarray,
+        low_pos: np.ndarray,
+        low_price: np.ndarray,
+    ) -> None:
+        self.n = n
+        self.left = left
+        self.right = right
+        self.high_pos = high_pos
+        self.high_price = high_price
+        self.low_pos = low_pos
+        self.low_price = low_price
+        self._running: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame, left: int = 2, right: int = 2) -> "SwingIndex":
+        high = df["high"].to_numpy(dtype=float)
+        low = df["low"].to_numpy(dtype=float)
+        high_pos = np.flatnonzero(pivot_mask(high, left, right, "high"))
+        low_pos = np.flatnonzero(pivot_mask(low, left, right, "low"))
+        return cls(len(df), left, right, high_pos, high[high_pos], low_pos, low[low_pos])
+
+    def matches(self, df: pd.DataFrame, left: int, right: int) -> bool:
+        """True if this index was built for a frame of df's length with the same left/right."""
+        return self.n == len(df) and self.left == left and self.right == right
+
+    def _start(self, pos: np.ndarray, lookback: int) -> int:
+        return int(np.searchsorted(pos, self.n - lookback, side="left"))
+
+    def highs_in_last(self, lookback: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(positions, prices) of swing highs in the last lookback bars."""
+        k = self._start(self.high_pos, lookback)
+        return self.high_pos[k:], self.high_price[k:]
+
+    def lows_in_last(self, lookback: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(positions, prices) of swing lows in the last lookback bars."""
+        k = self._start(self.low_pos, lookback)
+        return self.low_pos[k:], self.low_price[k:]
+
+    def last_highs(self, count: int, lookback: int) -> List[Tuple[int, float]]:
+        """Up to count latest swing highs in the last lookback bars, oldest first."""
+        pos, price = self.highs_in_last(lookback)
+        return [(int(i), float(p)) for i, p in zip(pos[-count:], price[-count:])]
+
+    def last_lows(self, count: int, lookback: int) -> List[Tuple[int, float]]:
+        """Up to count latest swing lows in the last lookback bars, oldest first."""
+        pos, price = self.lows_in_last(lookback)
+        return [(int(i), float(p)) for i, p in zip(pos[-count:], price[-count:])]
+
+    def latest_high(self, lookback: int) -> Optional[Tuple[int, float]]:
+        last = self.last_highs(1, lookback)
+        return last[0] if last else None
+
+    def latest_low(self, lookback: int) -> Optional[Tuple[int, float]]:
+        last = self.last_lows(1, lookback)
+        return last[0] if last else None
+
+    def max_high_above(self, price: float, lookback: int) -> Optional[float]:
+        """Highest swing high above price in the last lookback bars, or None."""
+        _, prices = self.highs_in_last(lookback)
+        above = prices[prices > price]
+        return float(above.max()) if len(above) else None
+
+    def min_low_below(self, price: float, lookback: int) -> Optional[float]:
+        """Lowest swing low below price in the last lookback bars, or None."""
+        _, prices = self.lows_in_last(lookback)
+        below = prices[prices < price]
+        return float(below.min()) if len(below) else None
+
+    @property
+    def running(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(running max of the swing high prices, running min of the swing low prices), in pivot order."""
+        if self._running is None:
+            self._running = (np.maximum.accumulate(self.high_price), np.minimum.accumulate(self.low_price))
+        return self._running
+
+    def max_high_before(self, pos: int, window: Optional[int] = None) -> Optional[float]:
+        """Highest swing high at a position < pos (and >= pos - window), or None."""
+        k = int(np.searchsorted(self.high_pos, pos, side="left"))
+        if window is None:
+            return float(self.running[0][k - 1]) if k else None
+        j = int(np.searchsorted(self.high_pos, pos - window, side="left"))
+        return float(self.high_price[j:k].max()) if k > j else None
+
+    def min_low_before(self, pos: int, window: Optional[int] = None) -> Optional[float]:
+        """Lowest swing low at a position < pos (and >= pos - window), or None."""
+        k = int(np.searchsorted(self.low_pos, pos, side="left"))
+        if window is None:
+            return float(self.running[1][k - 1]) if k else None
+        j = int(np.searchsorted(self.low_pos, pos - window, side="left"))
+        return float(self.low_price[j:k].min()) if k > j else None
+
+    def _pivots(self, kind: str) -> Tuple[np.ndarray, np.ndarray]:
+        return (self.high_pos, self.high_price) if kind == "high" else (self.low_pos, self.low_price)
+
+    def cluster(self, kind: str, span: float, tol_pct: float, lookback: int) -> Optional[Tuple[float, int, int]]:
+        """
+        (level, first, second) if the last two swing pivots of kind in the last lookback bars are
+        within span * tol_pct of each other (double top / bottom at the frame's last bar), else None.
+        """
+        pos, price = self._pivots(kind)
+        k = len(pos)
+        if k < 2 or pos[k - 2] < self.n - lookback or abs(price[k - 1] - price[k - 2]) > span * tol_pct:
+            return None
+        level = max(price[k - 2], price[k - 1]) if kind == "high" else min(price[k - 2], price[k - 1])
+        return float(level), int(pos[k - 2]), int(pos[k - 1])
+
+    def cluster_events(self, kind: str, spans: np.ndarray, tol_pct: float, lookback: int) -> List[ClusterEvent]:
+        """
+        Every cluster() of the frame's prefixes as events, in one vectorized pass: at bar i the
+        prefix [0, i] sees pivots confirmed by then (position <= i - right), spans[i] its span.
+        """
+        pos, price = self._pivots(kind)
+        bars = np.arange(self.n)
+        k = np.searchsorted(pos, bars - self.right, side="right")  # pivots confirmed by bar i
+        diff = np.r_[np.inf, np.abs(np.diff(price))] if len(price) else np.empty(0)
+        valid = k >= 2
+        j = k[valid] - 1
+        ok = np.zeros(self.n, dtype=bool)
+        ok[valid] = (pos[j - 1] >= bars[valid] + 1 - lookback) & (diff[j] <= spans[valid] * tol_pct)
+        # Runs of bars holding the same pivot pair
+        key = np.where(ok, k, -1)
+        starts = np.flatnonzero(ok & np.r_[True, key[1:] != key[:-1]])
+        ends = np.flatnonzero(ok & np.r_[key[:-1] != key[1:], True])
+        pick = np.maximum if kind == "high" else np.minimum
+        return [
+            ClusterEvent(
+                kind,
+                float(pick(price[k[a] - 2], price[k[a] - 1])),
+                int(pos[k[a] - 2]),
+                int(pos[k[a] - 1]),
+                int(a),
+                int(b),
+            )
+            for a, b in zip(starts, ends)
+        ]
+
+    def prior_extrema(self, n_candles: int, window: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (prior_high, prior_low) of every prefix [0, i] (NaN: none): max_high_before / min_low_before
+        (i + 1 - n_candles, window) on that prefix's own pivots, i.e. pivots confirmed by bar i
+        (position <= i - right). One cumulative pass; a windowed one runs a RollingExtremum.
+        """
+        cut = np.arange(1, self.n + 1) - max(n_candles, self.right)  # pivots at positions < cut[i] count at bar i
+        out = []
+        for pos, price, run, kind in (
+            (self.high_pos, self.high_price, self.running[0], "high"),
+            (self.low_pos, self.low_price, self.running[1], "low"),
         ):
-            idx.append(i)
-    return idx
+            values = np.full(self.n, np.nan)
+            if window is None:
+                k = np.searchsorted(pos, cut, side="left")
+                values[k > 0] = run[k[k > 0] - 1]
+            else:
+                ext = RollingExtremum(kind, window)
+                j = 0
+                for i in range(self.n):
+                    while j < len(pos) and pos[j] < cut[i]:
+                        ext.push(int(pos[j]), float(price[j]))
+                        j += 1
+                    ext.evict(i + 1 - n_candles)
+                    if ext.value is not None:
+                        values[i] = ext.value
+            out.append(values)
+        return out[0], out[1]
+
+
+class RollingExtremum:
+    """
+    Max (kind "high") or min ("low") of values pushed in position order. window: only positions
+    >= limit - window count after evict(limit), kept in a monotonic deque (amortized O(1) per push /
+    evict); None: running extreme of everything pushed, one value.
+    """
+
+    __slots__ = ("sign", "window", "items")
+
+    def __init__(self, kind: str, window: Optional[int] = None) -> None:
+        self.sign = 1.0 if kind == "high" else -1.0
+        self.window = window
+        self.items: Deque[Tuple[int, float]] = deque()
+
+    def push(self, pos: int, value: float) -> None:
+        while self.items and self.sign * self.items[-1][1] <= self.sign * value:
+            self.items.pop()
+        if self.window is not None or not self.items:
+            self.items.append((pos, value))
+
+    def evict(self, limit: int) -> None:
+        """Drop values at positions < limit - window (no-op without a window)."""
+        if self.window is None:
+            return
+        while self.items and self.items[0][0] < limit - self.window:
+            self.items.popleft()
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.items[0][1] if self.items else None
+
 
+def swing_index(
+    df: pd.DataFrame,
+    left: int = 2,
+    right: int = 2,
+    swings: Optional[SwingIndex] = None,
+) -> SwingIndex:
+    """Reuse a shared SwingIndex when it was built for this frame and left/right; else build one."""
+    if swings is not None and swings.matches(df, left, right):
+        return swings
+    return SwingIndex.from_df(df, left, right)
 
-def recent_swing_high(df: pd.DataFrame, lookback: int, left: int = 2, right: int = 2) -> Optional[float]:
+
+def recent_swing_high(
+    df: pd.DataFrame,
+    lookback: int,
+    left: int = 2,
+    right: int = 2,
+    swings: Optional[SwingIndex] = None,
+) -> Optional[float]:
     """Latest swing high in last lookback bars."""
-    idx = swing_highs(df, left, right)
-    in_range = [i for i in idx if i >= len(df) - lookback]
-    if not in_range:
-        return None
-    i = max(in_range)
-    return float(df["high"].iloc[i])
+    latest = swing_index(df, left, right, swings).latest_high(lookback)
+    return latest[1] if latest else None
 
 
-def recent_swing_low(df: pd.DataFrame, lookback: int, left: int = 2, right: int = 2) -> Optional[float]:
+def recent_swing_low(
+    df: pd.DataFrame,
+    lookback: int,
+    left: int = 2,
+    right: int = 2,
+    swings: Optional[SwingIndex] = None,
+) -> Optional[float]:
     """Latest swing low in last lookback bars."""
-    idx = swing_lows(df, left, right)
-    in_range = [i for i in idx if i >= len(df) - lookback]
-    if not in_range:
-        return None
-    i = max(in_range)
-    return float(df["low"].iloc[i])
+    latest = swing_index(df, left, right, swings).latest_low(lookback)
+    return latest[1] if latest else None
 
 
 def retracement_depth(
@@ -87,34 +368,39 @@ def retracement_depth(
     return None
 
 
-def dominant_direction(df: pd.DataFrame, lookback: int = 30) -> Optional[str]:
+def dominant_direction(
+    df: pd.DataFrame,
+    lookback: int = 30,
+    swings: Optional[SwingIndex] = None,
+) -> Optional[str]:
     """
     Structural bias: compare recent swing high/low to prior.
     Returns 'up', 'down', or None (no clear structure).
     """
-    idx_high = swing_highs(df, 2, 2)
-    idx_low = swing_lows(df, 2, 2)
-    if len(idx_high) < 2 or len(idx_low) < 2:
+    sw = swing_index(df, 2, 2, swings)
+    highs = sw.last_highs(2, lookback)
+    lows = sw.last_lows(2, lookback)
+    if len(highs) < 2 or len(lows) < 2:
         return None
-    recent_highs = [i for i in idx_high if i >= len(df) - lookback]
-    recent_lows = [i for i in idx_low if i >= len(df) - lookback]
-    if len(recent_highs) < 2 or len(recent_lows) < 2:
-        return None
-    h1, h2 = sorted(recent_highs)[-2], sorted(recent_highs)[-1]
-    l1, l2 = sorted(recent_lows)[-2], sorted(recent_lows)[-1]
-    if df["high"].iloc[h2] > df["high"].iloc[h1] and df["low"].iloc[l2] > df["low"].iloc[l1]:
+    (_, h1), (_, h2) = highs
+    (_, l1), (_, l2) = lows
+    if h2 > h1 and l2 > l1:
         return "up"
-    if df["high"].iloc[h2] < df["high"].iloc[h1] and df["low"].iloc[l2] < df["low"].iloc[l1]:
+    if h2 < h1 and l2 < l1:
         return "down"
     return None
 
 
-def trend_state(df: pd.DataFrame, lookback: int = 30) -> Optional[int]:
+def trend_state(
+    df: pd.DataFrame,
+    lookback: int = 30,
+    swings: Optional[SwingIndex] = None,
+) -> Optional[int]:
     """
     Returns +1 (uptrend), -1 (downtrend), or None.
     For v2.1 stop_hunt / stop_money liquidity doctrine.
     """
-    d = dominant_direction(df, lookback)
+    d = dominant_direction(df, lookback, swings)
     if d == "up":
         return 1
     if d == "down":
@@ -129,12 +415,13 @@ def atr(df: pd.DataFrame, period: int = 20) -> Optional[float]:
     """
     if len(df) < period + 1:
         return None
-    high = df["high"]
-    low = df["low"]
-    close = df["close"]
-    prev_close = close.shift(1)
-    tr = (high - low).combine((high - prev_close).abs(), max).combine((low - prev_close).abs(), max)
-    atr_series = tr.rolling(period, min_periods=period).mean()
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    close = df["close"].to_numpy(dtype=float)
+    prev_close = np.r_[np.nan, close[:-1]]
+    # fmax skips the NaN prev_close on the first bar, like builtin max did
+    tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+    atr_series = pd.Series(tr).rolling(period, min_periods=period).mean()
     return float(atr_series.iloc[-1])
 
 
@@ -153,3 +440,331 @@ def wick_small_relative_to_body(
     if body <= 0:
         return False
     return wick <= body * body_ratio_max
+
+
+def hour_mask(hours: np.ndarray, start: int, end: int, wrap: bool = True) -> np.ndarray:
+    """
+    Bars whose label hour is in [start, end). wrap: start > end spans midnight (EU / US windows);
+    without it such a window is empty (Asia, as FrameContext and the streaming frames count it).
+    """
+    hours = np.asarray(hours)
+    if start <= end or not wrap:
+        return (hours >= start) & (hours < end)
+    return (hours >= start) | (hours < end)
+
+
+def trading_days(index: pd.DatetimeIndex, start: int) -> np.ndarray:
+    """
+    Trading day id per bar label: wall-clock days that open at the Asia start hour, so bars after
+    midnight (late US session) stay on the day whose Asia range they trade against.
+    """
+    wall = index.tz_localize(None) if index.tz is not None else index
+    return (wall.to_numpy(dtype="datetime64[ns]").view(np.int64) - start * _HOUR_NS) // _DAY_NS
+
+
+def trading_day(ts: pd.Timestamp, start: int) -> int:
+    """trading_days for one timestamp."""
+    wall = ts.tz_localize(None) if ts.tz is not None else ts
+    return (wall.value - start * _HOUR_NS) // _DAY_NS
+
+
+class FrameFeatures:
+    """
+    Memoized features of one frame, shared by every condition evaluated on it. Each feature is
+    computed on first use, derived ones from the memoized features they build on (avg_body from body,
+    trend_state from direction from pivots, ...); parameterized ones (pivots(left, right),
+    direction(lookback), atr(period), session_mask(start, end), asia_range(start, end), ...) once per
+    distinct argument. Values equal the standalone helpers.
+    liquidity: a persistent LiquidityBook synced to the frame's bars (2 / 2 pivots) that
+    liquidity(liquidity.window) returns instead of building one.
+    """
+
+    __slots__ = ("df", "left", "right", "_memo")
+
+    def __init__(
+        self, df: pd.DataFrame, left: int = 2, right: int = 2, liquidity: Optional[LiquidityBook] = None
+    ) -> None:
+        self.df = df
+        self.left = left
+        self.right = right
+        self._memo: Dict[Tuple[Any, ...], Any] = {}
+        if liquidity is not None:
+            self._memo[("liquidity", liquidity.window)] = liquidity
+
+    def _get(self, key: Tuple[Any, ...], build: Callable[[], Any]) -> Any:
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = build()
+            return value
+
+    def body(self) -> pd.Series:
+        return self._get(("body",), lambda: body_size(self.df["open"], self.df["close"]))
+
+    def avg_body(self) -> pd.Series:
+        """10-bar mean body (min 3 bars)."""
+        return self._get(
+            ("avg_body",), lambda: self.body().rolling(AVG_BODY_WINDOW, min_periods=AVG_BODY_MIN_PERIODS).mean()
+        )
+
+    def impulse(
+        self,
+        body_ratio: float,
+        wick_ratio: float,
+        n_candles: int = 1,
+        extreme_ratio: float = np.inf,
+    ) -> ImpulseFeatures:
+        """Per-bar impulse flags (impulse.impulse_features) on this frame's avg_body."""
+
+        def build() -> ImpulseFeatures:
+            df = self.df
+            cols = [df[c].to_numpy(dtype=float) for c in ("open", "high", "low", "close")]
+            avg = self.avg_body().to_numpy()
+            return impulse_features(*cols, body_ratio, wick_ratio, n_candles, extreme_ratio, avg_body=avg)
+
+        return self._get(("impulse", body_ratio, wick_ratio, n_candles, extreme_ratio), build)
+
+    def pivots(self, left: int, right: int) -> SwingIndex:
+        return self._get(("pivots", left, right), lambda: SwingIndex.from_df(self.df, left, right))
+
+    def prior_extrema(self, n_candles: int, window: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-bar prior structure (SwingIndex.prior_extrema) at the configured left / right."""
+        return self._get(("prior_extrema", n_candles, window), lambda: self.swings.prior_extrema(n_candles, window))
+
+    def cluster(self, kind: str, tol_pct: float, lookback: int, span: float) -> Optional[Tuple[float, int, int]]:
+        """Double top / bottom at the last bar (SwingIndex.cluster on the 2 / 2 pivots)."""
+        key = ("cluster", kind, tol_pct, lookback, span)
+        return self._get(key, lambda: self.pivots(2, 2).cluster(kind, span, tol_pct, lookback))
+
+    def cluster_events(self, kind: str, tol_pct: float, lookback: int) -> List[ClusterEvent]:
+        """
+        Double tops / bottoms over the whole frame (2 / 2 pivots), each bar judged on its prefix:
+        span = running max - min of the kind's prices (1.0 while flat), as high_span / low_span.
+        """
+
+        def build() -> List[ClusterEvent]:
+            values = self.df[kind].to_numpy(dtype=float)
+            spans = np.maximum.accumulate(values) - np.minimum.accumulate(values)
+            spans[spans == 0] = 1.0
+            return self.pivots(2, 2).cluster_events(kind, spans, tol_pct, lookback)
+
+        return self._get(("cluster_events", kind, tol_pct, lookback), build)
+
+    def liquidity(self, lookback: Optional[int] = None) -> LiquidityBook:
+        """LiquidityBook of the 2 / 2 swing levels in the last lookback bars (None: the whole frame)."""
+
+        def build() -> LiquidityBook:
+            sw = self.pivots(2, 2)
+            return LiquidityBook.from_pivots(sw.n, (sw.high_pos, sw.high_price), (sw.low_pos, sw.low_price), lookback)
+
+        return self._get(("liquidity", lookback), build)
+
+    @property
+    def swings(self) -> SwingIndex:
+        """Pivots at the configured left / right."""
+        return self.pivots(self.left, self.right)
+
+    def direction(self, lookback: int) -> Optional[str]:
+        """dominant_direction (2 / 2 pivots)."""
+        return self._get(("direction", lookback), lambda: dominant_direction(self.df, lookback, self.pivots(2, 2)))
+
+    def trend_state(self, lookback: int) -> Optional[int]:
+        return {"up": 1, "down": -1}.get(self.direction(lookback))
+
+    def atr(self, period: int) -> Optional[float]:
+        return self._get(("atr", period), lambda: atr(self.df, period))
+
+    def hours(self) -> np.ndarray:
+        """Bar-label hour per bar (DatetimeIndex frames)."""
+        return self._get(("hours",), lambda: np.asarray(self.df.index.hour))
+
+    def session_mask(self, start: int, end: int, wrap: bool = True) -> np.ndarray:
+        """Bool per bar: label hour in the [start, end) session window (see hour_mask)."""
+        return self._get(("session_mask", start, end, wrap), lambda: hour_mask(self.hours(), start, end, wrap))
+
+    def asia_range(self, start: int, end: int) -> Optional[Tuple[float, float]]:
+        """(high max, low min) over bars labelled in [start, end) hours; None if there are none."""
+
+        def build() -> Optional[Tuple[float, float]]:
+            mask = self.session_mask(start, end, wrap=False)
+            if not mask.any():
+                return None
+            return float(self.df["high"].to_numpy()[mask].max()), float(self.df["low"].to_numpy()[mask].min())
+
+        return self._get(("asia_range", start, end), build)
+
+    def asia_by_day(self, start: int, end: int) -> pd.DataFrame:
+        """
+        Asia range per trading day (label date of the bars in [start, end) hours), one reduceat pass:
+        index = day, columns first / last (bar labels), high, low. Empty if no bar is in the window.
+        """
+
+        def build() -> pd.DataFrame:
+            pos = np.flatnonzero(self.session_mask(start, end, wrap=False))
+            idx = self.df.index[pos]
+            days = idx.normalize()
+            if not len(pos):
+                empty = np.empty(0)
+                return pd.DataFrame({"first": idx, "last": idx, "high": empty, "low": empty}, index=days)
+            starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+            ends = np.r_[starts[1:], len(pos)] - 1
+            return pd.DataFrame(
+                {
+                    "first": idx[starts],
+                    "last": idx[ends],
+                    "high": np.maximum.reduceat(self.df["high"].to_numpy(dtype=float)[pos], starts),
+                    "low": np.minimum.reduceat(self.df["low"].to_numpy(dtype=float)[pos], starts),
+                },
+                index=days[starts],
+            )
+
+        return self._get(("asia_by_day", start, end), build)
+
+    def trading_days(self, start: int) -> np.ndarray:
+        return self._get(("trading_days", start), lambda: trading_days(self.df.index, start))
+
+    def asia_day_range(self, start: int, end: int) -> Optional[Tuple[float, float]]:
+        """asia_range of the last bar's trading day only; None if that day has no Asia bar yet."""
+
+        def build() -> Optional[Tuple[float, float]]:
+            days = self.trading_days(start)
+            mask = self.session_mask(start, end, wrap=False) & (days == days[-1])
+            if not mask.any():
+                return None
+            return float(self.df["high"].to_numpy()[mask].max()), float(self.df["low"].to_numpy()[mask].min())
+
+        return self._get(("asia_day_range", start, end), build)
+
+    def zones(self, body_ratio: float, wick_ratio: float, revisit_pct: float, start: int) -> ZoneRegistry:
+        """ZoneRegistry over the closed bars [start, n - 1) (every bar but the last), frame positions."""
+
+        def build() -> ZoneRegistry:
+            registry = ZoneRegistry(body_ratio, wick_ratio, revisit_pct, first_pos=start)
+            registry.extend(self.df.iloc[start:-1], self.impulse(body_ratio, wick_ratio).run[start:-1])
+            return registry
+
+        return self._get(("zones", body_ratio, wick_ratio, revisit_pct, start), build)
+
+
+class FrameContext(NamedTuple):
+    """
+    Whole-history facts for a frame that is evaluated on a bounded tail only
+    (streaming / bounded scoring). With a context, conditions read these instead of the frame.
+    prior_high / prior_low: extreme swing pivots before the impulse candles (impulse_break).
+    asia_day_high / asia_day_low: Asia range of the last bar's trading day (session, per-day mode).
+    zones: the frame's persistent ZoneRegistry, fed every bar but the last (zone).
+    """
+
+    high_max: float
+    high_min: float
+    low_max: float
+    low_min: float
+    asia_high: Optional[float]
+    asia_low: Optional[float]
+    prior_high: Optional[float]
+    prior_low: Optional[float]
+    asia_day_high: Optional[float] = None
+    asia_day_low: Optional[float] = None
+    zones: Optional[ZoneRegistry] = None
+
+    @classmethod
+    def from_arrays(
+        cls,
+        high: np.ndarray,
+        low: np.ndarray,
+        hours: Optional[np.ndarray],
+        left: int = 2,
+        right: int = 2,
+        n_candles: int = 3,
+        asia_start: int = 5,
+        asia_end: int = 16,
+        days: Optional[np.ndarray] = None,
+        prior_window: Optional[int] = None,
+    ) -> "FrameContext":
+        """
+        Context of a whole frame from its high/low arrays and bar-label hours (None: no DatetimeIndex).
+        days: trading_days of the bar labels, for the current day's Asia range.
+        prior_window: prior structure only from the prior_window bars before the impulse candles.
+        Same values the conditions compute on the full frame; one vectorized pass.
+        """
+        asia_high = asia_low = asia_day_high = asia_day_low = None
+        if hours is not None:
+            asia = hour_mask(hours, asia_start, asia_end, wrap=False)
+            if asia.any():
+                asia_high, asia_low = float(high[asia].max()), float(low[asia].min())
+            if days is not None and len(days):
+                today = asia & (days == days[-1])
+                if today.any():
+                    asia_day_high, asia_day_low = float(high[today].max()), float(low[today].min())
+        limit = max(len(high) - n_candles, 0)
+        first = max(limit - prior_window, 0) if prior_window is not None else 0
+        highs = high[first:limit][pivot_mask(high, left, right, "high")[first:limit]]
+        lows = low[first:limit][pivot_mask(low, left, right, "low")[first:limit]]
+        return cls(
+            high_max=float(high.max()),
+            high_min=float(high.min()),
+            low_max=float(low.max()),
+            low_min=float(low.min()),
+            asia_high=asia_high,
+            asia_low=asia_low,
+            prior_high=float(highs.max()) if len(highs) else None,
+            prior_low=float(lows.min()) if len(lows) else None,
+            asia_day_high=asia_day_high,
+            asia_day_low=asia_day_low,
+        )
+
+
+class AsiaRangeTracker:
+    """
+    Live Asia range of the current trading day (see trading_days), O(1) per bar.
+    update() every input bar with its label's trading day and hour (a forming bar may repeat its
+    label: the range only widens). The day's range is closed and archived as (day, high, low) at
+    the first later bar outside the session (SESSION_ASIA_END_HKT), or when the day changes.
+    """
+
+    __slots__ = ("start", "end", "day", "high", "low", "closed", "archive")
+
+    def __init__(self, start: int, end: int, keep: int = 30) -> None:
+        self.start = start
+        self.end = end
+        self.day: Optional[int] = None
+        self.high: Optional[float] = None
+        self.low: Optional[float] = None
+        self.closed = False
+        self.archive: Deque[Tuple[int, float, float]] = deque(maxlen=keep)
+
+    def update(self, day: int, hour: int, high: float, low: float) -> None:
+        if day != self.day:
+            self._close()
+            self.day = day
+            self.high = self.low = None
+            self.closed = False
+        if self.start <= hour < self.end:
+            self.high = high if self.high is None else max(self.high, high)
+            self.low = low if self.low is None else min(self.low, low)
+        else:
+            self._close()
+
+    def _close(self) -> None:
+        if self.high is not None and not self.closed:
+            self.archive.append((self.day, self.high, self.low))
+            self.closed = True
+
+    @property
+    def current(self) -> Optional[Tuple[float, float]]:
+        """(high, low) of the current day's Asia session so far (closed or not); None before it starts."""
+        return None if self.high is None else (self.high, self.low)
+
+
+def high_span(df: pd.DataFrame, context: Optional[FrameContext] = None) -> float:
+    """Full-history high range (max - min)."""
+    if context is not None:
+        return float(context.high_max - context.high_min)
+    return float(df["high"].max() - df["high"].min())
+
+
+def low_span(df: pd.DataFrame, context: Optional[FrameContext] = None) -> float:
+    """Full-history low range (max - min)."""
+    if context is not None:
+        return float(context.low_max - context.low_min)
+    return float(df["low"].max() - df["low"].min())
@@ -0,0 +1,239 @@
+"""
+Project99 — Parameter sweep: score many config variants over one long history.
+Configs that share the structural settings (resampling, pivots, windows) share one replay of the
+history: bounded frames, frame features (pivots, bodies, ...) and whole-history contexts are built
+once per bar, and each condition runs once per distinct value of the config fields it reads
+(CONDITION_PARAMS), not once per config. Bar ranges are split across processes (shared-memory input, as in
+score_many); each chunk starts from a snapshot of the scorer state at its first bar, taken during one
+evaluation-free replay, so no worker repeats the bars before its chunk.
+"""
+
+import copy
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .batch import _pack, _unpack
+from .conditions import CONDITION_FUNCS, CONDITION_NAMES, CONDITION_PARAMS
+from .engine import _normalize_ohlc, _run_condition, _validate_ohlc
+from .scoring_config import ScoringConfig, resolve_config
+from .streaming import StreamingScorer
+
+BACKENDS = ("serial", "thread", "process")
+
+# Settings that change the frames / pivots / contexts themselves; configs are grouped on these
+STRUCTURE_FIELDS = (
+    "TIMEFRAME_LADDER",
+    "SWING_LEFT",
+    "SWING_RIGHT",
+    "SWING_LOOKBACK",
+    "DOUBLE_LOOKBACK",
+    "ATR_PERIOD",
+    "IMPULSE_CANDLES_COUNT",
+    "IMPULSE_PRIOR_WINDOW",
+    "SESSION_ASIA_START_HKT",
+    "SESSION_ASIA_END_HKT",
+)
+
+_MIN_CHUNK_BARS = 50
+_N_COND = len(CONDITION_NAMES)
+# Per-config accumulator columns: alert_long, alert_short, long_score, short_score, then condition hits
+_N_STATS = 4 + 2 * _N_COND
+
+
+def config_grid(base: Any = None, **axes: Sequence[Any]) -> List[ScoringConfig]:
+    """Cartesian product of threshold values on top of base: config_grid(FIB_TOLERANCE_PCT=[0.005, 0.01], ...)."""
+    base_cfg = resolve_config(base)
+    names = list(axes)
+    return [base_cfg.replace(**dict(zip(names, values))) for values in itertools.product(*axes.values())]
+
+
+def _chunk_scorers(
+    df: pd.DataFrame,
+    cfg: ScoringConfig,
+    freq_minutes: Optional[int],
+    starts: Sequence[int],
+) -> List[StreamingScorer]:
+    """
+    Scorer state at each chunk's first bar (starts ascending): one replay of the bars without
+    evaluating any condition, copied at every start. Chunks then only replay their own bars.
+    """
+    scorer = StreamingScorer(config_obj=cfg, freq_minutes=freq_minutes)
+    opens, highs, lows, closes = (df[c].to_numpy(dtype=float) for c in ("open", "high", "low", "close"))
+    out = []
+    for k, start in enumerate(starts):
+        for i in range(len(scorer), start):
+            scorer._add(df.index[i], opens[i], highs[i], lows[i], closes[i], evaluate=False)
+        out.append(scorer if k == len(starts) - 1 else copy.deepcopy(scorer))
+    return out
+
+
+def _sweep_chunk(
+    df: pd.DataFrame,
+    configs: List[ScoringConfig],
+    scorer: StreamingScorer,
+    stop: int,
+) -> np.ndarray:
+    """
+    Evaluate every config on bars [len(scorer), stop), continuing scorer (state after the bars
+    before the chunk). Returns (len(configs), _N_STATS) sums.
+    """
+    # Per condition: distinct parameter values, a representative config for each, and config → distinct index
+    plans = []
+    for name, fn in zip(CONDITION_NAMES, CONDITION_FUNCS):
+        keys: Dict[Tuple[Any, ...], int] = {}
+        reps: List[ScoringConfig] = []
+        index = np.empty(len(configs), dtype=np.intp)
+        for ci, cfg in enumerate(configs):
+            key = tuple(getattr(cfg, p) for p in CONDITION_PARAMS[name])
+            if key not in keys:
+                keys[key] = len(reps)
+                reps.append(cfg)
+            index[ci] = keys[key]
+        plans.append((name, fn, reps, index))
+    thresholds = np.array([cfg.SCORE_THRESHOLD for cfg in configs])
+    stats = np.zeros((len(configs), _N_STATS), dtype=np.int64)
+    longs = np.zeros((len(configs), _N_COND), dtype=bool)
+    shorts = np.zeros((len(configs), _N_COND), dtype=bool)
+
+    opens = df["open"].to_numpy(dtype=float)
+    highs = df["high"].to_numpy(dtype=float)
+    lows = df["low"].to_numpy(dtype=float)
+    closes = df["close"].to_numpy(dtype=float)
+    for i in range(len(scorer), stop):
+        scorer._add(df.index[i], opens[i], highs[i], lows[i], closes[i], evaluate=False)
+        frames, contexts, books = scorer._frames()
+        feature_cache: Dict[int, Any] = {}
+        for j, (name, fn, reps, index) in enumerate(plans):
+            results = np.array(
+                [_run_condition(name, fn, frames, cfg, contexts, feature_cache, books=books) for cfg in reps],
+                dtype=bool,
+            )
+            longs[:, j] = results[index, 0]
+            shorts[:, j] = results[index, 1]
+        long_score = longs.sum(axis=1)
+        short_score = shorts.sum(axis=1)
+        stats[:, 0] += long_score >= thresholds
+        stats[:, 1] += short_score >= thresholds
+        stats[:, 2] += long_score
+        stats[:, 3] += short_score
+        stats[:, 4 : 4 + _N_COND] += longs
+        stats[:, 4 + _N_COND :] += shorts
+    return stats
+
+
+def _sweep_chunk_shared(
+    shm_name: str,
+    total: int,
+    slot: Any,
+    configs: List[ScoringConfig],
+    scorer: StreamingScorer,
+    stop: int,
+) -> np.ndarray:
+    """Process-pool task: history from shared memory, scorer state pickled at the chunk start."""
+    return _sweep_chunk(_unpack(shm_name, total, slot), configs, scorer, stop)
+
+
+def sweep(
+    df: pd.DataFrame,
+    configs: Union[Sequence[Any], Dict[str, Sequence[Any]]],
+    freq_minutes: Optional[int] = None,
+    warmup: int = 0,
+    workers: Optional[int] = None,
+    backend: str = "process",
+) -> pd.DataFrame:
+    """
+    Score every bar of df under every config; same per-bar results as score(df.iloc[:i + 1], config).
+    configs: list of ScoringConfig / config objects, or {NAME: values} for config_grid(**configs).
+    warmup: first bars replayed but not counted. backend: "serial", "thread" or "process" (default).
+    Returns one row per config: the swept fields that vary, bars, alert_long / alert_short counts,
+    long_score / short_score / bias means, and long_<condition> / short_<condition> hit counts.
+    Raises ValueError if df is not a valid, strictly increasing OHLC history.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}")
+    cfgs = config_grid(**configs) if isinstance(configs, dict) else [resolve_config(c) for c in configs]
+    if not cfgs:
+        raise ValueError("No configs to sweep")
+    df = _normalize_ohlc(df)
+    if not isinstance(df.index, pd.DatetimeIndex) or not df.index.is_monotonic_increasing or not df.index.is_unique:
+        raise ValueError("sweep needs a strictly increasing DatetimeIndex")
+    valid, msg = _validate_ohlc(df)
+    if not valid:
+        raise ValueError(f"Data validation failed: {msg}")
+    n = len(df)
+    start = min(max(warmup, 0), n)
+
+    # Group configs by structural settings (+ resolved frequency): one replay per group
+    groups: Dict[Tuple[Any, ...], List[int]] = {}
+    for ci, cfg in enumerate(cfgs):
+        freq = freq_minutes if freq_minutes is not None else cfg.RESAMPLE_FREQ_MINUTES
+        key = (freq,) + tuple(getattr(cfg, f) for f in STRUCTURE_FIELDS)
+        groups.setdefault(key, []).append(ci)
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        backend = "serial"
+    n_chunks = 1 if backend == "serial" else max(1, min(workers, (n - start) // _MIN_CHUNK_BARS))
+    bounds = np.linspace(start, n, n_chunks + 1).astype(int)
+    chunks = [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+    # Per group and chunk: (configs, scorer state at the chunk's first bar, chunk end)
+    tasks = []
+    for key, members in groups.items():
+        scorers = _chunk_scorers(df, cfgs[members[0]], key[0], [lo for lo, _ in chunks])
+        tasks.extend((members, scorer, hi) for scorer, (_, hi) in zip(scorers, chunks))
+
+    stats = np.zeros((len(cfgs), _N_STATS), dtype=np.int64)
+    if backend == "serial":
+        for members, scorer, hi in tasks:
+            stats[members] += _sweep_chunk(df, [cfgs[c] for c in members], scorer, hi)
+    elif backend == "thread":
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                (members, pool.submit(_sweep_chunk, df, [cfgs[c] for c in members], scorer, hi))
+                for members, scorer, hi in tasks
+            ]
+            for members, fut in futures:
+                stats[members] += fut.result()
+    else:
+        shm, total, slots = _pack({"history": df})
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, max(len(tasks), 1))) as pool:
+                futures = [
+                    (
+                        members,
+                        pool.submit(
+                            _sweep_chunk_shared, shm.name, total, slots[0], [cfgs[c] for c in members], scorer, hi
+                        ),
+                    )
+                    for members, scorer, hi in tasks
+                ]
+                for members, fut in futures:
+                    stats[members] += fut.result()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    return _sweep_table(cfgs, stats, n - start)
+
+
+def _sweep_table(cfgs: List[ScoringConfig], stats: np.ndarray, bars: int) -> pd.DataFrame:
+    params = pd.DataFrame([cfg.as_dict() for cfg in cfgs])
+    varying = [c for c in params.columns if params[c].nunique(dropna=False) > 1]
+    table = params[varying].copy()
+    table["bars"] = bars
+    denom = max(bars, 1)
+    table["alert_long"] = stats[:, 0]
+    table["alert_short"] = stats[:, 1]
+    table["long_score_mean"] = stats[:, 2] / denom
+    table["short_score_mean"] = stats[:, 3] / denom
+    table["bias_mean"] = (stats[:, 2] - stats[:, 3]) / denom
+    for j, name in enumerate(CONDITION_NAMES):
+        table[f"long_{name}"] = stats[:, 4 + j]
+        table[f"short_{name}"] = stats[:, 4 + _N_COND + j]
+    table.index.name = "config"
+    return table
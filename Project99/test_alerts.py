@@ -0,0 +1,64 @@
+"""
+Alert-only mode tests: score(alerts_only=True) must give the same alerts as full scoring.
+Run: python -m Project99.test_alerts
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Project99 import CONDITION_NAMES, pack_result, score, score_many
+from Project99.engine import ALERT_ORDER
+from Project99.scoring_config import resolve_config
+from Project99.test_streaming import _bars, _loose_config
+
+
+def test_alerts_only_matches_full():
+    base = resolve_config(_loose_config())
+    df = _bars(700, 7, "UTC")
+    skipped = 0
+    for threshold in (0, 2, 4, 7):
+        cfg = base.replace(SCORE_THRESHOLD=threshold)
+        for n in range(300, 701, 25):
+            part = df.iloc[:n]
+            full = score(part, freq_minutes=15, config_obj=cfg)
+            lazy = score(part, freq_minutes=15, config_obj=cfg, alerts_only=True)
+            assert (lazy["alert_long"], lazy["alert_short"]) == (full["alert_long"], full["alert_short"]), (threshold, n)
+            for side in ("long", "short"):
+                conditions = lazy[f"{side}_conditions"]
+                assert all(type(v) is bool for v in conditions.values())
+                ran = {k: v for k, v in conditions.items() if k not in lazy["skipped"]}
+                assert all(full[f"{side}_conditions"][k] == v for k, v in ran.items())
+                assert not any(conditions[k] for k in lazy["skipped"])
+                assert lazy[f"{side}_score"] == sum(conditions.values()) <= full[f"{side}_score"]
+            pack_result(lazy)
+            skipped += len(lazy["skipped"])
+            if threshold == 0:
+                assert lazy["skipped"] == set(CONDITION_NAMES)
+    assert skipped > 0
+    assert sorted(ALERT_ORDER) == sorted(CONDITION_NAMES)
+    # Details requested: full evaluation
+    traced = score(df, freq_minutes=15, config_obj=base, alerts_only=True, trace=True)
+    assert set(traced["trace"]["conditions"]) == set(CONDITION_NAMES)
+    assert "skipped" not in traced
+    print("OK: alerts_only gives the full-evaluation alerts")
+
+
+def test_score_many_alerts_only():
+    cfg = resolve_config(_loose_config())
+    frames = {f"A{s}": _bars(400, s, "UTC") for s in (2, 3, 7)}
+    full = score_many(frames, 15, cfg, backend="serial")
+    for backend in ("serial", "thread"):
+        lazy = score_many(frames, 15, cfg, workers=2, backend=backend, alerts_only=True)
+        for asset in frames:
+            assert (lazy[asset]["alert_long"], lazy[asset]["alert_short"]) == (
+                full[asset]["alert_long"],
+                full[asset]["alert_short"],
+            )
+    print("OK: score_many forwards alerts_only")
+
+
+if __name__ == "__main__":
+    test_alerts_only_matches_full()
+    test_score_many_alerts_only()
+    print("\nAll alert-only tests passed.")
@@ -0,0 +1,65 @@
+"""
+Batch scoring tests: score_many backends must match score() per asset.
+Run: python -m Project99.test_batch
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+from Project99 import score, score_many
+from Project99.batch import PROCESS_MIN_BARS, _pick_backend
+from Project99.test_streaming import _bars, _loose_config
+
+
+def _assets():
+    frames = {f"A{i}": _bars(150 + 10 * i, i, "America/New_York" if i % 2 else None) for i in range(5)}
+    frames["plain"] = _bars(80, 11).reset_index(drop=True)
+    return frames
+
+
+def test_score_many_backends_match_score():
+    frames = _assets()
+    cfg = _loose_config()
+    expected = {a: score(df, freq_minutes=15, config_obj=cfg) for a, df in frames.items()}
+    for backend in ("serial", "thread", "process"):
+        got = score_many(frames, freq_minutes=15, config_obj=cfg, workers=3, backend=backend)
+        assert list(got) == list(frames), backend
+        assert got == expected, backend
+    print("OK: score_many serial / thread / process match score()")
+
+
+def test_score_many_isolates_failures():
+    frames = _assets()
+    bad = frames["A1"].copy()
+    bad.iloc[10, bad.columns.get_loc("high")] = bad["low"].iloc[10] - 1
+    frames["bad"] = bad
+    frames["broken"] = pd.DataFrame({"open": ["x"], "high": ["y"]})
+    got = score_many(frames, freq_minutes=15, workers=2, backend="process")
+    assert "High < Low" in got["bad"]["error"]
+    assert got["broken"]["long_score"] == 0 and "Missing columns" in got["broken"]["error"]
+    assert got["A0"] == score(frames["A0"], freq_minutes=15)
+    try:
+        score_many(frames, backend="gpu")
+        raise AssertionError("unknown backend accepted")
+    except ValueError:
+        pass
+    print("OK: score_many isolates failing assets")
+
+
+def test_score_many_auto_backend():
+    frames = _assets()
+    assert _pick_backend(frames, "auto", 4) == "thread"
+    big = {a: pd.DataFrame(index=range(PROCESS_MIN_BARS // 2)) for a in ("x", "y")}
+    assert _pick_backend(big, "auto", 4) == "process" and _pick_backend(big, "auto", 1) == "serial"
+    assert _pick_backend(frames, "process", 4) == "process"
+    assert score_many(frames, freq_minutes=15, workers=2) == score_many(frames, freq_minutes=15, backend="serial")
+    print("OK: score_many auto backend picks threads for small batches")
+
+
+if __name__ == "__main__":
+    test_score_many_backends_match_score()
+    test_score_many_isolates_failures()
+    test_score_many_auto_backend()
+    print("\nAll batch tests passed.")
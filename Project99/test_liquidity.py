@@ -0,0 +1,122 @@
+"""
+Liquidity book tests: bisect queries with window eviction match brute-force scans and SwingIndex;
+persistent books (pyramid, streaming) match a book built from the frame.
+Run: python -m Project99.test_liquidity
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from Project99 import LiquidityBook, ResamplePyramid, StreamingScorer, score
+from Project99.scoring_config import resolve_config
+from Project99.structural import FrameFeatures, SwingIndex
+from Project99.test_streaming import _bars, _loose_config
+
+
+def test_book_matches_scan_with_eviction():
+    rng = np.random.default_rng(3)
+    window = 40
+    book = LiquidityBook(window)
+    levels = {"high": [], "low": []}
+    for n in range(1, 400):
+        for kind in ("high", "low"):
+            if rng.random() < 0.3:
+                price = round(float(rng.normal(100, 5)), 1)  # rounded: equal prices at different bars
+                book.add(kind, n - 1, price)
+                levels[kind].append((n - 1, price))
+        book.advance(n)
+        live = {k: sorted(p for pos, p in v if pos >= n - window) for k, v in levels.items()}
+        assert book.levels("high") == live["high"] and book.levels("low") == live["low"], n
+        for price in rng.normal(100, 6, 5).round(1):
+            above = [p for p in live["high"] if p > price]
+            below = [p for p in live["low"] if p < price]
+            assert book.max_high_above(price) == (max(above) if above else None)
+            assert book.min_low_below(price) == (min(below) if below else None)
+            assert book.nearest_above(price) == (min(above) if above else None)
+            assert book.nearest_below(price) == (max(below) if below else None)
+        assert book.top("high", 2) == sorted(live["high"], reverse=True)[:2]
+        assert book.top("low", 3) == live["low"][:3]
+    print("OK: LiquidityBook queries with window eviction match a brute-force scan")
+
+
+def test_frame_book_matches_swing_index():
+    df = _bars(700, 5)
+    feats = FrameFeatures(df)
+    sw = SwingIndex.from_df(df, 2, 2)
+    for lookback in (5, 30, 120, None):
+        book = feats.liquidity(lookback)
+        assert feats.liquidity(lookback) is book
+        span = lookback if lookback is not None else len(df)
+        for price in np.linspace(df["low"].min(), df["high"].max(), 50):
+            assert book.max_high_above(price) == sw.max_high_above(price, span), (lookback, price)
+            assert book.min_low_below(price) == sw.min_low_below(price, span), (lookback, price)
+    # Built whole vs grown bar by bar with eviction
+    grown = LiquidityBook(30)
+    for kind, pos, price in sorted(
+        [("high", int(p), x) for p, x in zip(sw.high_pos, sw.high_price)]
+        + [("low", int(p), x) for p, x in zip(sw.low_pos, sw.low_price)],
+        key=lambda item: item[1],
+    ):
+        grown.add(kind, pos, price)
+    grown.advance(len(df))
+    assert grown.levels("high") == feats.liquidity(30).levels("high")
+    assert grown.levels("low") == feats.liquidity(30).levels("low")
+    print("OK: FrameFeatures.liquidity matches SwingIndex blocking queries")
+
+
+def _assert_same_levels(book, fresh, label):
+    assert book.levels("high") == fresh.levels("high"), label
+    assert book.levels("low") == fresh.levels("low"), label
+
+
+def test_pyramid_book_follows_forming_bars():
+    df = _bars(900, 11)
+    pyramid = ResamplePyramid()
+    for i, (ts, row) in enumerate(df.iterrows()):
+        pyramid.append(ts, row["open"], row["high"], row["low"], row["close"])
+        for rule in pyramid.rules:
+            for window in (20, 3):
+                book = pyramid.book(rule, window)
+                assert pyramid.book(rule, window) is book
+                _assert_same_levels(book, FrameFeatures(pyramid.frame(rule)).liquidity(window), (i, rule, window))
+    print("OK: ResamplePyramid.book matches a fresh book on every bar (forming buckets included)")
+
+
+def test_streaming_book_matches_tail():
+    cfg = resolve_config(_loose_config())
+    df = _bars(700, 12)
+    scorer = StreamingScorer(config_obj=cfg, freq_minutes=15)
+    for i, (ts, row) in enumerate(df.iterrows()):
+        scorer.update(row, evaluate=False)
+        if i < 16:
+            continue
+        frames, _, books = scorer._frames()
+        for role, frame in frames.items():
+            fresh = FrameFeatures(frame).liquidity(cfg.DOUBLE_LOOKBACK)
+            _assert_same_levels(books[role], fresh, (i, role))
+    print("OK: streaming frames' liquidity books match a book built from their tails")
+
+
+def test_score_reads_pyramid_book():
+    cfg = _loose_config()
+    df = _bars(1200, 13)
+    pyramid = ResamplePyramid()
+    blocked = 0
+    for stop in range(400, len(df), 7):
+        part = df.iloc[:stop]
+        shared = score(part, freq_minutes=15, config_obj=cfg, pyramid=pyramid, trace=True)
+        assert shared == score(part, freq_minutes=15, config_obj=cfg, trace=True), stop
+        blocked += "blocking" in shared["trace"]["conditions"]["stop_money"]
+    assert blocked
+    print("OK: score with the pyramid's liquidity book equals a fresh score (blocking included)")
+
+
+if __name__ == "__main__":
+    test_book_matches_scan_with_eviction()
+    test_frame_book_matches_swing_index()
+    test_pyramid_book_follows_forming_bars()
+    test_streaming_book_matches_tail()
+    test_score_reads_pyramid_book()
+    print("\nAll liquidity tests passed.")
@@ -0,0 +1,58 @@
+"""
+Packed result tests: uint16 codes must round-trip score() dicts and score_history frames exactly.
+Run: python -m Project99.test_packing
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+from Project99 import score, score_history
+from Project99.packing import (
+    ERROR_BIT,
+    long_scores,
+    pack_history,
+    pack_result,
+    short_scores,
+    unpack_history,
+    unpack_result,
+)
+from Project99.scoring_config import resolve_config
+from Project99.test_streaming import _bars, _loose_config
+
+
+def test_result_round_trip():
+    cfg = resolve_config(_loose_config())
+    df = _bars(120, 3, "UTC")
+    bad = df.copy()
+    bad.iloc[-1, bad.columns.get_loc("low")] = -1.0
+    for frame in (df.iloc[:60], df.iloc[:100], df, bad, df.iloc[:0]):
+        res = score(frame, freq_minutes=15, config_obj=cfg)
+        code = pack_result(res)
+        assert 0 <= code < 1 << 16
+        assert bool(code & ERROR_BIT) == bool(res.get("error"))
+        assert unpack_result(code, cfg.SCORE_THRESHOLD, res.get("error")) == res, res
+    print("OK: score() dicts round-trip through uint16 codes")
+
+
+def test_history_round_trip():
+    cfg = resolve_config(_loose_config())
+    df = _bars(200, 7, "Asia/Hong_Kong")
+    df.iloc[150, df.columns.get_loc("high")] = df["low"].iloc[150] - 1.0
+    hist = score_history(df, freq_minutes=15, config_obj=cfg)
+    assert hist["error"].notna().any() and hist["error"].isna().any()
+    codes = score_history(df, freq_minutes=15, config_obj=cfg, packed=True)
+    assert codes.dtype == np.uint16 and codes.index.equals(df.index)
+    assert (pack_history(hist) == codes).all()
+    assert (long_scores(codes) == hist["long_score"].to_numpy()).all()
+    assert (short_scores(codes) == hist["short_score"].to_numpy()).all()
+    pd.testing.assert_frame_equal(unpack_history(codes, threshold=cfg.SCORE_THRESHOLD, errors=hist["error"]), hist)
+    print("OK: score_history round-trips through packed codes")
+
+
+if __name__ == "__main__":
+    test_result_round_trip()
+    test_history_round_trip()
+    print("\nAll packing tests passed.")
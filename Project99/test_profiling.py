@@ -0,0 +1,65 @@
+"""
+Stage timing tests: StageTimer records every score() stage while active and nothing otherwise.
+Run: python -m Project99.test_profiling
+"""
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+from Project99 import CONDITION_NAMES, StageTimer, score
+from Project99.test_streaming import _bars
+
+
+def test_stage_timer_records_stages():
+    df = _bars(200, 4, "UTC")
+    score(df, freq_minutes=15)
+    seen = []
+    with StageTimer(callback=lambda stage, seconds: seen.append(stage)) as timer:
+        for n in (120, 160, 200):
+            plain = score(df.iloc[:n], freq_minutes=15)
+            assert score(df.iloc[:n], freq_minutes=15, bounded=True) == plain
+    score(df, freq_minutes=15)  # after exit: not recorded
+    expected = {"normalize", "validate", "resample", "score", *CONDITION_NAMES}
+    assert set(timer.samples) == expected
+    assert all(len(v) == 6 for v in timer.samples.values())
+    assert len(seen) == 6 * len(expected)
+    table = timer.summary()
+    assert set(table.index) == expected and (table["count"] == 6).all()
+    assert (table["p50_ms"] <= table["p99_ms"]).all() and (table["p99_ms"] <= table["max_ms"]).all()
+    # Whole call covers its stages
+    stages = table.loc[list(expected - {"score"}), "total_ms"].sum()
+    assert stages <= table.loc["score", "total_ms"] * 1.01
+    counts, edges = timer.histogram("trend", bins=8)
+    assert counts.sum() == 6 and len(edges) == 9
+    out = io.StringIO()
+    timer.dump(file=out)
+    assert "stop_money" in out.getvalue()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "stages.csv")
+        timer.dump(path)
+        assert pd.read_csv(path, index_col="stage")["count"].sum() == 6 * len(expected)
+    print("OK: StageTimer records normalize / validate / resample / conditions")
+
+
+def test_stage_timer_skips_failed_and_trusted_stages():
+    df = _bars(120, 5)
+    bad = df.copy()
+    bad.iloc[3, bad.columns.get_loc("high")] = bad["low"].iloc[3] - 1
+    with StageTimer() as timer:
+        assert "error" in score(bad, freq_minutes=15)
+        score(df, freq_minutes=15, trusted=True)
+    assert len(timer.samples["validate"]) == 1
+    assert len(timer.samples["score"]) == len(timer.samples["trend"]) == 1
+    timer.reset()
+    assert timer.summary().empty
+    print("OK: StageTimer skips stages that do not run")
+
+
+if __name__ == "__main__":
+    test_stage_timer_records_stages()
+    test_stage_timer_skips_failed_and_trusted_stages()
+    print("\nAll profiling tests passed.")
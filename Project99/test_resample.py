@@ -0,0 +1,181 @@
+"""
+Resample pyramid tests: incremental 1h / 4h bars must equal the engine's pandas resample.
+Run: python -m Project99.test_resample
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+from Project99 import ResamplePyramid, ScoringConfig, TimeframeAlignment, get_alignment, get_resampled, score, score_history
+from Project99.engine import _resample_15m_to_1h_4h, _resample_ladder
+from Project99.resample import nearest_positions, resample_ohlc
+from Project99.test_streaming import _bars
+
+
+def _same_bars(got, expected):
+    assert len(got) == len(expected)
+    assert (got.index == expected.index).all()
+    for col in ("open", "high", "low", "close"):
+        assert np.array_equal(got[col].to_numpy(), expected[col].to_numpy()), col
+
+
+def _pandas_resample(df, rule, origin="start_day"):
+    agg = {"open": "first", "high": "max", "low": "min", "close": "last"}
+    return df.resample(rule, origin=origin).agg(agg).dropna(how="all")
+
+
+def _rebar(df, freq, tz=None):
+    """Same prices on weekday bars of another frequency."""
+    idx = pd.date_range("2024-03-07 13:45", periods=3 * len(df), freq=freq, tz=tz)
+    out = df.copy()
+    out.index = idx[idx.dayofweek < 5][: len(df)]
+    return out
+
+
+def test_numpy_resample_matches_pandas():
+    for tz in (None, "America/New_York", "Asia/Hong_Kong"):
+        gappy = _bars(900, 4, tz)
+        gappy.index.name = "Datetime"
+        for df in (gappy, gappy.iloc[:7], gappy.iloc[:1], gappy.iloc[300:500]):
+            for rule in ("1h", "4h"):
+                pd.testing.assert_frame_equal(resample_ohlc(df, rule), _pandas_resample(df, rule))
+            for got, rule in zip(_resample_15m_to_1h_4h(df), ("1h", "4h")):
+                pd.testing.assert_frame_equal(got, _pandas_resample(df, rule))
+        origin = gappy.index[0].normalize()
+        pd.testing.assert_frame_equal(
+            resample_ohlc(gappy.iloc[200:], "4h", origin), _pandas_resample(gappy.iloc[200:], "4h", origin)
+        )
+    # No empty bucket: pandas keeps the index freq
+    dense = _bars(30, 1)
+    pd.testing.assert_frame_equal(resample_ohlc(dense, "1h"), _pandas_resample(dense, "1h"))
+    # Inputs left to pandas
+    with_nan = dense.copy()
+    with_nan.iloc[3, 0] = np.nan
+    assert resample_ohlc(with_nan, "1h") is None
+    assert resample_ohlc(dense.astype({"open": int}), "1h") is None
+    assert resample_ohlc(dense.iloc[::-1], "1h") is None
+    assert resample_ohlc(dense, "1D") is None
+    # Any fixed-width rule is bucketed in NumPy
+    for rule in ("30min", "2h", "15min"):
+        pd.testing.assert_frame_equal(resample_ohlc(gappy, rule), _pandas_resample(gappy, rule))
+    print("OK: NumPy resampler matches pandas resample")
+
+
+def test_pyramid_matches_pandas_resample():
+    for tz in (None, "America/New_York", "Asia/Hong_Kong"):
+        df = _bars(900, 4, tz)
+        pyramid = ResamplePyramid()
+        for n in (16, 17, 100, 333, 900):
+            assert pyramid.sync(df.iloc[:n])
+            assert len(pyramid) == n
+            for got, rule in zip(pyramid.resampled(), ("1h", "4h")):
+                _same_bars(got, _pandas_resample(df.iloc[:n], rule))
+    print("OK: ResamplePyramid matches pandas resample (naive / DST / HK)")
+
+
+def test_pyramid_open_bar_and_rebuild():
+    df = _bars(40, 2)  # starts 13:45: first 1h bar is a single 15m bar
+    pyramid = ResamplePyramid()
+    pyramid.sync(df.iloc[:1])
+    assert not pyramid.frame("1h").attrs["last_open"]
+    pyramid.sync(df.iloc[:2])
+    assert pyramid.is_open("1h") and pyramid.is_open("4h")
+    assert pyramid.frame("1h").attrs["last_open"]
+    # Revised last bar (e.g. a live bar re-fetched) forces a rebuild instead of a stale append
+    revised = df.iloc[:30].copy()
+    pyramid.sync(df.iloc[:30])
+    revised.iloc[-1, revised.columns.get_loc("high")] += 5
+    pyramid.sync(revised)
+    _same_bars(pyramid.frame("1h"), _pandas_resample(revised, "1h"))
+    assert not pyramid.sync(df.iloc[::-1])
+    try:
+        pyramid.append(df.index[0], 1.0, 1.0, 1.0, 1.0)
+        raise AssertionError("out-of-order bar accepted")
+    except ValueError:
+        pass
+    print("OK: Pyramid open-bar flag / rebuild on revision")
+
+
+def test_score_with_shared_pyramid():
+    df = _bars(400, 6, "America/New_York")
+    pyramid = ResamplePyramid()
+    for n in (10, 60, 200, 400):
+        part = df.iloc[:n]
+        assert score(part, freq_minutes=15, pyramid=pyramid) == score(part, freq_minutes=15)
+        assert score(part, freq_minutes=15, pyramid=pyramid, bounded=True) == score(part, freq_minutes=15)
+    df_1h, df_4h = get_resampled(df, 15, pyramid=pyramid)
+    assert df_1h is pyramid.frame("1h") and df_4h is pyramid.frame("4h")
+    print("OK: Engine and get_resampled share one pyramid")
+
+
+def test_timeframe_ladder():
+    # 5m input, 15min → 1h ladder: NumPy cascade equals pandas; bounded / streaming equal full
+    cfg = ScoringConfig.from_object(None).replace(TIMEFRAME_LADDER=("15min", "1h"))
+    df = _rebar(_bars(500, 3), "5min", "America/New_York")
+    for got, rule in zip(_resample_ladder(df, cfg.TIMEFRAME_LADDER), cfg.TIMEFRAME_LADDER):
+        pd.testing.assert_frame_equal(got, _pandas_resample(df, rule))
+    full = score(df, freq_minutes=5, config_obj=cfg, trace=True)
+    assert full["trace"]["timeframes"] == {"trend": "1h", "mid": "15min", "entry": "base"}
+    history = score_history(df.iloc[:300], freq_minutes=5, config_obj=cfg)
+    for n in (40, 150, 300):
+        part = df.iloc[:n]
+        expected = score(part, freq_minutes=5, config_obj=cfg)
+        assert score(part, freq_minutes=5, config_obj=cfg, bounded=True) == expected
+        assert history.iloc[n - 1]["long_score"] == expected["long_score"]
+        assert history.iloc[n - 1]["short_score"] == expected["short_score"]
+    pyramid = ResamplePyramid(5, cfg.TIMEFRAME_LADDER)
+    assert score(df, freq_minutes=5, config_obj=cfg, pyramid=pyramid) == score(df, freq_minutes=5, config_obj=cfg)
+    # 4h input, 1D → 1W calendar ladder: pandas resample; bounded falls back to full
+    cal = cfg.replace(TIMEFRAME_LADDER=("1D", "1W"))
+    df = _rebar(_bars(400, 8), "4h")
+    df_1d, df_1w = get_resampled(df, 240, config_obj=cal)
+    agg = {"open": "first", "high": "max", "low": "min", "close": "last"}
+    _same_bars(df_1d, df.resample("1D").agg(agg).dropna(how="all"))
+    _same_bars(df_1w, df.resample("1W").agg(agg).dropna(how="all"))
+    result = score(df, freq_minutes=240, config_obj=cal, trace=True)
+    assert result["trace"]["timeframes"] == {"trend": "1W", "mid": "1D", "entry": "base"}
+    assert score(df, freq_minutes=240, config_obj=cal, bounded=True) == score(df, freq_minutes=240, config_obj=cal)
+    # Validation
+    for bad in (("4h", "1h"), ("1h",), ("1h", "fortnight")):
+        try:
+            cfg.replace(TIMEFRAME_LADDER=bad)
+            raise AssertionError(f"ladder {bad!r} accepted")
+        except ValueError:
+            pass
+    print("OK: Timeframe ladder (5m → 15min / 1h, 4h → 1D / 1W)")
+
+
+def test_timeframe_alignment_matches_masks():
+    df = _bars(600, 9, "America/New_York")
+    align_1h, align_4h = get_alignment(df, 15)
+    for align, upper in zip((align_1h, align_4h), get_resampled(df, 15)):
+        assert len(align.parent) == len(df) and len(align.at_label) == len(upper)
+        for j in range(0, len(upper), 7):
+            label = upper.index[j]
+            assert align.at_label[j] == len(df[df.index <= label]) - 1
+            end = upper.index[j + 1] if j + 1 < len(upper) else df.index[-1] + pd.Timedelta("1s")
+            inside = df[(df.index >= label) & (df.index < end)]
+            assert df.iloc[align.children(j)].equals(inside)
+            assert (align.parent[align.children(j)] == j).all()
+            assert align.base_row_at(label) == align.at_label[j]
+    assert get_alignment(df.iloc[:10], 15) == (None, None)
+    # Built directly from two indexes (e.g. plotted slices)
+    tail = df.iloc[-200:]
+    align = TimeframeAlignment(tail.index, align_1h.upper)
+    assert align.parent[0] == align_1h.parent[-200]
+    markers = df.index[::13] + pd.Timedelta("7min")
+    assert (nearest_positions(df.index, markers) == df.index.get_indexer(markers, method="nearest")).all()
+    print("OK: TimeframeAlignment matches timestamp masks")
+
+
+if __name__ == "__main__":
+    test_numpy_resample_matches_pandas()
+    test_pyramid_matches_pandas_resample()
+    test_pyramid_open_bar_and_rebuild()
+    test_score_with_shared_pyramid()
+    test_timeframe_ladder()
+    test_timeframe_alignment_matches_masks()
+    print("\nAll resample tests passed.")
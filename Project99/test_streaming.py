@@ -0,0 +1,180 @@
+"""
+Streaming scorer tests: StreamingScorer.update must match score() on the history so far.
+Run: python -m Project99.test_streaming
+"""
+import sys
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+from Project99 import StreamingScorer, config, score, score_history
+from Project99.visualization.data_provider import ensure_asia_hong_kong
+from Project99.visualization.layout import _compute_weekly_high_score_markers
+
+
+def _bars(n, seed, tz=None):
+    """15m OHLC, weekdays only (weekend gaps), starting mid-day and mid-4h bucket."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.standard_normal(n) * 0.3)
+    open_ = np.r_[100, close[:-1]]
+    high = np.maximum(open_, close) + np.abs(rng.standard_normal(n)) * 0.2
+    low = np.minimum(open_, close) - np.abs(rng.standard_normal(n)) * 0.2
+    idx = pd.date_range("2024-03-07 13:45", periods=2 * n + 200, freq="15min", tz=tz)
+    idx = idx[idx.dayofweek < 5][:n]
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close}, index=idx).round(2)
+
+
+def _loose_config():
+    """Looser tolerances so stop_hunt / stop_money / impulse_break fire in random data."""
+    cfg = types.SimpleNamespace(**{k: getattr(config, k) for k in dir(config) if k.isupper()})
+    cfg.DOUBLE_TOLERANCE_PCT = 0.05
+    cfg.IMPULSE_BODY_RATIO = 1.2
+    return cfg
+
+
+def test_streaming_matches_score():
+    for cfg, tz in [(config, None), (_loose_config(), "America/New_York")]:
+        df = _bars(220, 5, tz)
+        scorer = StreamingScorer(config_obj=cfg, freq_minutes=15)
+        for i in range(len(df)):
+            got = scorer.update(df.iloc[i])
+            assert got == score(df.iloc[: i + 1], freq_minutes=15, config_obj=cfg), i
+    print("OK: StreamingScorer matches score() bar by bar")
+
+
+def test_streaming_rejects_bad_bars():
+    df = _bars(40, 1)
+    scorer = StreamingScorer(freq_minutes=15)
+    scorer.extend(df.iloc[:30])
+    bad = df.iloc[30].copy()
+    bad["high"] = bad["low"] - 1
+    r = scorer.update(bad)
+    assert "High < Low" in r["error"] and len(scorer) == 30
+    try:
+        scorer.update(df.iloc[5])
+        raise AssertionError("out-of-order bar accepted")
+    except ValueError:
+        pass
+    assert scorer.update(df.iloc[30]) == score(df.iloc[:31], freq_minutes=15)
+    print("OK: Invalid / out-of-order bars rejected")
+
+
+def test_bounded_matches_full():
+    # New_York range crosses the March DST switch; short prefixes hit the fallbacks
+    for cfg, tz in [(config, None), (_loose_config(), "America/New_York")]:
+        df = _bars(700, 3, tz)
+        for n in list(range(1, 60, 4)) + list(range(60, 701, 23)):
+            for freq in (15, None):
+                full = score(df.iloc[:n], freq_minutes=freq, config_obj=cfg)
+                assert score(df.iloc[:n], freq_minutes=freq, config_obj=cfg, bounded=True) == full, (n, freq)
+    shuffled = _bars(120, 2).sample(frac=1.0, random_state=0)
+    assert score(shuffled, freq_minutes=15, bounded=True) == score(shuffled, freq_minutes=15)
+    print("OK: Bounded scoring matches full-history scoring")
+
+
+def test_score_history_matches_score():
+    cfg = _loose_config()
+    df = _bars(160, 9, "America/New_York")
+    hist = score_history(df, freq_minutes=15, config_obj=cfg)
+    assert list(hist.index) == list(df.index)
+    for i in range(0, len(df), 7):
+        res = score(df.iloc[: i + 1], freq_minutes=15, config_obj=cfg)
+        row = hist.iloc[i]
+        for key in ("long_score", "short_score", "bias", "alert_long", "alert_short"):
+            assert row[key] == res[key], (i, key)
+        for n, v in res["long_conditions"].items():
+            assert row[f"long_{n}"] == v, (i, n)
+        for n, v in res["short_conditions"].items():
+            assert row[f"short_{n}"] == v, (i, n)
+    # A re-sent last bar (common from yfinance) or unsorted rows: scored as the sorted unique bars
+    repeated = pd.concat([df, df.iloc[[-1]]])
+    assert "error" not in score(repeated, freq_minutes=15, config_obj=cfg)
+    assert score_history(repeated, freq_minutes=15, config_obj=cfg).equals(hist)
+    assert score_history(df.iloc[::-1], freq_minutes=15, config_obj=cfg).equals(hist)
+    # After a failed row, each row reports the first failing check across its prefix, as score() does
+    bad = df.copy()
+    bad.iloc[50, bad.columns.get_loc("close")] = -1.0
+    bad.iloc[100, bad.columns.get_loc("high")] = bad["low"].iloc[100] - 1
+    errors = score_history(bad, freq_minutes=15, config_obj=cfg)["error"]
+    assert errors.iloc[:50].isna().all()
+    for i in (50, 99, 100, 150):
+        assert errors.iloc[i] == score(bad.iloc[: i + 1], freq_minutes=15, config_obj=cfg)["error"], i
+    assert errors.iloc[150] == "Data validation failed: High < Low in some rows"
+    print("OK: score_history rows match score() on prefixes")
+
+
+def test_per_day_asia_range_matches_score():
+    from Project99.scoring_config import resolve_config
+
+    cfg = resolve_config(_loose_config()).replace(SESSION_ASIA_PER_DAY=True)
+    df = _bars(600, 4, "Asia/Hong_Kong")
+    hist = score_history(df, freq_minutes=15, config_obj=cfg)
+    whole = score_history(df, freq_minutes=15, config_obj=cfg.replace(SESSION_ASIA_PER_DAY=False))
+    for freq in (15, None):
+        for n in range(30, 601, 19):
+            full = score(df.iloc[:n], freq_minutes=freq, config_obj=cfg)
+            assert score(df.iloc[:n], freq_minutes=freq, config_obj=cfg, bounded=True) == full, (n, freq)
+            if freq == 15:
+                assert hist.iloc[n - 1]["long_session"] == full["long_conditions"]["session"], n
+                assert hist.iloc[n - 1]["short_session"] == full["short_conditions"]["session"], n
+    fired = hist["long_session"] | hist["short_session"]
+    assert fired.any() and not fired.equals(whole["long_session"] | whole["short_session"])
+    print("OK: Per-day Asia range: streaming / bounded / full agree")
+
+
+def test_prior_window_matches_score():
+    from Project99.scoring_config import resolve_config
+
+    cfg = resolve_config(_loose_config()).replace(IMPULSE_PRIOR_WINDOW=12)
+    df = _bars(500, 6, "Asia/Hong_Kong")
+    hist = score_history(df, freq_minutes=15, config_obj=cfg)
+    whole = score_history(df, freq_minutes=15, config_obj=cfg.replace(IMPULSE_PRIOR_WINDOW=None))
+    for freq in (15, None):
+        for n in range(20, 501, 17):
+            full = score(df.iloc[:n], freq_minutes=freq, config_obj=cfg)
+            assert score(df.iloc[:n], freq_minutes=freq, config_obj=cfg, bounded=True) == full, (n, freq)
+            if freq == 15:
+                for side in ("long", "short"):
+                    assert hist.iloc[n - 1][f"{side}_impulse_break"] == full[f"{side}_conditions"]["impulse_break"], n
+    fired = hist["long_impulse_break"] | hist["short_impulse_break"]
+    assert fired.sum() > (whole["long_impulse_break"] | whole["short_impulse_break"]).sum()
+    print("OK: Windowed prior structure: streaming / bounded / full agree")
+
+
+def test_weekly_markers_from_history():
+    df = _bars(120, 5)
+    df_1h = df.resample("1h").agg({"open": "first", "high": "max", "low": "min", "close": "last"}).dropna(how="all")
+    hist = score_history(df, freq_minutes=15)
+    m1h, m15 = _compute_weekly_high_score_markers(df, df_1h, hist)
+    ref_1h = []
+    for ts in df_1h.index:
+        part = df[df.index <= ts]
+        if len(part) < 50:
+            continue
+        r = score(part, freq_minutes=15)
+        if r["long_score"] >= 4 or r["short_score"] >= 4 or abs(r["bias"]) >= 2:
+            ref_1h.append((ts, "long" if (r["long_score"] >= 4 or r["bias"] >= 2) else "short"))
+    assert m1h == ref_1h
+    assert all(hist.index.get_loc(ts) >= 50 for ts, _ in m15)
+    # A plotted tail in dashboard time reads the same rows of the full (raw-time) history
+    df = _bars(200, 2)
+    hist = score_history(df, freq_minutes=15)
+    m15 = _compute_weekly_high_score_markers(df, None, hist)[1]
+    tail = ensure_asia_hong_kong(df.tail(100))
+    expected = [(ts.tz_localize("UTC").tz_convert("Asia/Hong_Kong"), side) for ts, side in m15 if ts >= df.index[-100]]
+    assert expected and _compute_weekly_high_score_markers(tail, None, hist)[1] == expected
+    print("OK: Weekly markers read from score_history")
+
+
+if __name__ == "__main__":
+    test_streaming_matches_score()
+    test_streaming_rejects_bad_bars()
+    test_bounded_matches_full()
+    test_score_history_matches_score()
+    test_per_day_asia_range_matches_score()
+    test_prior_window_matches_score()
+    test_weekly_markers_from_history()
+    print("\nAll streaming tests passed.")
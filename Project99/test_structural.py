@@ -0,0 +1,277 @@
+"""
+Structural helper tests (swing pivots).
+Run: python -m Project99.test_structural
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+from Project99.structural import (
+    AsiaRangeTracker,
+    FrameFeatures,
+    RollingExtremum,
+    SwingIndex,
+    atr,
+    body_size,
+    dominant_direction,
+    hour_mask,
+    swing_high_mask,
+    swing_highs,
+    swing_low_mask,
+    swing_lows,
+    trading_day,
+    trading_days,
+    wick_small_relative_to_body,
+)
+from Project99.impulse import impulse_features, window_all
+
+
+def _loop_swing_highs(df, left, right):
+    """Reference: original per-bar loop."""
+    if len(df) < left + right + 1:
+        return []
+    idx = []
+    for i in range(left, len(df) - right):
+        h = df["high"].iloc[i]
+        if all(df["high"].iloc[i - j] <= h for j in range(1, left + 1)) and all(
+            df["high"].iloc[i + j] <= h for j in range(1, right + 1)
+        ):
+            idx.append(i)
+    return idx
+
+
+def _loop_swing_lows(df, left, right):
+    if len(df) < left + right + 1:
+        return []
+    idx = []
+    for i in range(left, len(df) - right):
+        l = df["low"].iloc[i]
+        if all(df["low"].iloc[i - j] >= l for j in range(1, left + 1)) and all(
+            df["low"].iloc[i + j] >= l for j in range(1, right + 1)
+        ):
+            idx.append(i)
+    return idx
+
+
+def _random_ohlc(n, seed):
+    rng = np.random.default_rng(seed)
+    # Coarse rounding forces equal neighbours (ties must count as pivots)
+    close = np.round(100 + np.cumsum(rng.standard_normal(n)), 0)
+    high = close + np.round(np.abs(rng.standard_normal(n)), 0)
+    low = close - np.round(np.abs(rng.standard_normal(n)), 0)
+    return pd.DataFrame({"open": close, "high": high, "low": low, "close": close})
+
+
+def test_swing_pivots_match_loop():
+    for seed in range(5):
+        df = _random_ohlc(300, seed)
+        for left, right in [(2, 2), (1, 3), (3, 1), (0, 2), (5, 5)]:
+            assert swing_highs(df, left, right) == _loop_swing_highs(df, left, right)
+            assert swing_lows(df, left, right) == _loop_swing_lows(df, left, right)
+    print("OK: Vectorized swing pivots match per-bar loop")
+
+
+def test_swing_mask_edges_and_nan():
+    df = _random_ohlc(40, 7)
+    df.loc[10, "high"] = np.nan
+    df.loc[20, "low"] = np.nan
+    assert swing_highs(df, 2, 2) == _loop_swing_highs(df, 2, 2)
+    assert swing_lows(df, 2, 2) == _loop_swing_lows(df, 2, 2)
+    assert swing_highs(df.head(4), 2, 2) == []
+    mask = swing_high_mask(df, 2, 2)
+    assert mask.dtype == bool and len(mask) == len(df)
+    assert not mask[:2].any() and not mask[-2:].any()
+    assert list(np.flatnonzero(swing_low_mask(df, 2, 2))) == swing_lows(df, 2, 2)
+    print("OK: Pivot mask edges / NaN")
+
+
+def test_swing_index_queries():
+    df = _random_ohlc(200, 3)
+    sw = SwingIndex.from_df(df, 2, 2)
+    sh, sl = swing_highs(df, 2, 2), swing_lows(df, 2, 2)
+    assert sw.high_pos.tolist() == sh and sw.low_pos.tolist() == sl
+    n = len(df)
+    for lookback in (1, 5, 20, 60, 500):
+        recent = [i for i in sh if i >= n - lookback]
+        assert sw.highs_in_last(lookback)[0].tolist() == recent
+        assert sw.last_highs(2, lookback) == [(i, float(df["high"].iloc[i])) for i in recent[-2:]]
+        latest = sw.latest_low(lookback)
+        recent_l = [i for i in sl if i >= n - lookback]
+        assert latest == ((recent_l[-1], float(df["low"].iloc[recent_l[-1]])) if recent_l else None)
+        level = float(df["close"].iloc[-1])
+        above = [df["high"].iloc[i] for i in recent if df["high"].iloc[i] > level]
+        assert sw.max_high_above(level, lookback) == (max(above) if above else None)
+    for pos in (0, 3, 100, n):
+        prior = [df["low"].iloc[i] for i in sl if i < pos]
+        assert sw.min_low_before(pos) == (min(prior) if prior else None)
+    assert sw.matches(df, 2, 2) and not sw.matches(df, 3, 2) and not sw.matches(df.head(10), 2, 2)
+    print("OK: SwingIndex range queries")
+
+
+def test_frame_features_memoize_helpers():
+    from Project99.conditions import CONDITION_FUNCS
+    from Project99.scoring_config import resolve_config
+    from Project99.test_streaming import _bars, _loose_config
+
+    df = _bars(300, 6, "Asia/Hong_Kong")
+    feats = FrameFeatures(df, 3, 2)
+    assert feats.body().equals(body_size(df["open"], df["close"]))
+    assert feats.avg_body().equals(body_size(df["open"], df["close"]).rolling(10, min_periods=3).mean())
+    assert feats.body() is feats.body() and feats.pivots(2, 2) is feats.pivots(2, 2)
+    assert np.array_equal(feats.swings.high_pos, SwingIndex.from_df(df, 3, 2).high_pos)
+    for lookback in (20, 30, 60):
+        assert feats.direction(lookback) == dominant_direction(df, lookback)
+    assert feats.atr(14) == atr(df, 14)
+    asia = df[(df.index.hour >= 5) & (df.index.hour < 16)]
+    assert feats.asia_range(5, 16) == (asia["high"].max(), asia["low"].min())
+    assert feats.asia_range(3, 3) is None
+    # Shared features give the standalone result
+    cfg = resolve_config(_loose_config())
+    shared = FrameFeatures(df, cfg.SWING_LEFT, cfg.SWING_RIGHT)
+    for fn in CONDITION_FUNCS:
+        for n in (150, 220, 300):
+            part = df.iloc[:n]
+            assert fn(part, cfg) == fn(part, cfg, features=FrameFeatures(part, cfg.SWING_LEFT, cfg.SWING_RIGHT))
+        assert fn(df, cfg, features=shared) == fn(df, cfg)
+    print("OK: FrameFeatures memoize the structural helpers")
+
+
+def test_session_masks_and_asia_by_day():
+    from Project99.test_streaming import _bars
+
+    df = _bars(400, 2, "Asia/Hong_Kong")
+    hours = df.index.hour
+    feats = FrameFeatures(df)
+    for start, end in ((15, 24), (20, 5), (5, 16), (3, 3)):
+        loop = [(start <= h < end) if start <= end else (h >= start or h < end) for h in hours]
+        assert np.array_equal(hour_mask(hours, start, end), loop)
+        assert np.array_equal(feats.session_mask(start, end), loop)
+    assert feats.session_mask(20, 5) is feats.session_mask(20, 5)
+    assert not feats.session_mask(20, 5, wrap=False).any()
+    asia = df[(hours >= 5) & (hours < 16)]
+    grouped = asia.groupby(asia.index.normalize()).agg({"high": "max", "low": "min"})
+    days = feats.asia_by_day(5, 16)
+    assert np.array_equal(days["high"].to_numpy(), grouped["high"].to_numpy())
+    assert np.array_equal(days["low"].to_numpy(), grouped["low"].to_numpy())
+    assert (days.index == grouped.index).all() and (days["first"].dt.normalize() == days.index).all()
+    assert feats.asia_by_day(3, 3).empty
+    print("OK: Cached session masks and per-day Asia ranges")
+
+
+def test_asia_range_tracker_matches_frame():
+    from Project99.test_streaming import _bars
+
+    df = _bars(500, 12, "Asia/Hong_Kong")
+    days = trading_days(df.index, 5)
+    assert all(trading_day(ts, 5) == d for ts, d in zip(df.index[::17], days[::17]))
+    # Bars after midnight stay on the previous trading day
+    assert trading_day(pd.Timestamp("2024-03-08 02:00", tz="Asia/Hong_Kong"), 5) == trading_day(
+        pd.Timestamp("2024-03-07 05:00", tz="Asia/Hong_Kong"), 5
+    )
+    tracker = AsiaRangeTracker(5, 16)
+    for i, ts in enumerate(df.index):
+        tracker.update(days[i], ts.hour, df["high"].iloc[i], df["low"].iloc[i])
+        assert tracker.current == FrameFeatures(df.iloc[: i + 1]).asia_day_range(5, 16), i
+    by_day = FrameFeatures(df).asia_by_day(5, 16)
+    closed = by_day.iloc[:-1] if not tracker.closed else by_day
+    assert [(h, l) for _, h, l in tracker.archive] == list(zip(closed["high"], closed["low"]))[-tracker.archive.maxlen:]
+    print("OK: AsiaRangeTracker matches the vectorized per-day range")
+
+
+def test_impulse_features_match_row_checks():
+    df = _random_ohlc(400, 13)
+    df["open"] = np.r_[df["close"].iloc[0], df["close"].to_numpy()[:-1]]  # zero and non-zero bodies
+    df["high"] = np.maximum(df["high"], df["open"])
+    df["low"] = np.minimum(df["low"], df["open"])
+    cols = [df[c].to_numpy() for c in ("open", "high", "low", "close")]
+    imp = impulse_features(*cols, 1.2, 0.5, 3, 2.0)
+    body = body_size(df["open"], df["close"])
+    avg = body.rolling(10, min_periods=3).mean()
+    assert np.array_equal(imp.avg_body, avg.to_numpy(), equal_nan=True)
+    small = [wick_small_relative_to_body(df.iloc[i], 0.5) for i in range(len(df))]
+    assert imp.small_wick.tolist() == small
+    for n in range(3, len(df) + 1, 7):
+        tail = df.iloc[:n].tail(3)
+        large = (body.iloc[:n].tail(3).values >= avg.iloc[:n].tail(3).values * 1.2).all()
+        three_ok = large and all(wick_small_relative_to_body(tail.iloc[i], 0.5) for i in range(3))
+        one_extreme = (body.iloc[:n].tail(3) > avg.iloc[:n].tail(3) * 2.0).any()
+        assert imp.run[n - 1] == three_ok and imp.triggered[n - 1] == (three_ok or one_extreme), n
+    mask = imp.large
+    assert window_all(mask, 4).tolist() == [mask[max(0, i - 3) : i + 1].all() for i in range(len(mask))]
+    assert imp.triggered.any() and not imp.triggered.all()
+    print("OK: Vectorized impulse features match the row-by-row checks")
+
+
+def test_prior_extrema_prefix_arrays():
+    from Project99.conditions import impulse_break, impulse_break_history
+    from Project99.scoring_config import resolve_config
+    from Project99.test_streaming import _bars, _loose_config
+
+    df = _bars(400, 21)
+    for left, right, n_candles, window in [(2, 2, 3, None), (2, 2, 3, 25), (1, 4, 2, 10), (3, 1, 3, 1)]:
+        highs, lows = SwingIndex.from_df(df, left, right).prior_extrema(n_candles, window)
+        for i in range(0, len(df), 9):
+            sw = SwingIndex.from_df(df.iloc[: i + 1], left, right)
+            limit = i + 1 - n_candles
+            assert sw.max_high_before(limit, window) == (None if np.isnan(highs[i]) else highs[i]), (i, window)
+            assert sw.min_low_before(limit, window) == (None if np.isnan(lows[i]) else lows[i]), (i, window)
+            first = max(limit - window, 0) if window is not None else 0
+            ref = sw.high_price[(sw.high_pos >= first) & (sw.high_pos < limit)]
+            assert sw.max_high_before(limit, window) == (ref.max() if len(ref) else None), (i, window)
+    # Monotonic deque vs brute-force window max / running min
+    rng = np.random.default_rng(3)
+    values = np.round(rng.standard_normal(300), 1)
+    ext, running = RollingExtremum("high", 7), RollingExtremum("low")
+    for i, v in enumerate(values):
+        ext.push(i, v)
+        running.push(i, v)
+        ext.evict(i + 1)
+        assert ext.value == values[max(i - 6, 0) : i + 1].max() and running.value == values[: i + 1].min()
+    assert len(running.items) == 1
+    for window in (None, 30):
+        cfg = resolve_config(_loose_config()).replace(IMPULSE_PRIOR_WINDOW=window, IMPULSE_BODY_RATIO=1.0)
+        hist = impulse_break_history(df, cfg)
+        for i in range(0, len(df), 3):
+            assert hist.iloc[i].to_dict() == impulse_break(df.iloc[: i + 1], cfg), (i, window)
+        assert hist["long"].any() and hist["short"].any()
+    print("OK: Prior-structure prefix arrays and impulse_break_history match per-prefix queries")
+
+
+def test_cluster_events_match_point_queries():
+    from Project99.structural import high_span, low_span
+    from Project99.test_streaming import _bars
+
+    df = _bars(500, 17)
+    feats = FrameFeatures(df)
+    for kind, spans in (("high", high_span), ("low", low_span)):
+        for tol_pct, lookback in ((0.05, 40), (0.02, 15)):
+            events = feats.cluster_events(kind, tol_pct, lookback)
+            assert events and all(e.first < e.second < e.formed <= e.until for e in events)
+            by_bar = {i: e for e in events for i in range(e.formed, e.until + 1)}
+            for i in range(0, len(df), 3):
+                part = df.iloc[: i + 1]
+                sw = SwingIndex.from_df(part)
+                got = sw.cluster(kind, spans(part) or 1.0, tol_pct, lookback)
+                # Reference: the last two pivots in the window, compared directly
+                last = sw.last_highs(2, lookback) if kind == "high" else sw.last_lows(2, lookback)
+                close = len(last) == 2 and abs(last[0][1] - last[1][1]) <= (spans(part) or 1.0) * tol_pct
+                assert (got is not None) == close, (kind, i)
+                e = by_bar.get(i)
+                assert got == (None if e is None else (e.level, e.first, e.second)), (kind, i)
+    print("OK: Cluster events match per-prefix double top / bottom queries")
+
+
+if __name__ == "__main__":
+    test_swing_pivots_match_loop()
+    test_swing_mask_edges_and_nan()
+    test_swing_index_queries()
+    test_frame_features_memoize_helpers()
+    test_session_masks_and_asia_by_day()
+    test_asia_range_tracker_matches_frame()
+    test_impulse_features_match_row_checks()
+    test_prior_extrema_prefix_arrays()
+    test_cluster_events_match_point_queries()
+    print("\nAll structural tests passed.")
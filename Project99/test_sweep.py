@@ -0,0 +1,68 @@
+"""
+Parameter sweep tests: sweep() must aggregate exactly what score_history gives per config.
+Run: python -m Project99.test_sweep
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+from Project99 import CONDITION_NAMES, ScoringConfig, score_history
+from Project99.sweep import config_grid, sweep
+from Project99.test_streaming import _bars, _loose_config
+
+
+def test_sweep_matches_score_history():
+    df = _bars(180, 5, "America/New_York")
+    base = ScoringConfig.from_object(_loose_config())
+    grid = config_grid(base, DOUBLE_TOLERANCE_PCT=[0.005, 0.05], RETRACE_MAX_TREND=[0.5, 0.618], SWING_LEFT=[2, 3])
+    table = sweep(df, grid, freq_minutes=15, warmup=30, backend="serial")
+    assert set(table.columns[:3]) == {"DOUBLE_TOLERANCE_PCT", "RETRACE_MAX_TREND", "SWING_LEFT"}
+    for ci, cfg in enumerate(grid):
+        hist = score_history(df, freq_minutes=15, config_obj=cfg).iloc[30:]
+        row = table.loc[ci]
+        assert row["bars"] == len(hist)
+        assert row["alert_long"] == hist["alert_long"].sum() and row["alert_short"] == hist["alert_short"].sum()
+        assert abs(row["long_score_mean"] - hist["long_score"].mean()) < 1e-12
+        assert abs(row["bias_mean"] - hist["bias"].mean()) < 1e-12
+        for name in CONDITION_NAMES:
+            assert row[f"long_{name}"] == hist[f"long_{name}"].sum(), (ci, name)
+            assert row[f"short_{name}"] == hist[f"short_{name}"].sum(), (ci, name)
+    print("OK: sweep matches score_history per config")
+
+
+def test_condition_params_cover_config_reads():
+    import inspect
+    import re
+
+    from Project99.conditions import CONDITION_FUNCS, CONDITION_PARAMS
+
+    for name, fn in zip(CONDITION_NAMES, CONDITION_FUNCS):
+        read = set(re.findall(r"cfg\.([A-Z_0-9]+)", inspect.getsource(inspect.getmodule(fn))))
+        assert read == set(CONDITION_PARAMS[name]), name
+    print("OK: CONDITION_PARAMS match the fields each condition reads")
+
+
+def test_sweep_backends_agree():
+    df = _bars(220, 8)
+    axes = {"IMPULSE_BODY_RATIO": [1.2, 1.5], "FIB_TOLERANCE_PCT": [0.005, 0.02]}
+    serial = sweep(df, axes, freq_minutes=15, backend="serial")
+    for backend in ("thread", "process"):
+        pd.testing.assert_frame_equal(sweep(df, axes, freq_minutes=15, workers=3, backend=backend), serial)
+    bad = df.copy()
+    bad.iloc[5, bad.columns.get_loc("low")] = -1
+    for args in ((bad, axes), (df.iloc[::-1], axes), (df, [])):
+        try:
+            sweep(*args, backend="serial")
+            raise AssertionError("invalid sweep accepted")
+        except ValueError:
+            pass
+    print("OK: sweep serial / thread / process agree")
+
+
+if __name__ == "__main__":
+    test_sweep_matches_score_history()
+    test_condition_params_cover_config_reads()
+    test_sweep_backends_agree()
+    print("\nAll sweep tests passed.")
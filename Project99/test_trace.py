@@ -0,0 +1,98 @@
+"""
+Trace tests: score(trace=True) records the structures behind each flag, and overlays use them.
+Run: python -m Project99.test_trace
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Project99 import CONDITION_NAMES, get_resampled, score
+from Project99.scoring_config import resolve_config
+from Project99.structural import FrameFeatures
+from Project99.test_streaming import _bars, _loose_config
+from Project99.visualization.data_provider import _viz_time, ensure_asia_hong_kong, get_visualization_data
+
+
+def test_trace_explains_flags():
+    cfg = resolve_config(_loose_config()).replace(IMPULSE_EXTREME_RATIO=1.5)
+    df = _bars(700, 7, "UTC")
+    fired = set()
+    for n in range(400, 701, 3):
+        part = df.iloc[:n]
+        res = score(part, freq_minutes=15, config_obj=cfg, trace=True, bounded=True)
+        trace = res.pop("trace")
+        assert res == score(part, freq_minutes=15, config_obj=cfg)
+        assert trace["timeframes"] == {"trend": "4h", "mid": "1h", "entry": "base"}
+        conds = trace["conditions"]
+        assert set(conds) == set(CONDITION_NAMES)
+        close = float(part["close"].iloc[-1])
+        for side in ("long", "short"):
+            flags = res[f"{side}_conditions"]
+            fired.update(name for name, v in flags.items() if v)
+            if flags["stop_hunt"]:
+                low, high = conds["stop_hunt"]["zone"]
+                cluster = conds["stop_hunt"]["cluster"]
+                assert cluster["side"] == side and low <= close <= high
+                # Same pair as the last event of the history detector on the 1h bars
+                mid = get_resampled(part, 15)[0]
+                kind = "low" if side == "long" else "high"
+                last = FrameFeatures(mid).cluster_events(kind, cfg.DOUBLE_TOLERANCE_PCT, cfg.DOUBLE_LOOKBACK)[-1]
+                assert last.until == len(mid) - 1 and last.level == cluster["level"]
+                assert [mid.index[last.first], mid.index[last.second]] == cluster["times"]
+            if flags["stop_money"]:
+                assert conds["stop_money"]["target"]["side"] == side
+            money = conds["stop_money"]
+            if "blocking" in money and money["target"]["side"] == side:
+                level, blocking = money["target"]["level"], money["blocking"]
+                assert not flags["stop_money"] and (blocking > level if side == "long" else blocking < level)
+            if flags["zone"]:
+                z = conds["zone"]["zone"]
+                assert z["direction"] == ("up" if side == "long" else "down")
+                assert z["low"] - z["tolerance"] <= close <= z["high"] + z["tolerance"]
+            if flags["impulse_break"]:
+                prior = conds["impulse_break"]["prior_high" if side == "long" else "prior_low"]
+                assert (close > prior) if side == "long" else (close < prior)
+                assert conds["impulse_break"]["impulse_bars"]
+            if flags["session"]:
+                asia = conds["session"]["asia_high" if side == "long" else "asia_low"]
+                assert (close > asia) if side == "long" else (close < asia)
+    assert {"stop_hunt", "zone", "impulse_break", "session"} <= fired, fired
+    full = score(df, freq_minutes=15, config_obj=cfg, trace=True)["trace"]["conditions"]
+    assert full == score(df, freq_minutes=15, config_obj=cfg, trace=True, bounded=True)["trace"]["conditions"]
+    print("OK: trace records the structures behind every flag")
+
+
+def test_overlays_come_from_trace():
+    cfg = resolve_config(_loose_config()).replace(IMPULSE_EXTREME_RATIO=1.5)
+    df = _bars(700, 7, "UTC")
+    res = score(df, freq_minutes=15, config_obj=cfg, trace=True)
+    conds = res["trace"]["conditions"]
+    df_1h, df_4h = get_resampled(df, 15)
+    viz = get_visualization_data(
+        ensure_asia_hong_kong(df), ensure_asia_hong_kong(df_1h), ensure_asia_hong_kong(df_4h), res
+    )
+    fib = conds["fib"]
+    assert viz["15m"]["fib"] == (fib["impulse_high"], fib["impulse_low"]) + tuple(fib["short_levels"])
+    zone = conds["zone"].get("zone")
+    if zone is not None:
+        assert viz["1h"]["zone"][1:4] == (zone["high"], zone["low"], _viz_time(zone["origin_time"]))
+    mid_swings = res["trace"]["swings"]["mid"]
+    assert [p for _, p in viz["1h"]["swing_highs"]] == [p for _, p in mid_swings["highs"]]
+    assert all(str(t.tz) == "Asia/Hong_Kong" for t, _ in viz["1h"]["swing_lows"])
+    assert viz["1h"]["double_clusters"]
+    bars = viz["1h"]["impulse_bars"]
+    assert len(bars) == len(conds["impulse_break"].get("impulse_bars", []))
+    hkt_1h = ensure_asia_hong_kong(df_1h)
+    asia = hkt_1h[(hkt_1h.index.hour >= cfg.SESSION_ASIA_START_HKT) & (hkt_1h.index.hour < cfg.SESSION_ASIA_END_HKT)]
+    assert [r[2] for r in viz["1h"]["asia_ranges"]] == asia.groupby(asia.index.normalize())["high"].max().tolist()
+    # No trace: structure overlays only, nothing recomputed from condition code
+    plain = get_visualization_data(df, df_1h, df_4h, None)
+    assert "stop_money_target" not in plain["1h"] and plain["15m"]["fib"] is None
+    print("OK: overlays are read from the trace")
+
+
+if __name__ == "__main__":
+    test_trace_explains_flags()
+    test_overlays_come_from_trace()
+    print("\nAll trace tests passed.")
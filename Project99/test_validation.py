@@ -9,7 +9,8 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 import pandas as pd
 import numpy as np
-from Project99 import score
+from Project99 import ScoringConfig, config, invalid_ohlc_rows, mark_validated, score
+from Project99.engine import _is_validated
 from Project99.utils import compute_rr_ratio
 
 
@@ -60,6 +61,85 @@ def test_nan_handling():
     print("OK: NaN rejected")
 
 
+def test_invalid_rows_reported():
+    df = pd.DataFrame({
+        "Open": [100, 100, 100, np.nan, 100, -1.0],
+        "High": [101, 99, 101, 102, 90, 1],
+        "Low": [99, 98, 100.5, 99, 95, -2],
+        "Close": [100, 100, 100, 101, 92, 0.5],
+    })
+    rows = invalid_ohlc_rows(df)
+    assert list(rows.index) == [1, 2, 3, 4, 5]
+    assert rows[1].startswith("High < Open") and rows[2].startswith("Low > Open")
+    assert rows[3] == "NaN in OHLC" and rows[4] == "High < Low in some rows"
+    assert rows[5] == "Non-positive prices"
+    # score() reports the first failing check across all rows, as before
+    assert score(df)["error"] == "Data validation failed: High < Low in some rows"
+    print("OK: Failing rows reported")
+
+
+def test_trusted_skips_validation():
+    df = pd.DataFrame({"open": [100.0], "high": [90.0], "low": [80.0], "close": [85.0]})
+    assert "error" not in score(df, trusted=True)
+    good = pd.DataFrame({"open": [100.0, 101], "high": [101.0, 102], "low": [99.0, 100], "close": [101.0, 102]})
+    assert mark_validated(good) == (True, "OK")
+    assert mark_validated(df) == (False, "High < Open or Close in some rows")
+    assert _is_validated(good) and not _is_validated(df) and not good.attrs
+    assert score(good) == score(good, trusted=True)
+    # Only that exact, unchanged frame is trusted: derived or modified frames are validated again
+    assert not _is_validated(good.iloc[:1]) and not _is_validated(good.copy())
+    assert score(good * -1)["error"] == "Data validation failed: High < Low in some rows"
+    assert score(good.shift(1))["error"] == "Data validation failed: NaN in OHLC"
+    assert "error" not in score(good.iloc[:1])
+    good["close"] = -good["close"]
+    assert not _is_validated(good)
+    assert score(good)["error"] == "Data validation failed: Low > Open or Close in some rows"
+    print("OK: Trusted / validated frames skip validation")
+
+
+def test_scoring_config_snapshot():
+    import pickle
+    import types
+
+    cfg = ScoringConfig.from_object(config)
+    assert cfg == ScoringConfig.from_object(None) and hash(cfg) == hash(ScoringConfig.from_object(config))
+    assert cfg.SCORE_THRESHOLD == config.SCORE_THRESHOLD and cfg.FIB_PRIMARY == config.FIB_PRIMARY
+    loose = cfg.replace(DOUBLE_TOLERANCE_PCT=0.05)
+    assert loose != cfg and len({cfg, loose, cfg.replace()}) == 2
+    assert pickle.loads(pickle.dumps(loose)) == loose
+    try:
+        cfg.SWING_LEFT = 3
+        raise AssertionError("config is mutable")
+    except AttributeError:
+        pass
+    assert not hasattr(cfg, "__dict__")
+    for bad in ({"SWING_LEFT": -1}, {"FIB_PRIMARY": 1.5}, {"ATR_PERIOD": 2.5}, {"RETRACE_MAX_TREND": 0.9}):
+        try:
+            cfg.replace(**bad)
+            raise AssertionError(f"accepted {bad}")
+        except ValueError:
+            pass
+    # Namespaces / modules are snapshotted; missing names come from config.py
+    ns = types.SimpleNamespace(DOUBLE_TOLERANCE_PCT=0.05)
+    assert ScoringConfig.from_object(ns) == loose
+    df = pd.DataFrame({
+        "open": [100.0, 101], "high": [101.0, 102], "low": [99.0, 100], "close": [101.0, 102],
+    })
+    assert score(df, config_obj=ns) == score(df, config_obj=loose)
+    # The default snapshot follows runtime edits of config.py
+    from Project99.scoring_config import resolve_config
+
+    assert resolve_config() is resolve_config(config)
+    saved = config.SCORE_THRESHOLD
+    try:
+        config.SCORE_THRESHOLD = 0
+        assert resolve_config().SCORE_THRESHOLD == 0 and score(df)["alert_long"]
+    finally:
+        config.SCORE_THRESHOLD = saved
+    assert resolve_config().SCORE_THRESHOLD == saved
+    print("OK: ScoringConfig frozen / hashable / validated")
+
+
 def test_compute_rr_ratio():
     valid, _ = compute_rr_ratio(100, 95, 110, 1.3)
     assert valid
@@ -74,5 +154,8 @@ if __name__ == "__main__":
     test_output_format()
     test_empty_df()
     test_nan_handling()
+    test_invalid_rows_reported()
+    test_trusted_skips_validation()
+    test_scoring_config_snapshot()
     test_compute_rr_ratio()
     print("\nAll validation tests passed.")
@@ -0,0 +1,140 @@
+"""
+Zone registry tests: incremental zones / retests match a brute-force scan, interval queries match a linear filter.
+Run: python -m Project99.test_zones
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from Project99 import ZoneRegistry, score, score_history
+from Project99.scoring_config import resolve_config
+from Project99.test_streaming import _bars, _loose_config
+from Project99.structural import FrameFeatures
+from Project99.visualization.data_provider import _display_zone, _panel_registry
+from Project99.zones import ZONE_LOOKBACK, zone_direction
+
+
+def _scan(df, body_ratio, wick_ratio, pct):
+    """Reference: every origin with its band and retest count (re-entries into the band after leaving it)."""
+    o, h, l, c = (df[k].to_numpy() for k in ("open", "high", "low", "close"))
+    avg = (df["close"] - df["open"]).abs().rolling(10, min_periods=3).mean().to_numpy()
+    zones = []
+    for p in range(len(df)):
+        direction = zone_direction(o[p], h[p], l[p], c[p], avg[p], body_ratio, wick_ratio)
+        if direction is None:
+            continue
+        tol = (h[p] - l[p]) * pct
+        inside = (c[p:] >= l[p] - tol) & (c[p:] <= h[p] + tol)
+        zones.append((p, direction, l[p] - tol, h[p] + tol, int((inside[1:] & ~inside[:-1]).sum())))
+    return zones
+
+
+def test_registry_matches_scan():
+    df = _bars(900, 7, "Asia/Hong_Kong")
+    ref = _scan(df, 1.2, 0.5, 0.01)
+    assert len(ref) > 50
+    registry = ZoneRegistry(1.2, 0.5, 0.01)
+    found = []
+    for t, row in df.iterrows():
+        z = registry.add(t, row["open"], row["high"], row["low"], row["close"])
+        if z is not None:
+            found.append(z)
+    assert [(z.pos, z.direction) for z in found] == [(p, d) for p, d, _, _, _ in ref]
+    assert [z.retests for z in found] == [r for *_, r in ref]
+    assert registry.latest is found[-1] and found[-1].time == df.index[found[-1].pos]
+    for price in np.linspace(df["low"].min(), df["high"].max(), 60):
+        linear = [p for p, _, lo, hi, _ in ref if lo <= price <= hi]
+        assert [z.pos for z in registry.containing(price)] == linear, price
+    print("OK: ZoneRegistry zones / retests / containing match a brute-force scan")
+
+
+def test_registry_expiry_and_sync():
+    df = _bars(600, 8)
+    ref = _scan(df, 1.2, 0.5, 0.01)
+    last = len(df) - 1
+    aged = ZoneRegistry(1.2, 0.5, 0.01, max_age=30).sync(df)
+    for price in np.linspace(df["low"].min(), df["high"].max(), 40):
+        linear = [p for p, _, lo, hi, _ in ref if lo <= price <= hi and p >= last - 30]
+        assert [z.pos for z in aged.containing(price)] == linear, price
+    # Inserts and expiries interleaved bar by bar: the incrementally kept index answers like a linear filter
+    aged = ZoneRegistry(1.2, 0.5, 0.01, max_age=30)
+    for i, (t, row) in enumerate(df.iterrows()):
+        aged.add(t, row["open"], row["high"], row["low"], row["close"])
+        price = float(row["close"])
+        live = [p for p, _, lo, hi, _ in ref if p <= i and lo <= price <= hi and p >= i - 30]
+        assert [z.pos for z in aged.containing(price)] == live, i
+    capped = ZoneRegistry(1.2, 0.5, 0.01, max_retests=1).sync(df)
+    close = float(df["close"].iloc[-1])
+    assert [z.pos for z in capped.containing(close)] == [p for p, _, lo, hi, r in ref if lo <= close <= hi and r <= 1]
+
+    # Refreshes (growing, then sliding window) only add new bars and end up as a fresh build
+    registry = ZoneRegistry(1.2, 0.5, 0.01)
+    for stop in (200, 350, 351, 600):
+        registry.sync(df.iloc[max(0, stop - 300):stop])
+    fresh = ZoneRegistry(1.2, 0.5, 0.01).sync(df)
+    assert registry.n == 600 and registry.latest.pos == fresh.latest.pos
+    assert [(z.pos, z.retests) for z in registry.containing(close)] == [(z.pos, z.retests) for z in fresh.containing(close)]
+    revised = df.iloc[:400].copy()
+    revised.iloc[-1, revised.columns.get_loc("close")] += 0.01
+    registry.sync(revised)
+    assert registry.n == 400 and registry.last_bar[1] == revised["close"].iloc[-1]
+    # NaN bars add no zone and visit none (trusted frames skip the NaN check)
+    holed = df.copy()
+    holed.iloc[[100, 250], :] = np.nan
+    registry = ZoneRegistry(1.2, 0.5, 0.01).sync(holed)
+    assert registry.n == 600 and all(z.pos not in (100, 250) for z in registry.active)
+    assert registry.containing(float("nan")) == []
+    shifted = score(df.shift(1), freq_minutes=15, config_obj=resolve_config(_loose_config()), trusted=True)
+    assert "error" not in shifted
+    print("OK: ZoneRegistry expiry by age / retests and incremental sync")
+
+
+def test_display_zone_uses_condition_window():
+    cfg = resolve_config(_loose_config())
+    df = _bars(500, 7, "UTC")
+    params = (cfg.ZONE_IMPULSE_BODY_RATIO, cfg.ZONE_WICK_TO_BODY_MAX, cfg.ZONE_REVISIT_TOLERANCE_PCT)
+    registry = None
+    shown = 0
+    for n in range(40, 501, 7):
+        part = df.iloc[:n]
+        registry = _panel_registry(part, cfg, registry)
+        assert registry.max_age == ZONE_LOOKBACK and registry.n == n - 1
+        lookback = min(ZONE_LOOKBACK, n - 2)
+        ref = FrameFeatures(part).zones(*params, n - lookback + 1).latest_within(lookback)
+        display = _display_zone(part, registry)
+        assert (display and display[3]) == (ref and part.index[ref.pos]), n
+        shown += display is not None
+    assert shown > 0
+    print("OK: display zone uses the zone condition's window over closed bars")
+
+
+def test_zone_max_retests_streaming_matches_score():
+    cfg = resolve_config(_loose_config())
+    df = _bars(500, 11, "America/New_York")
+    capped = cfg.replace(ZONE_MAX_RETESTS=0)
+    hist = score_history(df, freq_minutes=15, config_obj=capped)
+    base = score_history(df, freq_minutes=15, config_obj=cfg)
+    for freq in (15, None):
+        for n in range(20, 501, 23):
+            full = score(df.iloc[:n], freq_minutes=freq, config_obj=capped)
+            assert score(df.iloc[:n], freq_minutes=freq, config_obj=capped, bounded=True) == full, (n, freq)
+            if freq == 15:
+                assert hist.iloc[n - 1]["long_zone"] == full["long_conditions"]["zone"], n
+                assert hist.iloc[n - 1]["short_zone"] == full["short_conditions"]["zone"], n
+    fired = hist["long_zone"] | hist["short_zone"]
+    fired_base = base["long_zone"] | base["short_zone"]
+    assert fired_base.any() and not (fired & ~fired_base).any() and fired.sum() < fired_base.sum()
+    res = score(df, freq_minutes=15, config_obj=cfg, trace=True)
+    zone = res["trace"]["conditions"]["zone"].get("zone")
+    assert zone is None or zone["retests"] >= 0
+    print("OK: ZONE_MAX_RETESTS: streaming / bounded / full agree")
+
+
+if __name__ == "__main__":
+    test_registry_matches_scan()
+    test_registry_expiry_and_sync()
+    test_display_zone_uses_condition_window()
+    test_zone_max_retests_streaming_matches_score()
+    print("\nAll zone tests passed.")
@@ -1,5 +1,7 @@
 """
-Gather overlay coordinates for rendering. Uses structural helpers only; no scoring.
+Gather overlay coordinates for rendering. No scoring: condition overlays come from the trace of
+score(..., trace=True) (the structures the engine actually used); without a trace only swings,
+blocking levels and zones are drawn.
 Returns dict keyed by timeframe and overlay type for the viz layer to draw.
 Phase 2.6: Timezone alignment to Asia/Hong_Kong (dashboard time matches TradingView UTC+8).
 """
@@ -35,16 +37,13 @@ def ensure_asia_hong_kong(df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
     out.index = idx
     return out
 
-from .. import config as default_config
-from ..structural import (
-    body_size,
-    recent_swing_high,
-    recent_swing_low,
-    swing_highs,
-    swing_lows,
-    trend_state,
-    wick_small_relative_to_body,
-)
+from ..liquidity import LiquidityBook
+from ..scoring_config import resolve_config
+from ..structural import FrameFeatures, SwingIndex
+from ..zones import ZONE_LOOKBACK, ZoneRegistry
+
+# Viz panel → (engine timeframe role, label that role must carry in trace["timeframes"])
+PANEL_ROLES = {"4h": ("trend", "4h"), "1h": ("mid", "1h"), "15m": ("entry", "base")}
 
 
 def _normalize(df: pd.DataFrame) -> pd.DataFrame:
@@ -52,167 +51,131 @@ def _normalize(df: pd.DataFrame) -> pd.DataFrame:
     return df.rename(columns=m) if m else df
 
 
-def _swing_points(df: pd.DataFrame, left: int = 2, right: int = 2) -> Tuple[List[Tuple[Any, float]], List[Tuple[Any, float]]]:
+def _viz_time(ts: Any) -> Any:
+    """Trace timestamp in dashboard time (same rule as ensure_asia_hong_kong)."""
+    if not isinstance(ts, pd.Timestamp):
+        return ts
+    if ts.tz is None:
+        ts = ts.tz_localize("UTC")
+    return ts.tz_convert(VIZ_TIMEZONE)
+
+
+def _swing_points(
+    df: pd.DataFrame, left: int = 2, right: int = 2
+) -> Tuple[List[Tuple[Any, float]], List[Tuple[Any, float]]]:
     """(times, high), (times, low) for swing high/low. Uses index for x."""
     df = _normalize(df)
-    sh_idx = swing_highs(df, left, right)
-    sl_idx = swing_lows(df, left, right)
+    sw = SwingIndex.from_df(df, left, right)
     idx = df.index
-    highs = [(idx[i], float(df["high"].iloc[i])) for i in sh_idx]
-    lows = [(idx[i], float(df["low"].iloc[i])) for i in sl_idx]
+    highs = [(idx[i], float(p)) for i, p in zip(sw.high_pos, sw.high_price)]
+    lows = [(idx[i], float(p)) for i, p in zip(sw.low_pos, sw.low_price)]
     return highs, lows
 
 
-def _top_n_levels(highs: List[Tuple[Any, float]], lows: List[Tuple[Any, float]], n: int = 2
-) -> Tuple[List[float], List[float]]:
-    """Top n swing high levels and top n swing low levels (by price)."""
-    h_vals = sorted([p for _, p in highs], reverse=True)[:n]
-    l_vals = sorted([p for _, p in lows])[:n]
-    return h_vals, l_vals
+def _traced_points(points: List[Tuple[Any, float]], df: pd.DataFrame) -> List[Tuple[Any, float]]:
+    """Trace pivots inside the plotted window, in dashboard time."""
+    out = [(_viz_time(t), p) for t, p in points]
+    if isinstance(df.index, pd.DatetimeIndex):
+        out = [(t, p) for t, p in out if df.index[0] <= t <= df.index[-1]]
+    return out
 
 
-def _impulse_bars(df: pd.DataFrame, body_ratio: float = 1.5, extreme_ratio: float = 2.0,
-                  wick_ratio: float = 0.5, n: int = 3) -> List[int]:
-    """Indices of last n bars that are impulse (large body, small wick). Returns at most n."""
-    df = _normalize(df)
-    if len(df) < 10:
-        return []
-    body = body_size(df["open"], df["close"])
-    avg = body.rolling(10, min_periods=3).mean()
-    out = []
-    for i in range(len(df) - 1, max(len(df) - 15, 0), -1):
-        if len(out) >= n:
-            break
-        if avg.iloc[i] <= 0:
-            continue
-        if body.iloc[i] >= avg.iloc[i] * extreme_ratio:
-            out.append(i)
-            continue
-        if body.iloc[i] >= avg.iloc[i] * body_ratio and wick_small_relative_to_body(df.iloc[i], wick_ratio):
-            out.append(i)
-    return out
+def _panel_book(df: pd.DataFrame, cfg: Any, book: Optional[LiquidityBook] = None) -> LiquidityBook:
+    """
+    Liquidity levels stop_money checks blocking on (2 / 2 swings in the last DOUBLE_LOOKBACK bars):
+    book (the persistent one the engine read, e.g. ResamplePyramid.book) if given for this config,
+    else one built from the panel's bars.
+    """
+    if book is not None and book.window == cfg.DOUBLE_LOOKBACK:
+        return book
+    return FrameFeatures(df).liquidity(cfg.DOUBLE_LOOKBACK)
 
 
-def _double_bottom_cluster(df: pd.DataFrame, lookback: int, tol_pct: float
-) -> Optional[Tuple[float, float, float]]:
-    """(level, zone_low, zone_high) retracement zone for long. None if not found."""
-    idx = swing_lows(df, 2, 2)
-    in_r = [i for i in idx if i >= len(df) - lookback]
-    if len(in_r) < 2:
-        return None
-    lows = [(i, float(df["low"].iloc[i])) for i in in_r]
-    lows.sort(key=lambda x: x[0])
-    l1, l2 = lows[-2], lows[-1]
-    span = float(df["low"].max() - df["low"].min()) or 1.0
-    if abs(l1[1] - l2[1]) > span * tol_pct:
-        return None
-    sh = recent_swing_high(df, lookback, 2, 2)
-    sl = recent_swing_low(df, lookback, 2, 2)
-    if sh is None or sl is None or sh <= sl:
-        return None
-    span_leg = sh - sl
-    zone_high = sh - 0.5 * span_leg
-    zone_low = sh - 0.7 * span_leg
-    return (min(l1[1], l2[1]), zone_low, zone_high)
-
-
-def _double_top_cluster(df: pd.DataFrame, lookback: int, tol_pct: float
-) -> Optional[Tuple[float, float, float]]:
-    """(level, zone_low, zone_high) for short retracement zone."""
-    idx = swing_highs(df, 2, 2)
-    in_r = [i for i in idx if i >= len(df) - lookback]
-    if len(in_r) < 2:
+def _panel_role(trace: Dict[str, Any], label: str) -> Optional[str]:
+    """Engine role whose bars this panel shows, if the traced score used them."""
+    role, bars = PANEL_ROLES[label]
+    return role if trace.get("timeframes", {}).get(role) == bars else None
+
+
+def _zone_overlay(zone: Optional[Dict[str, Any]], df: pd.DataFrame) -> Optional[Tuple[str, float, float, Any, Any]]:
+    """('demand'|'supply', high, low, start_time, end_time) from a traced zone."""
+    if not zone:
         return None
-    highs = [(i, float(df["high"].iloc[i])) for i in in_r]
-    highs.sort(key=lambda x: x[0])
-    h1, h2 = highs[-2], highs[-1]
-    span = float(df["high"].max() - df["high"].min()) or 1.0
-    if abs(h1[1] - h2[1]) > span * tol_pct:
+    kind = "demand" if zone["direction"] == "up" else "supply"
+    return (kind, zone["high"], zone["low"], _viz_time(zone["origin_time"]), df.index[-1])
+
+
+def _panel_registry(df: pd.DataFrame, cfg: Any, registry: Optional[ZoneRegistry] = None) -> ZoneRegistry:
+    """
+    registry (kept by the caller across refreshes) synced to the panel's closed bars (every bar but the
+    last, as the zone condition sees them); a new one if None or built for another config.
+    Zones expire after ZONE_LOOKBACK bars, so a long-lived registry stays small.
+    """
+    fresh = ZoneRegistry.from_config(cfg, max_age=ZONE_LOOKBACK)
+    if registry is None or (registry.params, registry.max_age) != (fresh.params, fresh.max_age):
+        registry = fresh
+    return registry.sync(df.iloc[:-1])
+
+
+def _display_zone(df: pd.DataFrame, registry: ZoneRegistry) -> Optional[Tuple[str, float, float, Any, Any]]:
+    """Zone for a panel the zone condition does not score: newest registry zone in the condition's window."""
+    if len(df) < 10:
         return None
-    sl = recent_swing_low(df, lookback, 2, 2)
-    sh = recent_swing_high(df, lookback, 2, 2)
-    if sh is None or sl is None or sh <= sl:
+    z = registry.latest_within(min(ZONE_LOOKBACK, len(df) - 2))
+    if z is None:
         return None
-    span_leg = sh - sl
-    zone_low = sl + 0.5 * span_leg
-    zone_high = sl + 0.7 * span_leg
-    return (max(h1[1], h2[1]), zone_low, zone_high)
-
-
-def _stop_money_target(df: pd.DataFrame, lookback: int, tol_pct: float
-) -> Optional[Tuple[str, float]]:
-    """('long', level) or ('short', level) or None. One target only."""
-    cfg = default_config
-    state = trend_state(df, lookback)
-    if state == 1:
-        # double top ahead
-        idx = swing_highs(df, 2, 2)
-        in_r = [i for i in idx if i >= len(df) - lookback]
-        if len(in_r) < 2:
-            return None
-        highs = [(i, float(df["high"].iloc[i])) for i in in_r]
-        highs.sort(key=lambda x: x[0])
-        h1, h2 = highs[-2], highs[-1]
-        span = float(df["high"].max() - df["high"].min()) or 1.0
-        if abs(h1[1] - h2[1]) <= span * tol_pct:
-            level = max(h1[1], h2[1])
-            if level > float(df["close"].iloc[-1]):
-                return ("long", level)
-    if state == -1:
-        idx = swing_lows(df, 2, 2)
-        in_r = [i for i in idx if i >= len(df) - lookback]
-        if len(in_r) < 2:
-            return None
-        lows = [(i, float(df["low"].iloc[i])) for i in in_r]
-        lows.sort(key=lambda x: x[0])
-        l1, l2 = lows[-2], lows[-1]
-        span = float(df["low"].max() - df["low"].min()) or 1.0
-        if abs(l1[1] - l2[1]) <= span * tol_pct:
-            level = min(l1[1], l2[1])
-            if level < float(df["close"].iloc[-1]):
-                return ("short", level)
-    return None
-
-
-def _one_zone(df: pd.DataFrame, lookback: int = 30) -> Optional[Tuple[str, float, float, Any, Any]]:
-    """('demand'|'supply', high, low, start_time, end_time). One zone per TF."""
-    df = _normalize(df)
-    body = body_size(df["open"], df["close"])
-    avg = body.rolling(10, min_periods=3).mean()
-    body_ratio = getattr(default_config, "ZONE_IMPULSE_BODY_RATIO", 1.2)
-    wick_ratio = getattr(default_config, "ZONE_WICK_TO_BODY_MAX", 0.5)
-    for i in range(len(df) - 1, max(len(df) - lookback, 0), -1):
-        if avg.iloc[i] <= 0 or body.iloc[i] < avg.iloc[i] * body_ratio:
-            continue
-        if not wick_small_relative_to_body(df.iloc[i], wick_ratio):
-            continue
-        h, l = float(df["high"].iloc[i]), float(df["low"].iloc[i])
-        t0, t1 = df.index[i], df.index[-1]
-        if df["close"].iloc[i] > df["open"].iloc[i]:
-            return ("demand", h, l, t0, t1)
-        return ("supply", h, l, t0, t1)
-    return None
+    return (z.kind, z.high, z.low, z.time, df.index[-1])
 
 
-def _fib_levels(df: pd.DataFrame, body_ratio: float = 1.5) -> Optional[Tuple[float, float, float, float, float]]:
-    """(impulse_high, impulse_low, f50, f618, f88). From high for down retrace."""
-    df = _normalize(df)
-    body = body_size(df["open"], df["close"])
-    avg = body.rolling(10, min_periods=3).mean()
-    for i in range(len(df) - 1, max(len(df) - 25, 0), -1):
-        if avg.iloc[i] > 0 and body.iloc[i] >= avg.iloc[i] * body_ratio:
-            ih = float(df["high"].iloc[i:].max())
-            il = float(df["low"].iloc[i:].min())
-            span = ih - il
-            if span <= 0:
-                return None
-            return (ih, il, ih - 0.5 * span, ih - 0.618 * span, ih - 0.88 * span)
-    ih = float(df["high"].tail(20).max())
-    il = float(df["low"].tail(20).min())
-    span = ih - il
-    if span <= 0:
-        return None
-    return (ih, il, ih - 0.5 * span, ih - 0.618 * span, ih - 0.88 * span)
+def _active_zones(df: pd.DataFrame, registry: ZoneRegistry) -> List[Tuple[str, float, float, Any, Any, int]]:
+    """(kind, high, low, origin, end, retests) of every active zone containing the last close (retests include it)."""
+    if df.empty:
+        return []
+    end = df.index[-1]
+    close = float(df["close"].iloc[-1])
+    return [(z.kind, z.high, z.low, z.time, end, registry.retests_at(z, close)) for z in registry.containing(close)]
+
+
+def _structure_overlays(conditions: Dict[str, Any], role: str, df: pd.DataFrame) -> Dict[str, Any]:
+    """1H overlays from the traces of the conditions scored on this panel's bars."""
+    def traced(name: str) -> Dict[str, Any]:
+        t = conditions.get(name) or {}
+        return t if t.get("timeframe") == role else {}
+
+    out: Dict[str, Any] = {}
+    times = [_viz_time(t) for t in traced("impulse_break").get("impulse_bars", [])]
+    out["impulse_bars"] = [int(i) for i in df.index.get_indexer(times) if i >= 0] if times else []
+    hunt = traced("stop_hunt")
+    cluster = hunt.get("cluster")
+    out["stop_hunt_double_bottom"] = None
+    out["stop_hunt_double_top"] = None
+    if cluster:
+        key = "stop_hunt_double_bottom" if cluster["side"] == "long" else "stop_hunt_double_top"
+        out[key] = (cluster["level"],) + tuple(hunt["zone"])
+    money = traced("stop_money")
+    target = money.get("target")
+    out["stop_money_target"] = (target["side"], target["level"]) if target else None
+    out["stop_money_blocking"] = money.get("blocking")
+    return out
+
+
+def _asia_ranges(df: pd.DataFrame, cfg: Any) -> List[Tuple[Any, Any, float, float]]:
+    """(first bar, last bar, high, low) of each day's Asia session: same session masks as the engine."""
+    if not isinstance(df.index, pd.DatetimeIndex):
+        return []
+    days = FrameFeatures(df).asia_by_day(cfg.SESSION_ASIA_START_HKT, cfg.SESSION_ASIA_END_HKT)
+    return list(zip(days["first"], days["last"], days["high"].tolist(), days["low"].tolist()))
+
+
+def _cluster_events(df: pd.DataFrame, cfg: Any) -> List[Tuple[str, float, Any, Any]]:
+    """(kind, level, first pivot, second pivot) of every double top / bottom: the conditions' detector over the panel."""
+    feats = FrameFeatures(df)
+    events = [
+        e
+        for kind in ("high", "low")
+        for e in feats.cluster_events(kind, cfg.DOUBLE_TOLERANCE_PCT, cfg.DOUBLE_LOOKBACK)
+    ]
+    return [(e.kind, e.level, df.index[e.first], df.index[e.second]) for e in sorted(events, key=lambda e: e.formed)]
 
 
 def get_visualization_data(
@@ -220,15 +183,25 @@ def get_visualization_data(
     df_1h: Optional[pd.DataFrame],
     df_4h: Optional[pd.DataFrame],
     result: Optional[Dict[str, Any]] = None,
+    zones: Optional[Dict[str, ZoneRegistry]] = None,
+    books: Optional[Dict[str, LiquidityBook]] = None,
 ) -> Dict[str, Any]:
     """
     Build overlay data for 4H, 1H, 15M. Does not modify or recompute score.
-    result is optional (for session breakout / condition-driven highlights).
+    result: score(..., trace=True) output; its trace supplies swings, impulse bars, stop-hunt
+    cluster / zone, stop-money target, zone and fib levels (session highlights read the flags;
+    per-day Asia ranges and the double top / bottom history come from the 1H panel's own features).
+    zones: {panel: ZoneRegistry} kept across refreshes (synced in place to the closed bars: only new bars
+    are added; zones expire after ZONE_LOOKBACK bars); panels without one get a fresh registry.
+    Untraced zones and the 1H active zones come from it.
+    books: {panel: LiquidityBook} synced to the panel's full bars (ResamplePyramid.book(rule,
+    DOUBLE_LOOKBACK), the book score(..., pyramid=) hands stop_money); blocking lines are its
+    outermost levels. Panels without one build the same levels from their bars.
     """
-    cfg = default_config
-    lookback = getattr(cfg, "DOUBLE_LOOKBACK", 20)
-    tol_pct = getattr(cfg, "DOUBLE_TOLERANCE_PCT", 0.005)
-    left, right = getattr(cfg, "SWING_LEFT", 2), getattr(cfg, "SWING_RIGHT", 2)
+    cfg = resolve_config()
+    left, right = cfg.SWING_LEFT, cfg.SWING_RIGHT
+    trace = (result or {}).get("trace") or {}
+    conditions = trace.get("conditions", {})
 
     out = {"4h": {}, "1h": {}, "15m": {}}
 
@@ -236,26 +209,43 @@ def get_visualization_data(
         if df is None or len(df) < 5:
             continue
         df = _normalize(df)
-        lb = min(lookback, len(df) - 1)
+        role = _panel_role(trace, label)
 
-        highs, lows = _swing_points(df, left, right)
+        traced_swings = trace.get("swings", {}).get(role) if role else None
+        if traced_swings is not None:
+            highs = _traced_points(traced_swings["highs"], df)
+            lows = _traced_points(traced_swings["lows"], df)
+        else:
+            highs, lows = _swing_points(df, left, right)
         out[label]["swing_highs"] = highs
         out[label]["swing_lows"] = lows
-        h_vals, l_vals = _top_n_levels(highs, lows, n=2)
-        out[label]["blocking_highs"] = h_vals
-        out[label]["blocking_lows"] = l_vals
-
-        zone = _one_zone(df, lookback=min(30, len(df) - 1))
-        out[label]["zone"] = zone
+        book = _panel_book(df, cfg, (books or {}).get(label))
+        out[label]["blocking_highs"] = book.top("high", 2)
+        out[label]["blocking_lows"] = book.top("low", 2)
+
+        registry = _panel_registry(df, cfg, (zones or {}).get(label))
+        if zones is not None:
+            zones[label] = registry
+        zone_trace = conditions.get("zone") or {}
+        if role and zone_trace.get("timeframe") == role:
+            out[label]["zone"] = _zone_overlay(zone_trace.get("zone"), df)
+        else:
+            out[label]["zone"] = _display_zone(df, registry)
 
         if label == "1h":
-            out[label]["impulse_bars"] = _impulse_bars(df, body_ratio=1.5, extreme_ratio=2.0, wick_ratio=0.5, n=3)
-            out[label]["stop_hunt_double_bottom"] = _double_bottom_cluster(df, lb, tol_pct)
-            out[label]["stop_hunt_double_top"] = _double_top_cluster(df, lb, tol_pct)
-            out[label]["stop_money_target"] = _stop_money_target(df, lb, tol_pct)
+            if role:
+                out[label].update(_structure_overlays(conditions, role, df))
+            out[label]["asia_ranges"] = _asia_ranges(df, cfg)
+            out[label]["active_zones"] = _active_zones(df, registry)
+            out[label]["double_clusters"] = _cluster_events(df, cfg)
             out[label]["session_breakout_long"] = result.get("long_conditions", {}).get("session", False) if result else False
             out[label]["session_breakout_short"] = result.get("short_conditions", {}).get("session", False) if result else False
         if label == "15m":
-            out[label]["fib"] = _fib_levels(df, body_ratio=1.5)
+            fib_trace = conditions.get("fib") or {}
+            if role and fib_trace.get("timeframe") == role and "short_levels" in fib_trace:
+                f50, f618, f88 = fib_trace["short_levels"]
+                out[label]["fib"] = (fib_trace["impulse_high"], fib_trace["impulse_low"], f50, f618, f88)
+            else:
+                out[label]["fib"] = None
 
     return out
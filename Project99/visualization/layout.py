@@ -3,12 +3,16 @@ Three-panel figure: 4H, 1H, 15M. Shared x only for same TF family optional; here
 Phase 2.3 & 2.4: weekend gaps removed, ~500 bars visible, weekly stars, smart Y-axis, grid, proportions.
 """
 
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from ..conditions import CONDITION_NAMES
+from ..liquidity import LiquidityBook
+from ..resample import ResamplePyramid, TimeframeAlignment
+from ..zones import ZoneRegistry
 from .data_provider import ensure_asia_hong_kong, get_visualization_data
 from .plot_trend import plot_trend
 from .plot_structure import plot_structure
@@ -18,50 +22,69 @@ from .plot_deployment import plot_deployment
 PLOT_BARS = 500
 
 
-def _resample_15m_to_1h_viz(df_15m: pd.DataFrame) -> pd.DataFrame:
-    """Resample 15m to 1H (same logic as engine). Visualization layer only."""
+def _resample_15m_to_1h_viz(df_15m: pd.DataFrame, pyramid: Optional[ResamplePyramid] = None) -> pd.DataFrame:
+    """Resample 15m to 1H (same logic as engine). Visualization layer only; reuses the asset's pyramid if given."""
     if df_15m is None or df_15m.empty or not isinstance(df_15m.index, pd.DatetimeIndex):
         return pd.DataFrame()
     df = df_15m.rename(columns={c: c.lower() for c in df_15m.columns if c.lower() in ("open", "high", "low", "close")})
     if "open" not in df.columns:
         return pd.DataFrame()
+    if pyramid is not None and pyramid.sync(df):
+        return pyramid.frame("1h")
     agg = {"open": "first", "high": "max", "low": "min", "close": "last"}
     return df.resample("1h").agg(agg).dropna(how="all")
 
 
+def _as_utc(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    """Naive labels read as UTC (ensure_asia_hong_kong's rule), so raw and dashboard-time bars align."""
+    return index.tz_localize("UTC") if index.tz is None else index
+
+
+def _history_result(history: pd.DataFrame, pos: int) -> Dict[str, Any]:
+    """One score_history row back in score() dict form."""
+    row = history.iloc[pos]
+    return {
+        "long_score": int(row["long_score"]),
+        "short_score": int(row["short_score"]),
+        "bias": int(row["bias"]),
+        "long_conditions": {n: bool(row[f"long_{n}"]) for n in CONDITION_NAMES},
+        "short_conditions": {n: bool(row[f"short_{n}"]) for n in CONDITION_NAMES},
+    }
+
+
 def _compute_weekly_crossings(
     df_15m: pd.DataFrame,
-    score_fn: Callable[..., Dict[str, Any]],
+    history: Optional[pd.DataFrame],
     asset_name: str,
     lookback_weeks: int = 4,
+    pyramid: Optional[ResamplePyramid] = None,
 ) -> List[Dict[str, Any]]:
     """
-    Weekly crossing detection (1H only). Receives RAW df only; all score_fn calls use raw data.
+    Weekly crossing detection (1H only). Receives RAW df only; history is score_history(df_15m,
+    freq_minutes=15), computed once by the caller and shared with the chart markers; each 1H bar
+    reads the row of the last 15m bar at or before it (TimeframeAlignment.at_label, built once).
     Display date/time converted to Asia/Hong_Kong when storing record.
     Direction: LONG, SHORT, BIAS_LONG, BIAS_SHORT. Condition source strictly by direction.
     """
     out: List[Dict[str, Any]] = []
-    if df_15m is None or df_15m.empty or len(df_15m) < 50:
+    if df_15m is None or df_15m.empty or len(df_15m) < 50 or history is None:
         return out
     if not isinstance(df_15m.index, pd.DatetimeIndex):
         return out
-    df_1h = _resample_15m_to_1h_viz(df_15m)
+    df_1h = _resample_15m_to_1h_viz(df_15m, pyramid)
     if df_1h.empty or len(df_1h) < 2:
         return out
-    cutoff = df_1h.index[-1] - pd.Timedelta(weeks=lookback_weeks)
+    align = TimeframeAlignment(history.index, df_1h.index)
+    first = align.upper_since(df_1h.index[-1] - pd.Timedelta(weeks=lookback_weeks))
     prev_long = -1
     prev_short = -1
     prev_abs_bias = -1
-    for ts in df_1h.index:
-        if ts < cutoff:
-            continue
-        slice_15m = df_15m[df_15m.index <= ts]
-        if len(slice_15m) < 50:
-            continue
-        try:
-            res = score_fn(slice_15m, freq_minutes=15)
-        except Exception:
+    for j in range(first, len(df_1h)):
+        ts = df_1h.index[j]
+        pos = int(align.at_label[j])
+        if pos + 1 < 50:
             continue
+        res = _history_result(history, pos)
         curr_long = res.get("long_score", 0)
         curr_short = res.get("short_score", 0)
         curr_bias = res.get("bias", 0)
@@ -125,52 +148,54 @@ def _slice_lookback(df: Optional[pd.DataFrame], n: int) -> Optional[pd.DataFrame
 def _compute_weekly_high_score_markers(
     df_15m: pd.DataFrame,
     df_1h: Optional[pd.DataFrame],
-    score_fn: Callable[..., Dict[str, Any]],
+    history: Optional[pd.DataFrame],
     lookback_weeks: int = 4,
 ) -> Tuple[List[Tuple[Any, str]], List[Tuple[Any, str]]]:
     """
     For last 4 calendar weeks: bars where long_score>=4 or short_score>=4 or abs(bias)>=2.
-    Returns ([(ts, 'long'|'short'), ...] for 1H, same for 15M). Visualization layer only; calls score_fn.
+    Returns ([(ts, 'long'|'short'), ...] for 1H, same for 15M). Visualization layer only;
+    history: score_history of the raw 15M frame (the crossing log's; may start earlier and be in
+    raw time). Plotted bars read its rows by instant.
     """
     markers_1h: List[Tuple[Any, str]] = []
     markers_15m: List[Tuple[Any, str]] = []
-    if df_15m is None or df_15m.empty or len(df_15m) < 50:
+    if df_15m is None or df_15m.empty or len(df_15m) < 50 or history is None:
         return markers_1h, markers_15m
     if not isinstance(df_15m.index, pd.DatetimeIndex):
         return markers_1h, markers_15m
+    history_index = _as_utc(history.index)
+    rows = history_index.get_indexer(_as_utc(df_15m.index))  # history row of each plotted bar (-1: none)
     cutoff = df_15m.index[-1] - pd.Timedelta(weeks=lookback_weeks)
+    long_score = history["long_score"].to_numpy()
+    short_score = history["short_score"].to_numpy()
+    bias = history["bias"].to_numpy()
 
-    # 1H bars in last 4 weeks
+    def _side(pos: int) -> Optional[str]:
+        if long_score[pos] >= 4 or short_score[pos] >= 4 or abs(bias[pos]) >= 2:
+            return "long" if (long_score[pos] >= 4 or bias[pos] >= 2) else "short"
+        return None
+
+    # 1H bars in last 4 weeks: each reads the last 15M row at or before its label
     if df_1h is not None and not df_1h.empty and isinstance(df_1h.index, pd.DatetimeIndex):
-        for ts in df_1h.index:
-            if ts < cutoff:
-                continue
-            slice_15m = df_15m[df_15m.index <= ts]
-            if len(slice_15m) < 50:
+        align = TimeframeAlignment(history_index, _as_utc(df_1h.index))
+        for j in range(align.upper_since(cutoff), len(df_1h)):
+            pos = int(align.at_label[j])
+            if pos + 1 < 50:
                 continue
-            try:
-                res = score_fn(slice_15m, freq_minutes=15)
-                if res.get("long_score", 0) >= 4 or res.get("short_score", 0) >= 4 or abs(res.get("bias", 0)) >= 2:
-                    side = "long" if (res.get("long_score", 0) >= 4 or res.get("bias", 0) >= 2) else "short"
-                    markers_1h.append((ts, side))
-            except Exception:
-                pass
-
-    # 15M bars in last 4 weeks (sample every 4 bars to keep responsive)
+            side = _side(pos)
+            if side:
+                markers_1h.append((df_1h.index[j], side))
+
+    # 15M bars in last 4 weeks (every 4th bar, as before)
     for i in range(len(df_15m) - 1, -1, -4):
-        if i < 50:
+        if rows[i] < 50:
             break
         ts = df_15m.index[i]
         if ts < cutoff:
             break
-        slice_15m = df_15m.iloc[: i + 1]
-        try:
-            res = score_fn(slice_15m, freq_minutes=15)
-            if res.get("long_score", 0) >= 4 or res.get("short_score", 0) >= 4 or abs(res.get("bias", 0)) >= 2:
-                side = "long" if (res.get("long_score", 0) >= 4 or res.get("bias", 0) >= 2) else "short"
-                markers_15m.append((ts, side))
-        except Exception:
-            pass
+        side = _side(int(rows[i]))
+        if side:
+            markers_15m.append((ts, side))
 
     return markers_1h, markers_15m
 
@@ -219,11 +244,16 @@ def build_three_panel_figure(
     show_fib: bool = True,
     show_session: bool = True,
     show_blocking: bool = True,
-    score_fn: Optional[Callable[..., Dict[str, Any]]] = None,
+    history: Optional[pd.DataFrame] = None,
+    zones: Optional[Dict[str, ZoneRegistry]] = None,
+    books: Optional[Dict[str, LiquidityBook]] = None,
 ) -> go.Figure:
     """
     Build 3-row Plotly figure. Overlays controlled by show_* toggles.
     Phase 2.3/2.4: ~500 bars per TF, weekend gaps removed, weekly stars (1H/15M), smart Y-axis, grid.
+    zones: per-panel ZoneRegistry dict kept by the caller (see get_visualization_data).
+    books: per-panel persistent LiquidityBook for the blocking lines (see get_visualization_data).
+    history: score_history of the raw 15M frame, computed once per render (also feeds the crossing log).
     """
     # Patch 2: extend visible history (slice before plotting only)
     df_4h_plot = _slice_lookback(df_4h, PLOT_BARS)
@@ -244,12 +274,12 @@ def build_three_panel_figure(
         subplot_titles=("4H Trend", "1H Structure", "15M Deployment"),
         row_heights=[0.35, 0.35, 0.30],
     )
-    viz = get_visualization_data(df_15m_plot, df_1h_plot, df_4h_plot, result)
+    viz = get_visualization_data(df_15m_plot, df_1h_plot, df_4h_plot, result, zones, books)
 
     # Weekly high-score markers (Patch 3) – last 4 weeks, 1H and 15M only
-    if score_fn is not None:
+    if history is not None:
         weekly_1h, weekly_15m = _compute_weekly_high_score_markers(
-            df_15m_plot, df_1h_plot, score_fn, lookback_weeks=4
+            df_15m_plot, df_1h_plot, history, lookback_weeks=4
         )
         viz.setdefault("1h", {})["weekly_signal"] = weekly_1h
         viz.setdefault("15m", {})["weekly_signal"] = weekly_15m
@@ -7,6 +7,8 @@ from typing import Any, List, Optional, Tuple
 import pandas as pd
 import plotly.graph_objects as go
 
+from ..resample import nearest_positions
+
 
 def add_candlestick(
     fig: go.Figure,
@@ -91,6 +93,18 @@ def add_zone_rect(
     add_rect(fig, x0, x1, y0, y1, row, col, fillcolor=fillcolor)
 
 
+def add_active_zone_rects(
+    fig: go.Figure,
+    zones: List[Tuple[str, float, float, Any, Any, int]],
+    row: int,
+    col: int,
+    opacity: float = 0.12,
+) -> None:
+    """Faint box per active zone containing price; fainter with each retest."""
+    for ztype, high, low, x0, x1, retests in zones:
+        add_zone_rect(fig, x0, x1, low, high, row, col, zone_type=ztype, opacity=round(opacity / (1 + retests), 3))
+
+
 def add_retracement_zone_rect(
     fig: go.Figure,
     x0, x1, y_low: float, y_high: float,
@@ -190,6 +204,43 @@ def add_cluster_markers(
     )
 
 
+def add_cluster_event_markers(
+    fig: go.Figure,
+    events: List[Tuple[str, float, Any, Any]],
+    row: int,
+    col: int,
+) -> None:
+    """Faint dotted segment between the two pivots of each double top (red) / double bottom (green)."""
+    for kind, color, name in (("high", "#f44336", "Double top"), ("low", "#4caf50", "Double bottom")):
+        xs: List[Any] = []
+        ys: List[Optional[float]] = []
+        for k, level, x0, x1 in events:
+            if k == kind:
+                xs += [x0, x1, None]
+                ys += [level, level, None]
+        if xs:
+            fig.add_trace(
+                go.Scatter(
+                    x=xs, y=ys, mode="lines+markers", name=name, opacity=0.5,
+                    line=dict(color=color, width=1, dash="dot"),
+                    marker=dict(symbol="circle-open", size=7, color=color),
+                ),
+                row=row, col=col,
+            )
+
+
+def add_asia_range_rects(
+    fig: go.Figure,
+    ranges: List[Tuple[Any, Any, float, float]],
+    row: int,
+    col: int,
+    opacity: float = 0.08,
+) -> None:
+    """Light blue box per trading day: [first, last] Asia bar × [low, high]."""
+    for x0, x1, high, low in ranges:
+        add_rect(fig, x0, x1, low, high, row, col, fillcolor=f"rgba(33,150,243,{opacity})")
+
+
 def add_session_arrow(
     fig: go.Figure,
     x_val, y_val,
@@ -227,27 +278,27 @@ def add_weekly_star_markers(
     df = df.rename(columns={c: c.lower() for c in df.columns if c.lower() in ("open", "high", "low", "close")})
     if "high" not in df.columns or "low" not in df.columns:
         return
-    idx = df.index
     price_span = float(df["high"].max() - df["low"].min()) or 1.0
     offset = price_span * offset_pct
+    try:
+        # Nearest candle of every marker in one pass
+        locs = nearest_positions(df.index, [ts for ts, _ in markers_list])
+    except Exception:
+        return
+    lows = df["low"].to_numpy(dtype=float)
+    highs = df["high"].to_numpy(dtype=float)
 
     long_x, long_y = [], []
     short_x, short_y = [], []
-    for ts, side in markers_list:
-        try:
-            loc = idx.get_indexer([ts], method="nearest")[0]
-            if loc < 0 or loc >= len(df):
-                continue
-            row_ = df.iloc[loc]
-            low_, high_ = float(row_["low"]), float(row_["high"])
-            if side == "long":
-                long_x.append(ts)
-                long_y.append(low_ - offset)
-            else:
-                short_x.append(ts)
-                short_y.append(high_ + offset)
-        except Exception:
+    for (ts, side), loc in zip(markers_list, locs):
+        if loc < 0:
             continue
+        if side == "long":
+            long_x.append(ts)
+            long_y.append(lows[loc] - offset)
+        else:
+            short_x.append(ts)
+            short_y.append(highs[loc] + offset)
     if long_x:
         fig.add_trace(
             go.Scatter(
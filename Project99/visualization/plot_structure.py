@@ -8,8 +8,11 @@ import pandas as pd
 import plotly.graph_objects as go
 
 from .overlays import (
+    add_active_zone_rects,
+    add_asia_range_rects,
     add_blocking_levels,
     add_candlestick,
+    add_cluster_event_markers,
     add_cluster_markers,
     add_horizontal_line,
     add_impulse_rects,
@@ -50,6 +53,9 @@ def plot_structure(
         add_impulse_rects(fig, df, long_bars, row, col, long_impulse=True)
         add_impulse_rects(fig, df, short_bars, row, col, long_impulse=False)
 
+    if show_stop_hunt:
+        add_cluster_event_markers(fig, data.get("double_clusters", []), row, col)
+
     # PATCH 2.1.1: Stop Hunt retracement band only when engine scored stop_hunt True
     if show_stop_hunt and (lc.get("stop_hunt") or sc.get("stop_hunt")):
         if lc.get("stop_hunt") and data.get("stop_hunt_double_bottom"):
@@ -75,12 +81,18 @@ def plot_structure(
             x_min, x_max,
             row, col,
         )
+        # Swing level that blocked the stop-money target (from the same liquidity book as the lines above)
+        if data.get("stop_money_blocking") is not None:
+            add_horizontal_line(fig, data["stop_money_blocking"], row, col, color="black", dash="dot", width=2)
 
+    if show_zone:
+        add_active_zone_rects(fig, data.get("active_zones", []), row, col)
     if show_zone and data.get("zone"):
         ztype, zhigh, zlow, t0, t1 = data["zone"]
         add_zone_rect(fig, t0, t1, zlow, zhigh, row, col, zone_type="demand" if ztype == "demand" else "supply", opacity=0.2)
 
     if show_session:
+        add_asia_range_rects(fig, data.get("asia_ranges", []), row, col)
         if data.get("session_breakout_long"):
             add_session_arrow(fig, df.index[-1], float(df["high"].iloc[-1]), row, col, long_breakout=True)
         if data.get("session_breakout_short"):
@@ -0,0 +1,299 @@
+"""
+Project99 — Supply / demand zone registry.
+ZoneRegistry detects zone origins (impulse candles, same rule as the zone condition) bar by bar and
+keeps the active zones in an interval index: "which zones contain price P" is O(log m + k). New zones are
+inserted into the index and expired ones skipped until they make up half of it (amortized rebuilds).
+Every closed bar that closes inside a zone's band is a visit; a visit after price left the band
+is a retest (the spec's zones weaken after two retests). Zones expire by age or retest count.
+One registry per asset and timeframe can be kept across refreshes (sync): only new bars are added.
+"""
+
+from bisect import bisect_right
+from collections import deque
+from typing import Any, Deque, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .impulse import AVG_BODY_MIN_PERIODS, AVG_BODY_WINDOW, impulse_features
+
+# Zone condition: origins are searched within this many bars of the last one
+ZONE_LOOKBACK = 30
+
+
+def zone_direction(
+    o: float,
+    h: float,
+    l: float,
+    c: float,
+    avg_body: float,
+    body_ratio: float,
+    wick_ratio: float,
+) -> Optional[str]:
+    """
+    'up' / 'down' if the candle is a zone origin (large body vs avg_body, small wicks), else None.
+    Scalar form of impulse_features(..., n_candles=1).run for bars fed one at a time.
+    """
+    if not avg_body > 0:
+        return None
+    body = abs(c - o)
+    if body < avg_body * body_ratio:
+        return None
+    range_ = h - l
+    wick = range_ - body if range_ >= body else 0
+    if body <= 0 or wick > body * wick_ratio:
+        return None
+    return "up" if c > o else "down"
+
+
+class Zone:
+    """One zone: origin bar (pos, time), direction, candle high / low and revisit tolerance."""
+
+    __slots__ = ("pos", "time", "direction", "high", "low", "tol", "retests", "last_visit", "expired")
+
+    def __init__(self, pos: int, time: Any, direction: str, high: float, low: float, tol: float) -> None:
+        self.pos = pos
+        self.time = time
+        self.direction = direction
+        self.high = high
+        self.low = low
+        self.tol = tol
+        self.retests = 0
+        self.last_visit = pos  # the origin candle closes inside its own range
+        self.expired = False
+
+    @property
+    def kind(self) -> str:
+        return "demand" if self.direction == "up" else "supply"
+
+    @property
+    def band(self) -> Tuple[float, float]:
+        """Revisit band: [low - tol, high + tol]."""
+        return self.low - self.tol, self.high + self.tol
+
+    def contains(self, price: float) -> bool:
+        lo, hi = self.band
+        return lo <= price <= hi
+
+    def __repr__(self) -> str:
+        return f"Zone({self.kind}, pos={self.pos}, {self.low}-{self.high}, retests={self.retests})"
+
+
+class _IntervalNode:
+    """
+    Centered interval tree node: intervals containing center, sorted by low and by high (expired ones skipped).
+    low_keys / high_keys: the sort keys (band low, -band high) in the same order, for bisect inserts.
+    """
+
+    __slots__ = ("center", "by_low", "by_high", "low_keys", "high_keys", "left", "right")
+
+    def __init__(self, zones: List[Zone]) -> None:
+        bands = sorted(b for z in zones for b in z.band)
+        self.center = bands[len(bands) // 2]
+        here, left, right = [], [], []
+        for z in zones:
+            lo, hi = z.band
+            if hi < self.center:
+                left.append(z)
+            elif lo > self.center:
+                right.append(z)
+            else:
+                here.append(z)
+        self.by_low = sorted(here, key=lambda z: z.band[0])
+        self.by_high = sorted(here, key=lambda z: z.band[1], reverse=True)
+        self.low_keys = [z.band[0] for z in self.by_low]
+        self.high_keys = [-z.band[1] for z in self.by_high]
+        self.left = _IntervalNode(left) if left else None
+        self.right = _IntervalNode(right) if right else None
+
+    def insert(self, zone: Zone) -> None:
+        """Add zone to the node whose center its band contains (a new leaf if none does)."""
+        lo, hi = zone.band
+        node = self
+        while True:
+            side = "left" if hi < node.center else "right" if lo > node.center else None
+            if side is None:
+                i = bisect_right(node.low_keys, lo)
+                node.low_keys.insert(i, lo)
+                node.by_low.insert(i, zone)
+                i = bisect_right(node.high_keys, -hi)
+                node.high_keys.insert(i, -hi)
+                node.by_high.insert(i, zone)
+                return
+            child = getattr(node, side)
+            if child is None:
+                setattr(node, side, _IntervalNode([zone]))
+                return
+            node = child
+
+    def stab(self, x: float, out: List[Zone]) -> None:
+        node: Optional[_IntervalNode] = self
+        while node is not None:
+            if x < node.center:
+                for z in node.by_low:
+                    if z.band[0] > x:
+                        break
+                    if not z.expired:
+                        out.append(z)
+                node = node.left
+            elif x > node.center:
+                for z in node.by_high:
+                    if z.band[1] < x:
+                        break
+                    if not z.expired:
+                        out.append(z)
+                node = node.right
+            else:
+                out.extend(z for z in node.by_low if not z.expired)
+                return
+
+
+class ZoneRegistry:
+    """
+    Zones of one asset / timeframe, fed one closed bar at a time (add) or from a frame (sync / extend).
+    max_age: zones expire when their origin is more than max_age bars old (None: never).
+    max_retests: zones expire once retested more than this many times (None: never).
+    Bar positions count from first_pos (a registry over a frame's tail keeps frame positions).
+    """
+
+    def __init__(
+        self,
+        body_ratio: float,
+        wick_ratio: float,
+        revisit_pct: float,
+        max_age: Optional[int] = None,
+        max_retests: Optional[int] = None,
+        first_pos: int = 0,
+    ) -> None:
+        self.body_ratio = body_ratio
+        self.wick_ratio = wick_ratio
+        self.revisit_pct = revisit_pct
+        self.max_age = max_age
+        self.max_retests = max_retests
+        self.first_pos = first_pos
+        self.reset()
+
+    @classmethod
+    def from_config(cls, cfg: Any, **kwargs: Any) -> "ZoneRegistry":
+        """Registry with the zone condition's thresholds (ZONE_* fields of a ScoringConfig)."""
+        return cls(cfg.ZONE_IMPULSE_BODY_RATIO, cfg.ZONE_WICK_TO_BODY_MAX, cfg.ZONE_REVISIT_TOLERANCE_PCT, **kwargs)
+
+    @property
+    def params(self) -> Tuple[float, float, float]:
+        return self.body_ratio, self.wick_ratio, self.revisit_pct
+
+    def reset(self) -> None:
+        self.n = self.first_pos  # position of the next bar
+        self.latest: Optional[Zone] = None
+        self.active: Deque[Zone] = deque()
+        self.bodies: Deque[float] = deque(maxlen=AVG_BODY_WINDOW)
+        self.last_bar: Optional[Tuple[Any, float]] = None
+        self._tree: Optional[_IntervalNode] = None
+        self._built = 0  # zones in the tree at its last rebuild
+        self._inserted = 0  # zones inserted since
+        self._dead = 0  # expired zones still in the tree
+
+    def add(self, time: Any, o: float, h: float, l: float, c: float, origin: Optional[bool] = None) -> Optional[Zone]:
+        """
+        One closed bar: count visits / retests of the zones its close is in, expire, then detect a new
+        zone at this bar. origin: precomputed origin flag (impulse_features run); default: zone_direction
+        on the 10-bar mean body of the bars added so far. Returns the new zone, if any.
+        """
+        pos = self.n
+        self.bodies.append(abs(c - o))
+        for z in self.containing(c):
+            if z.last_visit != pos - 1:
+                z.retests += 1
+            z.last_visit = pos
+            if self.max_retests is not None and z.retests > self.max_retests:
+                self._expire(z)
+        if self.max_age is not None:
+            while self.active and (self.active[0].expired or self.active[0].pos < pos - self.max_age):
+                self._expire(self.active.popleft())
+        if origin is None:
+            avg = sum(self.bodies) / len(self.bodies) if len(self.bodies) >= AVG_BODY_MIN_PERIODS else np.nan
+            direction = zone_direction(o, h, l, c, avg, self.body_ratio, self.wick_ratio)
+        else:
+            direction = ("up" if c > o else "down") if origin else None
+        zone = None
+        # A bar with NaN high / low has no band (its comparisons would never place it in the index)
+        if direction is not None and l <= h:
+            zone = Zone(pos, time, direction, float(h), float(l), (h - l) * self.revisit_pct)
+            self.latest = zone
+            self.active.append(zone)
+            self._index(zone)
+        self.last_bar = (time, c)
+        self.n += 1
+        return zone
+
+    def _index(self, zone: Zone) -> None:
+        """Insert a new zone; rebuild (balanced, without expired zones) once the tree has doubled."""
+        self._inserted += 1
+        if self._tree is None or self._inserted > self._built:
+            self._rebuild()
+        else:
+            self._tree.insert(zone)
+
+    def _expire(self, zone: Zone) -> None:
+        if not zone.expired:
+            zone.expired = True
+            self._dead += 1
+            if 2 * self._dead > self._built + self._inserted:
+                self._rebuild()
+
+    def _rebuild(self) -> None:
+        live = [z for z in self.active if not z.expired]
+        self.active = deque(live)
+        self._tree = _IntervalNode(live) if live else None
+        self._built, self._inserted, self._dead = len(live), 0, 0
+
+    def containing(self, price: float) -> List[Zone]:
+        """Active zones whose band contains price, oldest first (none for a NaN price)."""
+        if self._tree is None or price != price:
+            return []
+        out: List[Zone] = []
+        self._tree.stab(price, out)
+        return sorted(out, key=lambda z: z.pos)
+
+    def retests_at(self, zone: Zone, close: float) -> int:
+        """zone.retests counting the bar after the last one added (e.g. the forming bar) closing at close."""
+        if zone.contains(close) and zone.last_visit != self.n - 1:
+            return zone.retests + 1
+        return zone.retests
+
+    def extend(self, df: pd.DataFrame, origins: Optional[np.ndarray] = None) -> None:
+        """Add every row of df (lower-case OHLC). origins: per-row origin flags (else detected bar by bar)."""
+        cols = [df[c].to_numpy(dtype=float) for c in ("open", "high", "low", "close")]
+        flags = origins.tolist() if origins is not None else [None] * len(df)
+        for t, o, h, l, c, origin in zip(df.index, *cols, flags):
+            self.add(t, o, h, l, c, origin)
+
+    def sync(self, df: pd.DataFrame) -> "ZoneRegistry":
+        """
+        Bring the registry up to df's last bar: when df contains the last bar added (same time and
+        close), only the rows after it are added, else the registry is rebuilt from df.
+        df may start later than the bars already seen (a sliding window over the same history).
+        """
+        seen = 0
+        if self.last_bar is not None and len(df):
+            t, c = self.last_bar
+            k = int(df.index.searchsorted(t))
+            if k < len(df) and df.index[k] == t and float(df["close"].iloc[k]) == c:
+                seen = k + 1
+        if not seen:
+            self.reset()
+        if seen < len(df):
+            cols = [df[c].to_numpy(dtype=float) for c in ("open", "high", "low", "close")]
+            origins = impulse_features(*cols, self.body_ratio, self.wick_ratio).run
+            self.extend(df.iloc[seen:], origins[seen:])
+        return self
+
+    def latest_within(self, lookback: int) -> Optional[Zone]:
+        """
+        Newest zone whose origin is among the last lookback - 2 bars added: the zone condition's window
+        (bars n - lookback + 1 .. n - 2 of an n-bar frame, with the registry fed every bar but the last).
+        """
+        zone = self.latest
+        if zone is None or self.n - 1 - zone.pos > lookback - 3:
+            return None
+        return zone